@@ -0,0 +1,130 @@
+"""Compares a vote query over JSON lines with the same query over BlockExporter files
+
+Synthetic blocks with votes are exported as JSON lines (one block per line,
+as examples/write_blocks_to_file.py does) and with BlockExporter
+(parquet when pyarrow is installed, and the ncol fallback). The query sums
+the vote weight per voter.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+
+import mock
+
+from nectar.blockchain import Blockchain
+from nectar.blockexport import BlockExporter, has_pyarrow, iter_row_groups
+
+
+class OfflineChain(object):
+    def get_block_interval(self):
+        return 3
+
+
+def make_blocks(num_blocks, votes_per_block):
+    for block_num in range(1, num_blocks + 1):
+        operations = []
+        for i in range(votes_per_block):
+            operations.append(
+                {
+                    "type": "vote_operation",
+                    "value": {
+                        "voter": "voter%d" % (i * 7 % 1000),
+                        "author": "author%d" % (block_num % 5000),
+                        "permlink": "post-%d" % block_num,
+                        "weight": 100 * (i % 100),
+                    },
+                }
+            )
+        yield {
+            "id": block_num,
+            "timestamp": "2024-01-01T00:00:00",
+            "transaction_ids": ["%040x" % (block_num * 1000 + i) for i in range(votes_per_block)],
+            "transactions": [{"operations": [op]} for op in operations],
+        }
+
+
+def timed(name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print("%-32s %8.3f s" % (name, time.perf_counter() - start))
+    return result
+
+
+def write_json_lines(path, args):
+    with gzip.open(path, "wt") as f:
+        for block in make_blocks(args.blocks, args.votes):
+            f.write(json.dumps(block) + "\n")
+
+
+def query_json_lines(path):
+    weights = defaultdict(int)
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            for trx in json.loads(line)["transactions"]:
+                for op in trx["operations"]:
+                    if op["type"] == "vote_operation":
+                        weights[op["value"]["voter"]] += op["value"]["weight"]
+    return weights
+
+
+def export(directory, format, args):
+    exporter = BlockExporter(directory, format=format, blockchain_instance=OfflineChain())
+    blocks = make_blocks(args.blocks, args.votes)
+    with mock.patch.object(Blockchain, "blocks", lambda b, **kw: blocks):
+        exporter.export(1, args.blocks)
+
+
+def query_ncol(directory):
+    weights = defaultdict(int)
+    for name in os.listdir(os.path.join(directory, "vote")):
+        path = os.path.join(directory, "vote", name)
+        for group in iter_row_groups(path, columns=["voter", "weight"]):
+            for voter, weight in zip(group["voter"], group["weight"]):
+                weights[voter] += weight
+    return weights
+
+
+def query_parquet(directory):
+    import pyarrow.dataset
+
+    table = pyarrow.dataset.dataset(os.path.join(directory, "vote")).to_table(
+        columns=["voter", "weight"]
+    )
+    result = table.group_by("voter").aggregate([("weight", "sum")]).to_pydict()
+    return dict(zip(result["voter"], result["weight_sum"]))
+
+
+def size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(r, f)) for r, _, files in os.walk(path) for f in files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=20000)
+    parser.add_argument("--votes", type=int, default=50, help="votes per block")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "blocks.json.gz")
+        timed("write json lines (gzip)", write_json_lines, path, args)
+        expected = timed("query json lines", query_json_lines, path)
+        print("%-32s %8.1f MB" % ("json lines size", size(path) / 1e6))
+        formats = ["ncol"] + (["parquet"] if has_pyarrow() else [])
+        for format in formats:
+            target = os.path.join(directory, format)
+            timed("export %s" % format, export, target, format, args)
+            query = query_parquet if format == "parquet" else query_ncol
+            result = timed("query %s" % format, query, target)
+            assert result == expected
+            print("%-32s %8.1f MB" % ("%s size" % format, size(target) / 1e6))
+    finally:
+        shutil.rmtree(directory)
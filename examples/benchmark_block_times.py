@@ -0,0 +1,124 @@
+"""Profiles the timestamp handling of Block over a day of blocks
+
+Blocks are read from a file with one raw block (json) per line, plain or
+gzipped. ``--download START`` writes such a file first. Without a file,
+a synthetic day (28800 blocks) is generated.
+"""
+
+import argparse
+import cProfile
+import gzip
+import json
+import pstats
+import time
+from datetime import datetime, timedelta, timezone
+
+from nectar.block import Block
+from nectar.utils import addTzInfo, formatTimeString, timeFormat
+
+
+class OfflineChain(object):
+    pass
+
+
+def strptime_parser(t):
+    """The parser which formatTimeString used before"""
+    return addTzInfo(datetime.strptime(t, timeFormat))
+
+
+def synthetic_day(num_blocks=28800, trx_per_block=30):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    lines = []
+    for i in range(num_blocks):
+        block_time = start + timedelta(seconds=3 * i)
+        transactions = []
+        for j in range(trx_per_block):
+            expiration = block_time + timedelta(seconds=60 + j)
+            transactions.append(
+                {
+                    "ref_block_num": i & 0xFFFF,
+                    "expiration": expiration.strftime(timeFormat),
+                    "operations": [
+                        {"type": "vote_operation", "value": {"voter": "v%d" % j, "weight": 100}}
+                    ],
+                    "signatures": ["1f" + "00" * 64],
+                }
+            )
+        block = {
+            "block_id": "%08x" % (i + 1) + "0" * 32,
+            "timestamp": block_time.strftime(timeFormat),
+            "transaction_ids": ["%040x" % j for j in range(trx_per_block)],
+            "transactions": transactions,
+        }
+        lines.append(json.dumps(block))
+    return lines
+
+
+def download(path, start, count):
+    from nectar.blockchain import Blockchain
+
+    b = Blockchain()
+    rpc = b.blockchain.rpc
+    with gzip.open(path, "wt") as f:
+        for block_num in range(start, start + count, 1000):
+            blocks = rpc.get_block_range(
+                {"starting_block_num": block_num, "count": min(1000, start + count - block_num)},
+                api="block",
+            )["blocks"]
+            for block in blocks:
+                f.write(json.dumps(block) + "\n")
+
+
+def read_lines(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [line for line in f if line.strip()]
+
+
+def parse_blocks(lines, lazy_time, to_json):
+    chain = OfflineChain()
+    for line in lines:
+        block = Block(json.loads(line), lazy_time=lazy_time, blockchain_instance=chain)
+        block.time()
+        if to_json:
+            block.json()
+
+
+def timed(name, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    duration = time.perf_counter() - start
+    print("%-36s %8.3f s" % (name, duration))
+    return duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", help="raw blocks, one json per line (.gz allowed)")
+    parser.add_argument("--download", type=int, metavar="START", help="download blocks into --file")
+    parser.add_argument("--count", type=int, default=28800, help="blocks to download")
+    parser.add_argument("--profile", action="store_true", help="show the top functions")
+    args = parser.parse_args()
+
+    if args.download:
+        download(args.file, args.download, args.count)
+    lines = read_lines(args.file) if args.file else synthetic_day()
+    times = []
+    for line in lines:
+        block = json.loads(line)
+        times.append(block["timestamp"])
+        times.extend(trx["expiration"] for trx in block.get("transactions", []))
+    print("%d blocks, %d timestamps" % (len(lines), len(times)))
+
+    timed("json.loads only", lambda: [json.loads(line) for line in lines])
+    timed("strptime per timestamp (old)", lambda: [strptime_parser(t) for t in times])
+    timed("formatTimeString (new)", lambda: [formatTimeString(t) for t in times])
+    timed("Block()", parse_blocks, lines, False, False)
+    timed("Block(lazy_time=True)", parse_blocks, lines, True, False)
+    timed("Block() + json()", parse_blocks, lines, False, True)
+    timed("Block(lazy_time=True) + json()", parse_blocks, lines, True, True)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(parse_blocks, lines, False, True)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
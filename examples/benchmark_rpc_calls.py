@@ -0,0 +1,76 @@
+"""Measures RPC calls per second through NodeRPC.__getattr__
+
+The transport is replaced by a local mock which answers every request
+with a canned result, so only the request building, encoding and reply
+handling of nectarapi is measured.
+"""
+
+import argparse
+import json
+import time
+
+from nectarapi.noderpc import NodeRPC
+
+
+class MockResponse(object):
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class MockNodeRPC(NodeRPC):
+    def __init__(self):
+        super(MockNodeRPC, self).__init__("http://localhost:0", autoconnect=False)
+        self.url = "http://localhost:0"
+        self.current_rpc = self.rpc_methods["appbase"]
+        self.sent_bytes = 0
+        self.sent_requests = 0
+
+    def request_send(self, payload):
+        self.sent_bytes += len(payload)
+        self.sent_requests += 1
+        request = json.loads(payload)
+        if isinstance(request, list):
+            return MockResponse(
+                json.dumps([{"jsonrpc": "2.0", "result": {}, "id": r["id"]} for r in request])
+            )
+        return MockResponse(json.dumps({"jsonrpc": "2.0", "result": {}, "id": request["id"]}))
+
+
+def run(name, call, seconds):
+    count = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while time.perf_counter() < end:
+        for _ in range(100):
+            call()
+        count += 100
+    duration = time.perf_counter() - start
+    print("%-24s %10.0f calls/s" % (name, count / duration))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each test")
+    args = parser.parse_args()
+
+    rpc = MockNodeRPC()
+    run("get_block", lambda: rpc.get_block({"block_num": 1}, api="block"), args.seconds)
+    run(
+        "find_accounts",
+        lambda: rpc.find_accounts({"accounts": ["alice", "bob"]}, api="database"),
+        args.seconds,
+    )
+    run(
+        "condenser get_accounts", lambda: rpc.get_accounts(["alice"], api="condenser"), args.seconds
+    )
+    run(
+        "get_config (no params)",
+        lambda: rpc.get_config(api="database"),
+        args.seconds,
+    )
+    print("bytes per request: %.1f" % (rpc.sent_bytes / rpc.sent_requests))
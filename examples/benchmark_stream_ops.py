@@ -0,0 +1,92 @@
+"""Measures the operations per second of Blockchain.stream() without network
+
+Synthetic blocks are fed into stream(), so only the op projection is measured:
+the default dicts (copy + _id hash per op), raw_ops and op_view.
+"""
+
+import argparse
+import time
+
+from nectar.blockchain import Blockchain
+
+
+class OfflineChain(object):
+    def get_block_interval(self):
+        return 3
+
+
+def make_blocks(num_blocks, trx_per_block):
+    blocks = []
+    for block_num in range(1, num_blocks + 1):
+        transactions = []
+        for i in range(trx_per_block):
+            transactions.append(
+                {
+                    "signatures": ["1f" + "00" * 64],
+                    "operations": [
+                        {
+                            "type": "vote_operation",
+                            "value": {
+                                "voter": "voter%d" % i,
+                                "author": "author%d" % block_num,
+                                "permlink": "post-%d" % i,
+                                "weight": 10000,
+                            },
+                        },
+                        {
+                            "type": "transfer_operation",
+                            "value": {
+                                "from": "alice",
+                                "to": "bob",
+                                "amount": {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+                                "memo": "benchmark",
+                            },
+                        },
+                    ],
+                }
+            )
+        blocks.append(
+            {
+                "id": block_num,
+                "timestamp": "2024-01-01T00:00:00",
+                "transaction_ids": ["%040x" % (block_num * 1000 + i) for i in range(trx_per_block)],
+                "transactions": transactions,
+            }
+        )
+    return blocks
+
+
+def run(b, blocks, repeat, **kwargs):
+    b.blocks = lambda **_: iter(blocks)
+    best = None
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        for op in b.stream(source="blocks", **kwargs):
+            # a typical consumer reads a few fields
+            if op["block_num"] and op["trx_num"] >= 0:
+                count += 1
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return count, best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--trx", type=int, default=50, help="transactions per block")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    blocks = make_blocks(args.blocks, args.trx)
+    b = Blockchain(blockchain_instance=OfflineChain())
+    modes = [
+        ("dict (default)", {}),
+        ("raw_ops", {"raw_ops": True}),
+        ("op_view", {"op_view": True}),
+        ("op_view + vote filter", {"op_view": True, "opNames": ["vote"]}),
+        ("dict + vote filter", {"opNames": ["vote"]}),
+    ]
+    for name, kwargs in modes:
+        count, duration = run(b, blocks, args.repeat, **kwargs)
+        print("%-24s %9d ops %8.3f s %12.0f ops/s" % (name, count, duration, count / duration))
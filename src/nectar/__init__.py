@@ -1,21 +1,32 @@
 """nectar."""
 
-from .blurt import Blurt
-from .hive import Hive
-from .steem import Steem
+import importlib
+
 from .version import version as __version__
 
+# Blurt, Hive and Steem pull in the rpc, wallet and storage stack, they are
+# imported on first access (PEP 562) so that e.g. ``nectar.utils`` loads fast
+_lazy_classes = {"Blurt": ".blurt", "Hive": ".hive", "Steem": ".steem"}
+
 __all__ = [
     "steem",
     "account",
     "amount",
     "asset",
     "block",
+    "candlestore",
+    "clidaemon",
     "blurt",
     "blockchain",
     "blockchaininstance",
+    "blockexport",
+    "blockindex",
+    "blockpipeline",
+    "headnotifier",
+    "executor",
     "market",
     "storage",
+    "streamconsumer",
     "price",
     "utils",
     "wallet",
@@ -23,10 +34,27 @@ __all__ = [
     "message",
     "comment",
     "discussions",
+    "followgraph",
     "witness",
     "profile",
     "nodelist",
     "imageuploader",
     "snapshot",
+    "historystore",
     "hivesigner",
 ]
+
+
+def __getattr__(name):
+    if name in _lazy_classes:
+        value = getattr(importlib.import_module(_lazy_classes[name], __name__), name)
+    elif name in __all__:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_classes) | set(__all__))
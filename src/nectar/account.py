@@ -3,6 +3,7 @@ import json
 import logging
 import random
 from datetime import date, datetime, time, timedelta, timezone
+from queue import Queue
 
 from prettytable import PrettyTable
 
@@ -27,7 +28,9 @@ from nectargraphenebase.py23 import integer_types, string_types
 
 from .blockchain import Blockchain
 from .blockchainobject import BlockchainObject
+from .blockindex import shared_block_index
 from .exceptions import AccountDoesNotExistsException, OfflineHasNoRPCException
+from .executor import node_instances, shared_executor
 from .utils import (
     addTzInfo,
     formatTimedelta,
@@ -50,6 +53,38 @@ def extract_account_name(account):
         return ""
 
 
+def _parse_history_event(event):
+    """Returns the op type and the op value of an account history event"""
+    if isinstance(event["op"], list):
+        return event["op"][0], event["op"][1]
+    op_type = event["op"]["type"]
+    if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
+        op_type = op_type[:-10]
+    return op_type, event["op"]["value"]
+
+
+def _construct_history_op(item_index, event, op_type, op, account_name):
+    """Builds the dict which is returned by the account history generators"""
+    # index can change during reindexing in
+    # future hard-forks. Thus we cannot take it for granted.
+    immutable = op.copy()
+    immutable.update(remove_from_dict(event, keys=["op"], keep_keys=False))
+    immutable.update(
+        {
+            "account": account_name,
+            "type": op_type,
+        }
+    )
+    _id = Blockchain.hash_op(immutable)
+    immutable.update(
+        {
+            "_id": _id,
+            "index": item_index,
+        }
+    )
+    return immutable
+
+
 class Account(BlockchainObject):
     """This class allows to easily access Account data
 
@@ -2242,6 +2277,20 @@ class Account(BlockchainObject):
             return None
         return op[0][1]["block"]
 
+    def _get_indexed_blocknum(self, index, min_index=1, block_index=None):
+        """Returns the block number of an op from the block index, or
+        fetches it and adds it to the index"""
+        if block_index is None or block_index is False:
+            return self._get_blocknum_from_hist(index, min_index=min_index)
+        if index >= 0 and index < min_index:
+            index = min_index
+        block_num = block_index.get_op_block_num(self["name"], index)
+        if block_num is None:
+            block_num = self._get_blocknum_from_hist(index, min_index=min_index)
+            if block_num is not None:
+                block_index.add_op(self["name"], index, block_num)
+        return block_num
+
     def _get_first_blocknum(self):
         min_index = 0
         try:
@@ -2251,7 +2300,9 @@ class Account(BlockchainObject):
             created = self._get_blocknum_from_hist(0, min_index=min_index)
         return created, min_index
 
-    def estimate_virtual_op_num(self, blocktime, stop_diff=0, max_count=100, min_index=None):
+    def estimate_virtual_op_num(
+        self, blocktime, stop_diff=0, max_count=100, min_index=None, block_index=None
+    ):
         """Returns an estimation of an virtual operation index for a given time or blockindex
 
         :param blocktime: start time or start block index from which account
@@ -2260,6 +2311,9 @@ class Account(BlockchainObject):
         :param int stop_diff: Sets the difference between last estimation and
             new estimation at which the estimation stops. Must not be zero. (default is 1)
         :param int max_count: sets the maximum number of iterations. -1 disables this (default 100)
+        :param BlockIndex block_index: op index -> block checkpoints of this account
+            narrow the search range and every fetched op is added as checkpoint.
+            Default is the in-memory index of the chain, ``False`` disables it.
 
         .. testsetup::
 
@@ -2293,41 +2347,52 @@ class Account(BlockchainObject):
         max_index = self.virtual_op_count()
         if max_index < stop_diff:
             return 0
-
-        # calculate everything with block numbers
-        if min_index is None:
-            created, min_index = self._get_first_blocknum()
-        else:
-            created = self._get_blocknum_from_hist(0, min_index=min_index)
+        if block_index is None:
+            block_index = shared_block_index(self.blockchain)
+        account = self["name"]
 
         # convert blocktime to block number if given as a datetime/date/time
         if isinstance(blocktime, (datetime, date, time)):
-            b = Blockchain(blockchain_instance=self.blockchain)
+            b = Blockchain(blockchain_instance=self.blockchain, block_index=block_index)
             target_blocknum = b.get_estimated_block_num(addTzInfo(blocktime), accurate=True)
         else:
             target_blocknum = blocktime
 
+        # calculate everything with block numbers, the first op of a pruned history is not 0
+        if min_index is None:
+            created, min_index = self._get_first_blocknum()
+        else:
+            created = self._get_blocknum_from_hist(0, min_index=min_index)
+        if block_index is not False and created is not None:
+            block_index.add_op(account, min_index, created)
+
         # the requested blocknum/timestamp is before the account creation date
         if target_blocknum <= created:
             return 0
 
-        # get the block number from the account's latest operation
-        latest_blocknum = self._get_blocknum_from_hist(-1, min_index=min_index)
+        lower = upper = None
+        if block_index is not False:
+            lower, upper = block_index.op_bounds(account, target_blocknum)
+        if lower is None:
+            lower = (0, created)
 
-        # requested blocknum/timestamp is after the latest account operation
-        if target_blocknum >= latest_blocknum:
-            return max_index
+        if upper is None:
+            # get the block number from the account's latest operation
+            latest_blocknum = self._get_blocknum_from_hist(-1, min_index=min_index)
 
-        # all account ops in a single block
-        if latest_blocknum - created == 0:
-            return 0
+            # requested blocknum/timestamp is after the latest account operation
+            if target_blocknum >= latest_blocknum:
+                return max_index
+
+            # all account ops in a single block
+            if latest_blocknum - lower[1] == 0:
+                return 0
+            upper = (max_index, latest_blocknum)
 
         # set initial search range
         op_num = 0
-        op_lower = 0
-        block_lower = created
-        op_upper = max_index
-        block_upper = latest_blocknum
+        op_lower, block_lower = lower
+        op_upper, block_upper = upper
         last_op_num = None
         cnt = 0
 
@@ -2354,10 +2419,10 @@ class Account(BlockchainObject):
 
             # get block number for current op number estimation
             if op_num != last_op_num:
-                block_num = self._get_blocknum_from_hist(op_num, min_index=min_index)
+                block_num = self._get_indexed_blocknum(op_num, min_index, block_index)
                 while block_num is None and op_num < max_index:
                     op_num += 1
-                    block_num = self._get_blocknum_from_hist(op_num, min_index=min_index)
+                    block_num = self._get_indexed_blocknum(op_num, min_index, block_index)
                 last_op_num = op_num
 
             # check if the required accuracy was reached
@@ -2539,43 +2604,15 @@ class Account(BlockchainObject):
             elif stop is not None and not use_block_num and order == -1 and item_index < stop:
                 return
 
-            if isinstance(event["op"], list):
-                op_type, op = event["op"]
-            else:
-                op_type = event["op"]["type"]
-                if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
-                    op_type = op_type[:-10]
-                op = event["op"]["value"]
-            block_props = remove_from_dict(event, keys=["op"], keep_keys=False)
-
-            def construct_op(account_name):
-                # verbatim output from steemd
-                if raw_output:
-                    return item
-
-                # index can change during reindexing in
-                # future hard-forks. Thus we cannot take it for granted.
-                immutable = op.copy()
-                immutable.update(block_props)
-                immutable.update(
-                    {
-                        "account": account_name,
-                        "type": op_type,
-                    }
-                )
-                _id = Blockchain.hash_op(immutable)
-                immutable.update(
-                    {
-                        "_id": _id,
-                        "index": item_index,
-                    }
-                )
-                return immutable
-
+            op_type, op = _parse_history_event(event)
             if exclude_ops and op_type in exclude_ops:
                 continue
             if not only_ops or op_type in only_ops:
-                yield construct_op(self["name"])
+                # verbatim output from steemd
+                if raw_output:
+                    yield item
+                else:
+                    yield _construct_history_op(item_index, event, op_type, op, self["name"])
 
     def history(
         self,
@@ -2586,6 +2623,7 @@ class Account(BlockchainObject):
         exclude_ops=[],
         batch_size=1000,
         raw_output=False,
+        history_store=None,
     ):
         """Returns a generator for individual account transactions. The
         earlist operation will be first. This call can be used in a
@@ -2604,6 +2642,8 @@ class Account(BlockchainObject):
         :param int batch_size: internal api call batch size (*optional*)
         :param bool raw_output: if False, the output is a dict, which
             includes all values. Otherwise, the output is list.
+        :param AccountHistoryStore history_store: serve the ops from this
+            local store instead of the API, see :func:`sync_history` (*optional*)
 
         .. note::
             only_ops and exclude_ops takes an array of strings:
@@ -2660,6 +2700,18 @@ class Account(BlockchainObject):
             0
 
         """
+        if history_store is not None:
+            yield from history_store.history(
+                self["name"],
+                start=start,
+                stop=stop,
+                use_block_num=use_block_num,
+                only_ops=only_ops,
+                exclude_ops=exclude_ops,
+                order=1,
+                raw_output=raw_output,
+            )
+            return
         _limit = batch_size
         max_index = self.virtual_op_count()
         if not max_index:
@@ -2813,6 +2865,7 @@ class Account(BlockchainObject):
         exclude_ops=[],
         batch_size=1000,
         raw_output=False,
+        history_store=None,
     ):
         """Returns a generator for individual account transactions. The
         latest operation will be first. This call can be used in a
@@ -2833,6 +2886,8 @@ class Account(BlockchainObject):
         :param int batch_size: internal api call batch size (*optional*)
         :param bool raw_output: if False, the output is a dict, which
             includes all values. Otherwise, the output is list.
+        :param AccountHistoryStore history_store: serve the ops from this
+            local store instead of the API, see :func:`sync_history` (*optional*)
 
         .. note::
             only_ops and exclude_ops takes an array of strings:
@@ -2889,6 +2944,18 @@ class Account(BlockchainObject):
             0
 
         """
+        if history_store is not None:
+            yield from history_store.history(
+                self["name"],
+                start=start,
+                stop=stop,
+                use_block_num=use_block_num,
+                only_ops=only_ops,
+                exclude_ops=exclude_ops,
+                order=-1,
+                raw_output=raw_output,
+            )
+            return
         _limit = batch_size
         first = self.virtual_op_count()
         start = addTzInfo(start)
@@ -2999,6 +3066,91 @@ class Account(BlockchainObject):
             if first < 1:
                 break
 
+    def history_parallel(
+        self,
+        start=None,
+        stop=None,
+        order=1,
+        only_ops=[],
+        exclude_ops=[],
+        thread_num=4,
+        range_size=10000,
+        batch_size=1000,
+        raw_output=False,
+    ):
+        """Returns a generator for individual account transactions, which
+        are fetched in parallel by :class:`AccountHistoryFetcher`.
+
+        The op index range ``[start, stop]`` is split into ranges of
+        ``range_size`` ops, which are downloaded concurrently from
+        different nodes and yielded in order.
+
+        :param int start: lowest virtual op index (*optional*, default is 0)
+        :param int stop: highest virtual op index (*optional*, default is
+            the current virtual op count)
+        :param int order: 1 for chronological, -1 for reverse order
+        :param array only_ops: Limit generator by these
+            operations (*optional*)
+        :param array exclude_ops: Exclude these operations from
+            generator (*optional*)
+        :param int thread_num: number of parallel downloads
+        :param int range_size: number of op indices in each range
+        :param int batch_size: internal api call batch size (*optional*)
+        :param bool raw_output: if False, the output is a dict, which
+            includes all values. Otherwise, the output is list.
+
+        .. code-block:: python
+
+            from nectar.account import Account
+            acc = Account("gtg")
+            for h in acc.history_parallel(only_ops=["producer_reward"], thread_num=8):
+                print(h)
+
+        """
+        fetcher = AccountHistoryFetcher(
+            self,
+            thread_num=thread_num,
+            range_size=range_size,
+            batch_size=batch_size,
+            blockchain_instance=self.blockchain,
+        )
+        return fetcher.history(
+            start=start,
+            stop=stop,
+            order=order,
+            only_ops=only_ops,
+            exclude_ops=exclude_ops,
+            raw_output=raw_output,
+        )
+
+    def sync_history(self, history_store=None, **kwargs):
+        """Downloads the ops of this account which are not yet in the local
+        history store and returns the number of new ops.
+
+        :param AccountHistoryStore history_store: local store (*optional*,
+            default is :class:`nectar.historystore.AccountHistoryStore` in the
+            user data dir)
+
+        All other arguments are passed to
+        :func:`nectar.historystore.AccountHistoryStore.sync`.
+
+        .. code-block:: python
+
+            from nectar.account import Account
+            from nectar.historystore import AccountHistoryStore
+            store = AccountHistoryStore()
+            acc = Account("gtg")
+            acc.sync_history(history_store=store)
+            for h in acc.history_reverse(only_ops=["transfer"], history_store=store):
+                print(h)
+
+        """
+        if history_store is None:
+            from .historystore import AccountHistoryStore
+
+            history_store = AccountHistoryStore(blockchain_instance=self.blockchain)
+        return history_store.sync(self, **kwargs)
+
     def mute(self, mute, account=None):
         """Mute another account
 
@@ -4268,6 +4420,192 @@ class Account(BlockchainObject):
                     return
 
 
+class AccountHistoryFetcher(object):
+    """Fetches the history of an account in parallel
+
+    The op index range of an account is split into ranges of
+    ``range_size`` ops. Every range is paged through
+    ``get_account_history`` on its own blockchain instance, so that
+    ``thread_num`` ranges are downloaded at the same time from the working
+    nodes. Ranges are yielded in order, and at most ``max_pending`` ranges
+    are held in memory.
+
+    :param str account: Account name or :class:`Account`
+    :param int thread_num: number of parallel downloads
+    :param int range_size: number of op indices in each range
+    :param int batch_size: internal api call batch size (max. 1000)
+    :param int max_pending: maximum number of downloaded or running
+        ranges, default is ``2 * thread_num``
+    :param Steem blockchain_instance: Steem instance
+
+    .. code-block:: python
+
+        from nectar.account import AccountHistoryFetcher
+        fetcher = AccountHistoryFetcher("gtg", thread_num=8)
+        for op in fetcher.history(only_ops=["transfer"], order=-1):
+            print(op)
+
+    """
+
+    def __init__(
+        self,
+        account,
+        thread_num=4,
+        range_size=10000,
+        batch_size=1000,
+        max_pending=None,
+        blockchain_instance=None,
+        **kwargs,
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if isinstance(account, Account):
+            self.account = account
+        else:
+            self.account = Account(account, blockchain_instance=self.blockchain)
+        self.name = self.account["name"]
+        self.thread_num = max(1, thread_num)
+        self.batch_size = max(1, min(batch_size, 1000))
+        self.range_size = max(range_size, self.batch_size)
+        self.max_pending = max_pending or 2 * self.thread_num
+        self._accounts = None
+
+    def _worker_accounts(self):
+        """One lazy account per thread, each one with its own blockchain instance"""
+        if self._accounts is None:
+            self._accounts = Queue()
+            for instance in node_instances(self.blockchain, self.thread_num):
+                self._accounts.put(
+                    Account({"name": self.name}, lazy=True, blockchain_instance=instance)
+                )
+        return self._accounts
+
+    def ranges(self, start, stop, order=1):
+        """Returns the list of ``(lowest, highest)`` op index ranges between
+        start and stop (both included)
+
+        :param int start: lowest op index
+        :param int stop: highest op index
+        :param int order: 1 for ascending ranges, -1 for descending ranges
+        """
+        ranges = []
+        lowest = start
+        while lowest <= stop:
+            highest = min(lowest + self.range_size - 1, stop)
+            ranges.append((lowest, highest))
+            lowest = highest + 1
+        if order == -1:
+            ranges.reverse()
+        return ranges
+
+    def fetch_range(self, lowest, highest, operation_filter_low=None, operation_filter_high=None):
+        """Returns all history items with an op index between lowest and
+        highest (both included) in ascending order.
+
+        The range is paged backwards from ``highest``. The next page starts
+        below the lowest returned index, so that the result does not depend
+        on whether a node returns ``limit`` or ``limit + 1`` items or
+        skips filtered ops.
+        """
+        accounts = self._worker_accounts()
+        account = accounts.get()
+        try:
+            pages = []
+            first = highest
+            while first >= lowest:
+                limit = max(1, min(self.batch_size, first))
+                try:
+                    items = account._get_account_history(
+                        account=self.name,
+                        start=first,
+                        limit=limit,
+                        operation_filter_low=operation_filter_low,
+                        operation_filter_high=operation_filter_high,
+                    )
+                except FilteredItemNotFound:
+                    items = []
+                if not items:
+                    break
+                pages.append([item for item in items if lowest <= item[0] <= first])
+                next_first = min(item[0] for item in items) - 1
+                if next_first >= first:
+                    break
+                first = next_first
+        finally:
+            accounts.put(account)
+        result = []
+        for page in reversed(pages):
+            result.extend(page)
+        return result
+
+    def history(
+        self, start=None, stop=None, order=1, only_ops=[], exclude_ops=[], raw_output=False
+    ):
+        """Returns a generator for the account history between the op
+        indices start and stop.
+
+        :param int start: lowest virtual op index (*optional*, default is 0)
+        :param int stop: highest virtual op index (*optional*, default is
+            the current virtual op count)
+        :param int order: 1 for chronological, -1 for reverse order
+        :param array only_ops: Limit generator by these
+            operations (*optional*)
+        :param array exclude_ops: Exclude these operations from
+            generator (*optional*)
+        :param bool raw_output: if False, the output is a dict, which
+            includes all values. Otherwise, the output is list.
+
+        ``only_ops`` and ``exclude_ops`` are sent as operation filter to
+        appbase nodes and are checked again on the received ops.
+        """
+        if order != -1 and order != 1:
+            raise ValueError("order must be -1 or 1!")
+        if start is None:
+            start = 0
+        if stop is None:
+            stop = self.account.virtual_op_count()
+        operation_filter_low = None
+        operation_filter_high = None
+        if self.blockchain.rpc.get_use_appbase():
+            operation_filter_low, operation_filter_high = self.account._get_operation_filter(
+                only_ops=only_ops, exclude_ops=exclude_ops
+            )
+        ranges = self.ranges(start, stop, order=order)
+        if self.thread_num == 1:
+            for lowest, highest in ranges:
+                items = self.fetch_range(
+                    lowest, highest, operation_filter_low, operation_filter_high
+                )
+                yield from self._yield_items(items, order, only_ops, exclude_ops, raw_output)
+            return
+
+        def fetch(item_range, attempt):
+            lowest, highest = item_range
+            return self.fetch_range(lowest, highest, operation_filter_low, operation_filter_high)
+
+        for items in shared_executor().imap(fetch, ranges, window=self.max_pending):
+            yield from self._yield_items(items, order, only_ops, exclude_ops, raw_output)
+
+    def _yield_items(self, items, order, only_ops, exclude_ops, raw_output):
+        if order == -1:
+            items = reversed(items)
+        for item in items:
+            item_index, event = item
+            op_type, op = _parse_history_event(event)
+            if exclude_ops and op_type in exclude_ops:
+                continue
+            if only_ops and op_type not in only_ops:
+                continue
+            if raw_output:
+                yield item
+            else:
+                yield _construct_history_op(item_index, event, op_type, op, self.name)
+
+
 class AccountsObject(list):
     def printAsTable(self):
         t = PrettyTable(["Name"])
@@ -4332,12 +4670,38 @@ class Accounts(AccountsObject):
     :param list name_list: list of accounts to fetch
     :param int batch_limit: (optional) maximum number of accounts
         to fetch per call, defaults to 100
+    :param bool lazy: Use lazy loading
+    :param bool full: Obtain all account data including orders, positions, etc.
+    :param bool raw_data: when True, the account dicts are kept as sent by the
+        node, without :class:`Account` objects and parsing (default: False)
+    :param int thread_num: number of batches which are fetched at the same
+        time, each one from its own node (default: 1)
     :param Steem/Hive blockchain_instance: Steem() or Hive() instance to use when
         accessing a RPCcreator = Account(creator, blockchain_instance=self)
+
+    The accounts are fetched with one ``find_accounts`` call per
+    ``batch_limit`` names, in the order of ``name_list``. Names which do not
+    exist are skipped. All :class:`Account` objects are added to the object
+    cache at once.
+
+    .. code-block:: python
+
+        from nectar.account import Accounts
+        for account in Accounts(["gtg", "holger80"]):
+            print(account["name"], account.get_voting_power())
+
     """
 
     def __init__(
-        self, name_list, batch_limit=100, lazy=False, full=True, blockchain_instance=None, **kwargs
+        self,
+        name_list,
+        batch_limit=100,
+        lazy=False,
+        full=True,
+        raw_data=False,
+        thread_num=1,
+        blockchain_instance=None,
+        **kwargs,
     ):
         if blockchain_instance is None:
             if kwargs.get("steem_instance"):
@@ -4348,24 +4712,39 @@ class Accounts(AccountsObject):
 
         if not self.blockchain.is_connected():
             return
-        accounts = []
-        name_cnt = 0
+        name_list = list(name_list)
+        batches = [name_list[i : i + batch_limit] for i in range(0, len(name_list), batch_limit)]
+        thread_num = min(thread_num, len(batches))
+        if thread_num > 1:
+            instances = Queue()
+            for instance in node_instances(self.blockchain, thread_num):
+                instances.put(instance)
+
+            def fetch(names, attempt):
+                instance = instances.get()
+                try:
+                    return self._fetch_accounts(instance, names)
+                finally:
+                    instances.put(instance)
 
-        while name_cnt < len(name_list):
-            self.blockchain.rpc.set_next_node_on_empty_reply(False)
-            if self.blockchain.rpc.get_use_appbase():
-                accounts += self.blockchain.rpc.find_accounts(
-                    {"accounts": name_list[name_cnt : batch_limit + name_cnt]}, api="database"
-                )["accounts"]
-            else:
-                accounts += self.blockchain.rpc.get_accounts(
-                    name_list[name_cnt : batch_limit + name_cnt]
-                )
-            name_cnt += batch_limit
+            results = list(shared_executor().imap(fetch, batches, window=thread_num))
+        else:
+            results = [self._fetch_accounts(self.blockchain, names) for names in batches]
+        accounts = [account for result in results for account in result]
 
-        super(Accounts, self).__init__(
-            [
-                Account(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
-                for x in accounts
-            ]
-        )
+        if raw_data:
+            super(Accounts, self).__init__(accounts)
+            return
+        with BlockchainObject.bulk_cache():
+            super(Accounts, self).__init__(
+                [
+                    Account(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
+                    for x in accounts
+                ]
+            )
+
+    def _fetch_accounts(self, blockchain, names):
+        blockchain.rpc.set_next_node_on_empty_reply(False)
+        if blockchain.rpc.get_use_appbase():
+            return blockchain.rpc.find_accounts({"accounts": names}, api="database")["accounts"]
+        return blockchain.rpc.get_accounts(names)
@@ -8,7 +8,13 @@ from nectargraphenebase.py23 import string_types
 
 from .blockchainobject import BlockchainObject
 from .exceptions import BlockDoesNotExistsException
-from .utils import formatTimeString
+from .utils import formatTimeString, formatToTimeStamp, timestampToDatetime
+
+
+def _json_time(value):
+    if isinstance(value, (datetime, date)):
+        return formatTimeString(value)
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
 
 
 class Block(BlockchainObject):
@@ -20,6 +26,9 @@ class Block(BlockchainObject):
     :param bool lazy: Use lazy loading
     :param bool only_ops: Includes only operations, when set to True (default: False)
     :param bool only_virtual_ops: Includes only virtual operations (default: False)
+    :param bool lazy_time: When True, ``timestamp`` is kept as epoch int and the
+        expiration of the transactions as string, :func:`time` still
+        returns a datetime (default: False)
 
     Instances of this class are dictionaries that come with additional
     methods (see below) that allow dealing with a block and its
@@ -50,6 +59,7 @@ class Block(BlockchainObject):
         full=True,
         lazy=False,
         blockchain_instance=None,
+        lazy_time=False,
         **kwargs,
     ):
         """Initilize a block
@@ -60,26 +70,37 @@ class Block(BlockchainObject):
         :param bool lazy: Use lazy loading
         :param bool only_ops: Includes only operations, when set to True (default: False)
         :param bool only_virtual_ops: Includes only virtual operations (default: False)
+        :param bool lazy_time: Keeps the timestamps as epoch int (default: False)
 
         """
         self.full = full
         self.lazy = lazy
         self.only_ops = only_ops
         self.only_virtual_ops = only_virtual_ops
+        self.lazy_time = lazy_time
         if isinstance(block, float):
             block = int(block)
         elif isinstance(block, dict):
-            block = self._parse_json_data(block)
+            block = self._parse_json_data(block, lazy_time=lazy_time)
         super(Block, self).__init__(
             block, lazy=lazy, full=full, blockchain_instance=blockchain_instance, **kwargs
         )
         if self.identifier is None:
             self.identifier = self.block_num
 
-    def _parse_json_data(self, block):
+    @staticmethod
+    def _parse_json_data(block, lazy_time=False):
         parse_times = [
             "timestamp",
         ]
+        if lazy_time:
+            for p in parse_times:
+                if p in block and isinstance(block.get(p), string_types):
+                    block[p] = formatToTimeStamp(block[p])
+            for op in block.get("operations", []):
+                if "timestamp" in op and isinstance(op["timestamp"], string_types):
+                    op["timestamp"] = formatToTimeStamp(op["timestamp"])
+            return block
         for p in parse_times:
             if p in block and isinstance(block.get(p), string_types):
                 block[p] = formatTimeString(block.get(p, "1970-01-01T00:00:00"))
@@ -103,52 +124,39 @@ class Block(BlockchainObject):
 
     def json(self):
         output = self.copy()
-        parse_times = [
-            "timestamp",
-        ]
-        for p in parse_times:
-            if p in output:
-                p_date = output.get(p, datetime(1970, 1, 1, 0, 0))
-                if isinstance(p_date, (datetime, date)):
-                    output[p] = formatTimeString(p_date)
-                else:
-                    output[p] = p_date
-
-        if "transactions" in output:
-            for i in range(len(output["transactions"])):
-                if "expiration" in output["transactions"][i] and isinstance(
-                    output["transactions"][i]["expiration"], (datetime, date)
-                ):
-                    output["transactions"][i]["expiration"] = formatTimeString(
-                        output["transactions"][i]["expiration"]
-                    )
-        elif "operations" in output:
-            for i in range(len(output["operations"])):
-                if "timestamp" in output["operations"][i] and isinstance(
-                    output["operations"][i]["timestamp"], (datetime, date)
-                ):
-                    output["operations"][i]["timestamp"] = formatTimeString(
-                        output["operations"][i]["timestamp"]
-                    )
-
-        ret = json.loads(str(json.dumps(output)))
-        output = self._parse_json_data(output)
-        return ret
+        if self.lazy_time:
+            if isinstance(output.get("timestamp"), int):
+                output["timestamp"] = formatTimeString(timestampToDatetime(output["timestamp"]))
+            if "operations" in output:
+                output["operations"] = [
+                    dict(op, timestamp=formatTimeString(timestampToDatetime(op["timestamp"])))
+                    if isinstance(op.get("timestamp"), int)
+                    else op
+                    for op in output["operations"]
+                ]
+        # datetimes are formatted while dumping, the block itself is not modified
+        return json.loads(json.dumps(output, default=_json_time))
+
+    @staticmethod
+    def get_raw(block_num, only_ops=False, only_virtual_ops=False, blockchain_instance=None):
+        """Returns the block as received from the node, as plain dict
+
+        Unlike :class:`Block`, the timestamps are not parsed and nothing is
+        stored in the object cache.
+
+        :param int block_num: block number
+        :param bool only_ops: Includes only operations, when set to True (default: False)
+        :param bool only_virtual_ops: Includes only virtual operations (default: False)
+        :param Steem blockchain_instance: Steem instance
 
-    def refresh(self):
-        """Even though blocks never change, you freshly obtain its contents
-        from an API with this method
         """
-        if self.identifier is None:
-            return
-        if not self.blockchain.is_connected():
-            return
-        self.blockchain.rpc.set_next_node_on_empty_reply(False)
-        if self.only_ops or self.only_virtual_ops:
-            if self.blockchain.rpc.get_use_appbase():
+        blockchain = blockchain_instance or shared_blockchain_instance()
+        blockchain.rpc.set_next_node_on_empty_reply(False)
+        if only_ops or only_virtual_ops:
+            if blockchain.rpc.get_use_appbase():
                 try:
-                    ops_ops = self.blockchain.rpc.get_ops_in_block(
-                        {"block_num": self.identifier, "only_virtual": self.only_virtual_ops},
+                    ops_ops = blockchain.rpc.get_ops_in_block(
+                        {"block_num": block_num, "only_virtual": only_virtual_ops},
                         api="account_history",
                     )
                     if ops_ops is None:
@@ -156,11 +164,11 @@ class Block(BlockchainObject):
                     else:
                         ops = ops_ops["ops"]
                 except ApiNotSupported:
-                    ops = self.blockchain.rpc.get_ops_in_block(
-                        self.identifier, self.only_virtual_ops, api="condenser"
+                    ops = blockchain.rpc.get_ops_in_block(
+                        block_num, only_virtual_ops, api="condenser"
                     )
             else:
-                ops = self.blockchain.rpc.get_ops_in_block(self.identifier, self.only_virtual_ops)
+                ops = blockchain.rpc.get_ops_in_block(block_num, only_virtual_ops)
             if bool(ops):
                 block = {
                     "block": ops[0]["block"],
@@ -169,27 +177,41 @@ class Block(BlockchainObject):
                 }
             else:
                 block = {
-                    "block": self.identifier,
+                    "block": block_num,
                     "timestamp": "1970-01-01T00:00:00",
                     "operations": [],
                 }
         else:
-            if self.blockchain.rpc.get_use_appbase():
+            if blockchain.rpc.get_use_appbase():
                 try:
-                    block = self.blockchain.rpc.get_block(
-                        {"block_num": self.identifier}, api="block"
-                    )
+                    block = blockchain.rpc.get_block({"block_num": block_num}, api="block")
                     if block and "block" in block:
                         block = block["block"]
                 except ApiNotSupported:
-                    block = self.blockchain.rpc.get_block(self.identifier, api="condenser")
+                    block = blockchain.rpc.get_block(block_num, api="condenser")
             else:
-                block = self.blockchain.rpc.get_block(self.identifier)
+                block = blockchain.rpc.get_block(block_num)
         if not block:
             raise BlockDoesNotExistsException(
-                "output: %s of identifier %s" % (str(block), str(self.identifier))
+                "output: %s of identifier %s" % (str(block), str(block_num))
             )
-        block = self._parse_json_data(block)
+        return block
+
+    def refresh(self):
+        """Even though blocks never change, you freshly obtain its contents
+        from an API with this method
+        """
+        if self.identifier is None:
+            return
+        if not self.blockchain.is_connected():
+            return
+        block = self.get_raw(
+            self.identifier,
+            only_ops=self.only_ops,
+            only_virtual_ops=self.only_virtual_ops,
+            blockchain_instance=self.blockchain,
+        )
+        block = self._parse_json_data(block, lazy_time=self.lazy_time)
         super(Block, self).__init__(
             block, lazy=self.lazy, full=self.full, blockchain_instance=self.blockchain
         )
@@ -206,6 +228,8 @@ class Block(BlockchainObject):
 
     def time(self):
         """Return a datetime instance for the timestamp of this block"""
+        if isinstance(self["timestamp"], int):
+            return timestampToDatetime(self["timestamp"])
         return self["timestamp"]
 
     @property
@@ -374,6 +398,8 @@ class BlockHeader(BlockchainObject):
 
     def time(self):
         """Return a datetime instance for the timestamp of this block"""
+        if isinstance(self["timestamp"], int):
+            return timestampToDatetime(self["timestamp"])
         return self["timestamp"]
 
     @property
@@ -4,178 +4,184 @@ import json
 import logging
 import math
 import time
+from collections import deque
+from collections.abc import Mapping
 from datetime import timedelta
-from threading import Event, Thread
-from time import sleep
+from queue import Queue
 
-import nectar as stm
 from nectar.instance import shared_blockchain_instance
-from nectarapi.exceptions import UnknownTransaction
+from nectarapi.exceptions import RPCError, UnknownTransaction
+from nectarbase.operationids import operations as operation_ids
 from nectargraphenebase.py23 import py23_bytes
 
 from .block import Block, BlockHeader
+from .blockindex import BlockIndex, shared_block_index
 from .exceptions import (
     BatchedCallsNotSupported,
     BlockDoesNotExistsException,
     BlockWaitTimeExceeded,
     OfflineHasNoRPCException,
 )
-from .utils import addTzInfo
+from .executor import node_instances, shared_executor
+from .headnotifier import shared_head_notifier
+from .utils import addTzInfo, formatToTimeStamp
 
 log = logging.getLogger(__name__)
-from queue import Queue
 
-FUTURES_MODULE = None
-if not FUTURES_MODULE:
-    try:
-        from concurrent.futures import ThreadPoolExecutor, as_completed, wait
-
-        FUTURES_MODULE = "futures"
-        # FUTURES_MODULE = None
-    except ImportError:
-        FUTURES_MODULE = None
-
-
-# default exception handler. if you want to take some action on failed tasks
-# maybe add the task back into the queue, then make your own handler and pass it in
-def default_handler(name, exception, *args, **kwargs):
-    log.warning(f"{name} raised {exception} with args {args!r} and kwargs {kwargs!r}")
-    pass
-
-
-class Worker(Thread):
-    """Thread executing tasks from a given tasks queue"""
-
-    def __init__(self, name, queue, results, abort, idle, exception_handler):
-        Thread.__init__(self)
-        self.name = name
-        self.queue = queue
-        self.results = results
-        self.abort = abort
-        self.idle = idle
-        self.exception_handler = exception_handler
-        self.daemon = True
-        self.start()
-
-    def run(self):
-        """Thread work loop calling the function with the params"""
-        # keep running until told to abort
-        while not self.abort.is_set():
-            try:
-                # get a task and raise immediately if none available
-                func, args, kwargs = self.queue.get(False)
-                self.idle.clear()
-            except Exception:
-                # no work to do
-                # if not self.idle.is_set():
-                #  print >> stdout, '%s is idle' % self.name
-                self.idle.set()
-                # time.sleep(1)
-                continue
 
-            try:
-                # the function may raise
-                result = func(*args, **kwargs)
-                # print(result)
-                if result is not None:
-                    self.results.put(result)
-            except Exception as e:
-                # so we move on and handle it in whatever way the caller wanted
-                self.exception_handler(self.name, e, args, kwargs)
-            finally:
-                # task complete no matter what happened
-                self.queue.task_done()
-
-
-# class for thread pool
-class Pool:
-    """Pool of threads consuming tasks from a queue"""
-
-    def __init__(self, thread_count, batch_mode=True, exception_handler=default_handler):
-        # batch mode means block when adding tasks if no threads available to process
-        self.queue = Queue(thread_count if batch_mode else 0)
-        self.resultQueue = Queue(0)
-        self.thread_count = thread_count
-        self.exception_handler = exception_handler
-        self.aborts = []
-        self.idles = []
-        self.threads = []
-
-    def __del__(self):
-        """Tell my threads to quit"""
-        self.abort()
-
-    def run(self, block=False):
-        """Start the threads, or restart them if you've aborted"""
-        # either wait for them to finish or return false if some arent
-        if block:
-            while self.alive():
-                sleep(1)
-        elif self.alive():
-            return False
+def virtual_op_filter(opNames):
+    """Returns the ``enum_virtual_ops`` filter bitmask of the given
+    virtual operations, or None when a name is not a known virtual operation
 
-        # go start them
-        self.aborts = []
-        self.idles = []
-        self.threads = []
-        for n in range(self.thread_count):
-            abort = Event()
-            idle = Event()
-            self.aborts.append(abort)
-            self.idles.append(idle)
-            self.threads.append(
-                Worker(
-                    "thread-%d" % n,
-                    self.queue,
-                    self.resultQueue,
-                    abort,
-                    idle,
-                    self.exception_handler,
-                )
-            )
-        return True
-
-    def enqueue(self, func, *args, **kargs):
-        """Add a task to the queue"""
-        self.queue.put((func, args, kargs))
-
-    def join(self):
-        """Wait for completion of all the tasks in the queue"""
-        self.queue.join()
-
-    def abort(self, block=False):
-        """Tell each worker that its done working"""
-        # tell the threads to stop after they are done with what they are currently doing
-        for a in self.aborts:
-            a.set()
-        # wait for them to finish if requested
-        while block and self.alive():
-            sleep(1)
-
-    def alive(self):
-        """Returns True if any threads are currently running"""
-        return True in [t.is_alive() for t in self.threads]
-
-    def idle(self):
-        """Returns True if all threads are waiting for work"""
-        return False not in [i.is_set() for i in self.idles]
-
-    def done(self):
-        """Returns True if not tasks are left to be completed"""
-        return self.queue.empty()
-
-    def results(self, sleep_time=0):
-        """Get the set of results that have been processed, repeatedly call until done"""
-        sleep(sleep_time)
-        results = []
-        try:
-            while True:
-                # get a result, raises empty exception immediately if none available
-                results.append(self.resultQueue.get(False))
-                self.resultQueue.task_done()
-        except Exception:
-            return results
-        return results
+    :param list opNames: operation names, e.g. ``["producer_reward", "fill_order"]``
+    """
+    first_virtual_op = operation_ids["fill_convert_request"]
+    mask = 0
+    for name in opNames:
+        if name.endswith("_operation"):
+            name = name[:-10]
+        if operation_ids.get(name, -1) < first_virtual_op:
+            return None
+        mask |= 1 << (operation_ids[name] - first_virtual_op)
+    return mask
+
+
+class OpView(Mapping):
+    """Read-only operation streamed by :func:`Blockchain.stream` with ``op_view=True``
+
+    The view references the operation dict of the block instead of copying
+    it into a new dict. ``_id`` is hashed on first access. Keys and values
+    are the same as of the dict which ``stream()`` yields by default, and
+    the fields are also attributes:
+
+    .. code-block:: python
+
+        for op in b.stream(opNames=["transfer"], op_view=True):
+            print(op.type, op["from"], op["amount"], op.block_num)
+            row = op.to_dict()
+
+    The operation dict is shared with the block, it must not be modified.
+    """
+
+    __slots__ = ("type", "op", "block_num", "trx_num", "trx_id", "timestamp", "_event", "_hash")
+    _fields = ("_id", "timestamp", "block_num", "trx_num", "trx_id")
+
+    def __init__(self, op_type, op, event, block_num, trx_num, trx_id, timestamp):
+        self.type = op_type
+        self.op = op
+        self.block_num = block_num
+        self.trx_num = trx_num
+        self.trx_id = trx_id
+        self.timestamp = timestamp
+        # hashed on access of _id
+        self._event = event
+        self._hash = None
+
+    @property
+    def _id(self):
+        if self._hash is None:
+            self._hash = Blockchain.hash_op(self._event)
+        return self._hash
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        if key in self.op:
+            return self.op[key]
+        if key == "type":
+            return self.type
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == "type" or key in self._fields or key in self.op
+
+    def __iter__(self):
+        yield "type"
+        for key in self.op:
+            if key != "type" and key not in self._fields:
+                yield key
+        for key in self._fields:
+            yield key
+
+    def __len__(self):
+        return (
+            len(self._fields)
+            + 1
+            + sum(1 for key in self.op if key != "type" and key not in self._fields)
+        )
+
+    def to_dict(self):
+        """Returns the operation as dict"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return "<%s %s block_num=%s trx_num=%s>" % (
+            self.__class__.__name__,
+            self.type,
+            self.block_num,
+            self.trx_num,
+        )
+
+
+class BlockRecord(Mapping):
+    """Read-only block yielded by :func:`Blockchain.blocks` with ``block_records=True``
+
+    The record keeps the fields which are needed to stream operations and
+    to follow the chain, the other header fields (signatures, merkle root,
+    extensions) are dropped. Timestamps are kept as received from the node.
+    The fields are keys and attributes:
+
+    .. code-block:: python
+
+        for block in b.blocks(start=80000000, stop=80000100, block_records=True):
+            print(block.block_num, block["block_id"], len(block.transactions))
+
+    """
+
+    __slots__ = (
+        "id",
+        "block_id",
+        "previous",
+        "timestamp",
+        "witness",
+        "transaction_ids",
+        "transactions",
+        "operations",
+    )
+
+    def __init__(self, block, block_num):
+        self.id = block_num
+        for key in self.__slots__[1:]:
+            setattr(self, key, block.get(key))
+
+    @property
+    def block_num(self):
+        return self.id
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __iter__(self):
+        for key in self.__slots__:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def to_dict(self):
+        """Returns the block as dict"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.id)
 
 
 class Blockchain(object):
@@ -187,6 +193,21 @@ class Blockchain(object):
         actual head block (``head``)
     :param int max_block_wait_repetition: maximum wait repetition for next block
         where each repetition is block_interval long (default is 3)
+    :param BlockIndex block_index: block time index used by
+        :func:`get_estimated_block_num`, which also learns from the blocks
+        returned by :func:`blocks`. Default is the in-memory index of the chain,
+        which is shared inside the process (see
+        :func:`nectar.blockindex.shared_block_index`) and is not fed by
+        :func:`blocks`. Pass a :class:`nectar.blockindex.BlockIndex` with a
+        ``data_dir`` or ``profile`` to keep the checkpoints on disk.
+        ``False`` disables the index.
+    :param bool lazy_time: blocks from :func:`blocks` and :func:`stream`
+        keep their timestamps as epoch int (see :class:`nectar.block.Block`), which
+        saves parsing every transaction expiration (default: False)
+    :param HeadNotifier head_notifier: waits for new blocks, once the streams
+        have reached the head block. Default is the notifier which is shared
+        by all streams of the chain (see
+        :func:`nectar.headnotifier.shared_head_notifier`)
 
     This class let's you deal with blockchain related data and methods.
     Read blockchain related data:
@@ -234,6 +255,9 @@ class Blockchain(object):
         mode="irreversible",
         max_block_wait_repetition=None,
         data_refresh_time_seconds=900,
+        block_index=None,
+        lazy_time=False,
+        head_notifier=None,
         **kwargs,
     ):
         if blockchain_instance is None:
@@ -254,10 +278,34 @@ class Blockchain(object):
         else:
             self.max_block_wait_repetition = 3
         self.block_interval = self.blockchain.get_block_interval()
+        self.block_index = block_index
+        self.lazy_time = lazy_time
+        self.head_notifier = head_notifier
 
     def is_irreversible_mode(self):
         return self.mode == "last_irreversible_block_num"
 
+    def _notifier(self):
+        if self.head_notifier is None:
+            self.head_notifier = shared_head_notifier(self.blockchain)
+        return self.head_notifier
+
+    def wait_for_block_num(self, block_num, timeout=None):
+        """Waits until the current block number (see :func:`get_current_block_num`)
+        has reached ``block_num`` and returns it
+
+        :param int block_num: block number to wait for
+        :param float timeout: when set, the current block number is returned after
+            ``timeout`` seconds, even when it is smaller than ``block_num``
+
+        """
+        props = self._notifier().wait_for(
+            block_num, key=self.mode, timeout=timeout, blockchain_instance=self.blockchain
+        )
+        if props is None:
+            raise ValueError("Could not receive dynamic_global_properties!")
+        return int(props[self.mode])
+
     def is_transaction_existing(self, transaction_id):
         """Returns true, if the transaction_id is valid"""
         try:
@@ -343,8 +391,10 @@ class Blockchain(object):
             True
 
         """
-        last_block = self.get_current_block()
         date = addTzInfo(date)
+        if accurate and self.block_index is not False:
+            return self._get_indexed_block_num(date)
+        last_block = self.get_current_block()
         if estimateForwards:
             block_offset = 10
             first_block = BlockHeader(block_offset, blockchain_instance=self.blockchain)
@@ -394,6 +444,41 @@ class Blockchain(object):
 
         return int(block_number)
 
+    def _get_indexed_block_num(self, date):
+        """Estimates the block number of a date from the block index and
+        verifies it by fetching block headers. Every fetched header is added
+        to the index, so that a date close to an indexed checkpoint needs at
+        most one fetch."""
+        block_index = self.block_index
+        if block_index is None:
+            block_index = shared_block_index(self.blockchain)
+        props = self.blockchain.get_dynamic_global_properties(False)
+        if props is None:
+            raise ValueError("Could not receive dynamic_global_properties!")
+        last_block_num = int(props[self.mode])
+        block_index.add_block(props["head_block_number"], props["time"])
+        timestamp = formatToTimeStamp(date)
+        block_number = block_index.estimate_block_num(timestamp, self.block_interval)
+        block_number = min(max(block_number, 1), last_block_num)
+        visited = set()
+        while block_number not in visited:
+            visited.add(block_number)
+            block_timestamp = block_index.get_timestamp(block_number)
+            if block_timestamp is None:
+                block = BlockHeader(block_number, blockchain_instance=self.blockchain)
+                block_timestamp = formatToTimeStamp(block.time())
+                block_index.add_block(block_number, block_timestamp)
+            block_time_diff = timestamp - block_timestamp
+            if -self.block_interval <= block_time_diff <= self.block_interval:
+                break
+            next_block_number = block_index.estimate_block_num(timestamp, self.block_interval)
+            if next_block_number == block_number:
+                next_block_number += 1 if block_time_diff > 0 else -1
+            if next_block_number < 1 or next_block_number > last_block_num:
+                return int(next_block_number)
+            block_number = next_block_number
+        return int(block_number)
+
     def block_time(self, block_num):
         """Returns a datetime of the block with the given block
         number.
@@ -434,6 +519,8 @@ class Blockchain(object):
         thread_num=8,
         only_ops=False,
         only_virtual_ops=False,
+        raw_blocks=False,
+        block_records=False,
     ):
         """Yields blocks starting from ``start``.
 
@@ -446,142 +533,77 @@ class Blockchain(object):
         :param bool only_ops: Only yield operations (default: False).
             Cannot be combined with ``only_virtual_ops=True``.
         :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param bool raw_blocks: Yield the blocks as plain dicts as received from the
+            node, with the block number as ``id`` (default: False)
+        :param bool block_records: Yield the blocks as :class:`BlockRecord` (default: False)
+
+        Raw blocks and block records are neither parsed nor stored in the
+        object cache of :class:`nectar.block.Block`, and they do not
+        reference the blockchain instance. The memory of a long replay then
+        stays flat, and :func:`stream` passes both options on.
 
         .. note:: If you want instant confirmation, you need to instantiate
                   class:`nectar.blockchain.Blockchain` with
                   ``mode="head"``, otherwise, the call will wait until
-                  confirmed in an irreversible block.
+                  confirmed in an irreversible block. Head blocks can be
+                  replaced by micro-forks, :func:`block_events` reports them.
 
         """
+        observe_blocks = isinstance(self.block_index, BlockIndex)
         # Let's find out how often blocks are generated!
         current_block = self.get_current_block()
         current_block_num = current_block.block_num
         if not start:
             start = current_block_num
         head_block_reached = False
-        if threading and FUTURES_MODULE is not None:
-            pool = ThreadPoolExecutor(max_workers=thread_num)
-        elif threading:
-            pool = Pool(thread_num, batch_mode=True)
         if threading:
-            blockchain_instance = [self.blockchain]
-            nodelist = self.blockchain.rpc.nodes.export_working_nodes()
-            for i in range(thread_num - 1):
-                blockchain_instance.append(
-                    stm.Steem(
-                        node=nodelist,
-                        num_retries=self.blockchain.rpc.num_retries,
-                        num_retries_call=self.blockchain.rpc.num_retries_call,
-                        timeout=self.blockchain.rpc.timeout,
+            # one instance per thread, the rpc of an instance is not shared between threads
+            instances = Queue()
+            for instance in node_instances(self.blockchain, thread_num):
+                instances.put(instance)
+
+            def fetch_block(blocknum, attempt):
+                instance = instances.get()
+                try:
+                    if attempt:
+                        # the former attempt failed or hangs on the current node
+                        instance.rpc.next()
+                    block = self._fetch_block(
+                        blocknum,
+                        only_ops=only_ops,
+                        only_virtual_ops=only_virtual_ops,
+                        raw_blocks=raw_blocks,
+                        block_records=block_records,
+                        blockchain_instance=instance,
                     )
-                )
+                finally:
+                    instances.put(instance)
+                if isinstance(block, Block):
+                    if block.block_num is None:
+                        raise BlockDoesNotExistsException(str(blocknum))
+                    block["id"] = block.block_num
+                    block.identifier = block.block_num
+                return block
+
         # We are going to loop indefinitely
-        latest_block = 0
         while True:
             if stop:
                 head_block = stop
             else:
-                current_block_num = self.get_current_block_num()
                 head_block = current_block_num
             if threading and not head_block_reached:
-                latest_block = start - 1
-                result_block_nums = []
-                for blocknum in range(start, head_block + 1, thread_num):
-                    # futures = []
-                    i = 0
-                    if FUTURES_MODULE is not None:
-                        futures = []
-                    block_num_list = []
-                    # freeze = self.blockchain.rpc.nodes.freeze_current_node
-                    num_retries = self.blockchain.rpc.nodes.num_retries
-                    # self.blockchain.rpc.nodes.freeze_current_node = True
-                    self.blockchain.rpc.nodes.num_retries = thread_num
-                    error_cnt = self.blockchain.rpc.nodes.node.error_cnt
-                    while i < thread_num and blocknum + i <= head_block:
-                        block_num_list.append(blocknum + i)
-                        results = []
-                        if FUTURES_MODULE is not None:
-                            futures.append(
-                                pool.submit(
-                                    Block,
-                                    blocknum + i,
-                                    only_ops=only_ops,
-                                    only_virtual_ops=only_virtual_ops,
-                                    blockchain_instance=blockchain_instance[i],
-                                )
-                            )
-                        else:
-                            pool.enqueue(
-                                Block,
-                                blocknum + i,
-                                only_ops=only_ops,
-                                only_virtual_ops=only_virtual_ops,
-                                blockchain_instance=blockchain_instance[i],
-                            )
-                        i += 1
-                    if FUTURES_MODULE is not None:
-                        try:
-                            results = [r.result() for r in as_completed(futures)]
-                        except Exception as e:
-                            log.error(str(e))
-                    else:
-                        pool.run(True)
-                        pool.join()
-                        for result in pool.results():
-                            results.append(result)
-                        pool.abort()
-                    self.blockchain.rpc.nodes.num_retries = num_retries
-                    # self.blockchain.rpc.nodes.freeze_current_node = freeze
-                    new_error_cnt = self.blockchain.rpc.nodes.node.error_cnt
-                    self.blockchain.rpc.nodes.node.error_cnt = error_cnt
-                    if new_error_cnt > error_cnt:
-                        self.blockchain.rpc.nodes.node.error_cnt += 1
-                    #    self.blockchain.rpc.next()
-
-                    checked_results = []
-                    for b in results:
-                        if b.block_num is not None and int(b.block_num) not in result_block_nums:
-                            b["id"] = b.block_num
-                            b.identifier = b.block_num
-                            checked_results.append(b)
-                            result_block_nums.append(int(b.block_num))
-
-                    missing_block_num = list(set(block_num_list).difference(set(result_block_nums)))
-                    while len(missing_block_num) > 0:
-                        for blocknum in missing_block_num:
-                            try:
-                                block = Block(
-                                    blocknum,
-                                    only_ops=only_ops,
-                                    only_virtual_ops=only_virtual_ops,
-                                    blockchain_instance=self.blockchain,
-                                )
-                                checked_results.append(block)
-                                result_block_nums.append(int(block.block_num))
-                            except Exception as e:
-                                log.error(str(e))
-                        missing_block_num = list(
-                            set(block_num_list).difference(set(result_block_nums))
-                        )
-                    from operator import itemgetter
-
-                    blocks = sorted(checked_results, key=itemgetter("id"))
-                    for b in blocks:
-                        if latest_block < int(b.block_num):
-                            latest_block = int(b.block_num)
-                        yield b
-
-                if latest_block <= head_block:
-                    for blocknum in range(latest_block + 1, head_block + 1):
-                        if blocknum not in result_block_nums:
-                            block = Block(
-                                blocknum,
-                                only_ops=only_ops,
-                                only_virtual_ops=only_virtual_ops,
-                                blockchain_instance=self.blockchain,
-                            )
-                            result_block_nums.append(blocknum)
-                            yield block
+                # yields block N as soon as it is fetched, a block which takes longer
+                # than the rpc timeout is requested again from the next node
+                for block in shared_executor().imap(
+                    fetch_block,
+                    range(start, head_block + 1),
+                    window=thread_num,
+                    timeout=self.blockchain.rpc.timeout,
+                    retries=thread_num - 1,
+                ):
+                    if observe_blocks:
+                        self._observe_block(block)
+                    yield block
             elif (
                 max_batch_size is not None
                 and (head_block - start) >= max_batch_size
@@ -590,7 +612,6 @@ class Blockchain(object):
                 if not self.blockchain.is_connected():
                     raise OfflineHasNoRPCException("No RPC available in offline mode!")
                 self.blockchain.rpc.set_next_node_on_empty_reply(False)
-                latest_block = start - 1
                 batches = max_batch_size
                 for blocknumblock in range(start, head_block + 1, batches):
                     # Get full block
@@ -643,14 +664,21 @@ class Blockchain(object):
                                 }
                             else:
                                 block = block["block"]
-                        block = Block(
-                            block,
-                            only_ops=only_ops,
-                            only_virtual_ops=only_virtual_ops,
-                            blockchain_instance=self.blockchain,
-                        )
-                        block["id"] = block.block_num
-                        block.identifier = block.block_num
+                        if raw_blocks or block_records:
+                            block_num = block.get("id") or int(block["block_id"][:8], 16)
+                            block = self._raw_block(block, block_num, block_records)
+                        else:
+                            block = Block(
+                                block,
+                                only_ops=only_ops,
+                                only_virtual_ops=only_virtual_ops,
+                                lazy_time=self.lazy_time,
+                                blockchain_instance=self.blockchain,
+                            )
+                            block["id"] = block.block_num
+                            block.identifier = block.block_num
+                        if observe_blocks:
+                            self._observe_block(block)
                         yield block
             else:
                 # Blocks from start until head block
@@ -662,7 +690,11 @@ class Blockchain(object):
                         only_virtual_ops=only_virtual_ops,
                         block_number_check_cnt=5,
                         last_current_block_num=current_block_num,
+                        raw_blocks=raw_blocks,
+                        block_records=block_records,
                     )
+                    if observe_blocks:
+                        self._observe_block(block)
                     yield block
             # Set new start
             start = head_block + 1
@@ -671,8 +703,174 @@ class Blockchain(object):
             if stop and start > stop:
                 return
 
-            # Sleep for one block
-            time.sleep(self.block_interval)
+            current_block_num = self.wait_for_block_num(start)
+
+    def virtual_op_blocks(
+        self,
+        start=None,
+        stop=None,
+        opNames=None,
+        block_range=1000,
+        limit=1000,
+        raw_blocks=False,
+        block_records=False,
+    ):
+        """Yields the virtual operations of a block range, grouped per block
+
+        :param int start: Starting block
+        :param int stop: Stop at this block, streams forever when not set
+        :param list opNames: virtual operations to yield, all when not set
+        :param int block_range: number of blocks which are enumerated per call (default: 1000)
+        :param int limit: maximum number of operations per call (default: 1000)
+        :param bool raw_blocks: Yield plain dicts (see :func:`blocks`)
+        :param bool block_records: Yield :class:`BlockRecord` objects
+
+        The operations are filtered by the node
+        (``account_history_api.enum_virtual_ops``), blocks without matching
+        operations are skipped. Each yielded :class:`nectar.block.Block` is
+        built with ``only_virtual_ops=True`` as in :func:`blocks`.
+        Requires an appbase node.
+
+        .. code-block:: python
+
+            from nectar.blockchain import Blockchain
+            b = Blockchain()
+            for block in b.virtual_op_blocks(start=80000000, stop=80000100,
+                                             opNames=["producer_reward"]):
+                print(block.block_num, len(block.operations))
+
+        """
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        op_filter = None
+        if opNames:
+            op_filter = virtual_op_filter(opNames)
+            if op_filter is None:
+                raise ValueError("opNames must contain only virtual operations!")
+        observe_blocks = isinstance(self.block_index, BlockIndex)
+        if not start:
+            start = self.get_current_block_num()
+        while True:
+            if stop:
+                head_block = stop
+            else:
+                head_block = self.wait_for_block_num(start)
+            # ops of the current block are kept until a page ends behind it
+            pending_num = None
+            pending_ops = []
+            while start <= head_block:
+                end = min(start + block_range, head_block + 1)
+                operation_begin = 0
+                while True:
+                    query = {
+                        "block_range_begin": start,
+                        "block_range_end": end,
+                        "include_reversible": not self.is_irreversible_mode(),
+                        "group_by_block": False,
+                        "limit": limit,
+                    }
+                    if operation_begin:
+                        query["operation_begin"] = operation_begin
+                    if op_filter is not None:
+                        query["filter"] = op_filter
+                    self.blockchain.rpc.set_next_node_on_empty_reply(False)
+                    ret = self.blockchain.rpc.enum_virtual_ops(query, api="account_history")
+                    for op in ret.get("ops", []):
+                        if op["block"] != pending_num:
+                            if pending_ops:
+                                block = self._virtual_op_block(
+                                    pending_num, pending_ops, raw_blocks, block_records
+                                )
+                                if observe_blocks:
+                                    self._observe_block(block)
+                                yield block
+                            pending_num = op["block"]
+                            pending_ops = []
+                        pending_ops.append(op)
+                    next_begin = ret.get("next_block_range_begin", end)
+                    operation_begin = ret.get("next_operation_begin", 0)
+                    if not operation_begin or next_begin >= end:
+                        break
+                    start = next_begin
+                # all ops of the range are known, the node may point past empty blocks
+                start = max(end, ret.get("next_block_range_begin", end))
+                if pending_ops:
+                    block = self._virtual_op_block(
+                        pending_num, pending_ops, raw_blocks, block_records
+                    )
+                    if observe_blocks:
+                        self._observe_block(block)
+                    yield block
+                    pending_num = None
+                    pending_ops = []
+            if stop:
+                return
+            start = max(start, head_block + 1)
+
+    def _virtual_op_block(self, block_num, ops, raw_blocks=False, block_records=False):
+        block = {
+            "block": block_num,
+            "timestamp": ops[0]["timestamp"],
+            "id": block_num,
+            "operations": ops,
+        }
+        if raw_blocks or block_records:
+            return self._raw_block(block, block_num, block_records)
+        block = Block(
+            block,
+            only_virtual_ops=True,
+            lazy_time=self.lazy_time,
+            blockchain_instance=self.blockchain,
+        )
+        block["id"] = block.block_num
+        block.identifier = block.block_num
+        return block
+
+    def _fetch_block(
+        self,
+        block_num,
+        only_ops=False,
+        only_virtual_ops=False,
+        raw_blocks=False,
+        block_records=False,
+        blockchain_instance=None,
+    ):
+        """Returns a :class:`nectar.block.Block`, or a raw block (see :func:`blocks`)"""
+        blockchain = blockchain_instance or self.blockchain
+        if not raw_blocks and not block_records:
+            return Block(
+                block_num,
+                only_ops=only_ops,
+                only_virtual_ops=only_virtual_ops,
+                lazy_time=self.lazy_time,
+                blockchain_instance=blockchain,
+            )
+        block = Block.get_raw(
+            block_num,
+            only_ops=only_ops,
+            only_virtual_ops=only_virtual_ops,
+            blockchain_instance=blockchain,
+        )
+        return self._raw_block(block, block_num, block_records)
+
+    @staticmethod
+    def _raw_block(block, block_num, block_records=False):
+        if block_records:
+            return BlockRecord(block, block_num)
+        block["id"] = block_num
+        return block
+
+    @staticmethod
+    def _block_num(block):
+        if isinstance(block, (Block, BlockRecord)):
+            return block.block_num
+        return block.get("id")
+
+    def _observe_block(self, block):
+        if isinstance(block, Block):
+            self.block_index.observe_block(block)
+        elif "timestamp" in block:
+            self.block_index.add_block(block["id"], block["timestamp"], force=False)
 
     def wait_for_and_get_block(
         self,
@@ -682,6 +880,8 @@ class Blockchain(object):
         only_virtual_ops=False,
         block_number_check_cnt=-1,
         last_current_block_num=None,
+        raw_blocks=False,
+        block_records=False,
     ):
         """Get the desired block from the chain, if the current head block is smaller (for both head and irreversible)
         then we wait, but a maxmimum of blocks_waiting_for * max_block_wait_repetition time before failure.
@@ -693,6 +893,8 @@ class Blockchain(object):
         :param bool only_virtual_ops: Includes only virtual operations (default: False)
         :param int block_number_check_cnt: limit the number of retries when greater than -1
         :param int last_current_block_num: can be used to reduce the number of get_current_block_num() api calls
+        :param bool raw_blocks: Returns the block as plain dict (see :func:`blocks`)
+        :param bool block_records: Returns the block as :class:`BlockRecord`
 
         """
         if last_current_block_num is None:
@@ -703,35 +905,28 @@ class Blockchain(object):
         if not blocks_waiting_for:
             blocks_waiting_for = max(1, block_number - last_current_block_num)
 
-            repetition = 0
             # can't return the block before the chain has reached it (support future block_num)
-            while last_current_block_num < block_number:
-                repetition += 1
-                time.sleep(self.block_interval)
-                if last_current_block_num - block_number < 50:
-                    last_current_block_num = self.get_current_block_num()
-                if repetition > blocks_waiting_for * self.max_block_wait_repetition:
-                    raise BlockWaitTimeExceeded(
-                        "Already waited %d s"
-                        % (
-                            blocks_waiting_for
-                            * self.max_block_wait_repetition
-                            * self.block_interval
-                        )
-                    )
+            if last_current_block_num < block_number:
+                timeout = blocks_waiting_for * self.max_block_wait_repetition * self.block_interval
+                last_current_block_num = self.wait_for_block_num(block_number, timeout=timeout)
+                if last_current_block_num < block_number:
+                    raise BlockWaitTimeExceeded("Already waited %d s" % timeout)
         # block has to be returned properly
         repetition = 0
         cnt = 0
         block = None
         while (
-            block is None or block.block_num is None or int(block.block_num) != block_number
+            block is None
+            or self._block_num(block) is None
+            or int(self._block_num(block)) != block_number
         ) and (block_number_check_cnt < 0 or cnt < block_number_check_cnt):
             try:
-                block = Block(
+                block = self._fetch_block(
                     block_number,
                     only_ops=only_ops,
                     only_virtual_ops=only_virtual_ops,
-                    blockchain_instance=self.blockchain,
+                    raw_blocks=raw_blocks,
+                    block_records=block_records,
                 )
                 cnt += 1
             except BlockDoesNotExistsException:
@@ -750,6 +945,128 @@ class Blockchain(object):
 
         return block
 
+    def block_events(self, start=None, stop=None):
+        """Yields new head blocks as events and detects micro-forks
+
+        Blocks are yielded as soon as they reach the head block, as with
+        ``mode="head"``, but the ``previous`` id of each block is compared
+        with the id of the block before. Yielded blocks which are not
+        irreversible yet are kept in a buffer, so a fork can roll them back.
+
+        :param int start: first block (default: current head block)
+        :param int stop: last block, the generator ends when this block has
+            become irreversible (default: stream forever)
+
+        Each event is a dict with ``type``, ``block_num``, ``block_id`` and
+        ``block``, where ``type`` is one of:
+
+        * ``block``: a new block
+        * ``rollback``: a yielded block was removed by a fork. Rollbacks are
+          yielded from the highest block downwards.
+        * ``replace``: the block of the new fork at the height of a rolled
+          back block
+        * ``irreversible``: the last irreversible block has passed a yielded
+          block, it cannot change anymore
+
+        .. code-block:: python
+
+            from nectar.blockchain import Blockchain
+
+            chain = Blockchain(mode="head")
+            for event in chain.block_events():
+                if event["type"] in ["block", "replace"]:
+                    print("apply", event["block_num"], event["block_id"])
+                elif event["type"] == "rollback":
+                    print("undo", event["block_num"], event["block_id"])
+
+        """
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        notifier = self._notifier()
+        props = self.blockchain.get_dynamic_global_properties(False)
+        notifier.publish(props)
+        head_block_num = props["head_block_number"]
+        irreversible_num = props["last_irreversible_block_num"]
+        block_num = start or head_block_num
+        # (block_num, block_id, block) of the yielded blocks above the last irreversible block
+        reversible = deque()
+        # (block_num, block_id) of the last yielded block, for the previous check
+        last = None
+        # blocks up to this number were rolled back, their successors are replacements
+        rolled_back = 0
+        # whether the buffer was checked against the chain since the properties were read
+        verified = True
+
+        def event(event_type, num, block_id, block):
+            return {"type": event_type, "block_num": num, "block_id": block_id, "block": block}
+
+        def roll_back():
+            nonlocal block_num, last, rolled_back
+            num, old_id, old_block = reversible.pop()
+            log.warning("Block %d was replaced by a fork" % num)
+            rolled_back = max(rolled_back, num)
+            # all yielded blocks are linked, the parent is the previous block
+            last = (num - 1, old_block["previous"])
+            block_num = num
+            return event("rollback", num, old_id, old_block)
+
+        def get_block(num):
+            try:
+                return Block(num, lazy_time=self.lazy_time, blockchain_instance=self.blockchain)
+            except BlockDoesNotExistsException:
+                return None
+
+        while True:
+            if reversible and reversible[0][0] <= irreversible_num:
+                if not verified:
+                    # the node may have switched to another fork since the last block was read
+                    block = get_block(reversible[-1][0])
+                    if block is None or block["block_id"] != reversible[-1][1]:
+                        yield roll_back()
+                        continue
+                    verified = True
+                while reversible and reversible[0][0] <= irreversible_num:
+                    yield event("irreversible", *reversible.popleft())
+            if stop and block_num > stop and not reversible:
+                return
+            if stop and block_num > stop:
+                # wait until the remaining blocks are irreversible
+                props = notifier.wait_for(
+                    reversible[0][0],
+                    key="last_irreversible_block_num",
+                    blockchain_instance=self.blockchain,
+                )
+                block = None
+            elif block_num > head_block_num:
+                props = notifier.wait_for(block_num, blockchain_instance=self.blockchain)
+                block = None
+            else:
+                block = get_block(block_num)
+                if block is None:
+                    # the node switched to a shorter fork or is behind its own head
+                    time.sleep(self.block_interval)
+                    props = self.blockchain.get_dynamic_global_properties(False)
+            if block is None:
+                head_block_num = props["head_block_number"]
+                irreversible_num = props["last_irreversible_block_num"]
+                verified = False
+                continue
+            block_id = block["block_id"]
+            if last is not None and block_num == last[0] + 1 and block["previous"] != last[1]:
+                if reversible:
+                    yield roll_back()
+                    continue
+                log.error(
+                    "Block %d does not follow the irreversible block %d (%s)"
+                    % (block_num, last[0], last[1])
+                )
+            event_type = "replace" if block_num <= rolled_back else "block"
+            reversible.append((block_num, block_id, block))
+            last = (block_num, block_id)
+            verified = True
+            yield event(event_type, block_num, block_id, block)
+            block_num += 1
+
     def ops(self, start=None, stop=None, only_virtual_ops=False, **kwargs):
         """Blockchain.ops() is deprecated. Please use Blockchain.stream() instead."""
         raise DeprecationWarning(
@@ -794,11 +1111,62 @@ class Blockchain(object):
                 ops_stat = block.ops_statistics(add_to_ops_stat=ops_stat)
         return ops_stat
 
-    def stream(self, opNames=[], raw_ops=False, *args, **kwargs):
+    def _stream_source(self, opNames, source, kwargs):
+        """Returns the block generator which serves ``opNames`` for :func:`stream`"""
+        if source not in ["auto", "blocks", "virtual_ops"]:
+            raise ValueError("source must be auto, blocks or virtual_ops!")
+        if source == "auto":
+            use_virtual_ops = (
+                bool(opNames)
+                and not kwargs.get("only_ops")
+                and virtual_op_filter(opNames) is not None
+                and self.blockchain.is_connected()
+                and self.blockchain.rpc.get_use_appbase()
+            )
+            if not use_virtual_ops:
+                return self.blocks(**kwargs)
+        elif source == "blocks":
+            return self.blocks(**kwargs)
+        return self._virtual_op_source(opNames, source == "auto", kwargs)
+
+    def _virtual_op_source(self, opNames, fallback, kwargs):
+        blocks_kwargs = kwargs
+        kwargs = {
+            key: kwargs[key]
+            for key in ["start", "stop", "raw_blocks", "block_records"]
+            if key in kwargs
+        }
+        started = False
+        try:
+            for block in self.virtual_op_blocks(opNames=opNames, **kwargs):
+                started = True
+                yield block
+        except RPCError as e:
+            if not fallback or started:
+                raise
+            # e.g. the node has no account_history_api
+            log.warning("enum_virtual_ops failed (%s), streaming blocks instead" % str(e))
+            blocks_kwargs = dict(blocks_kwargs, only_virtual_ops=True)
+            for block in self.blocks(**blocks_kwargs):
+                yield block
+
+    def stream(self, opNames=[], raw_ops=False, *args, source="auto", op_view=False, **kwargs):
         """Yield specific operations (e.g. comments) only
 
         :param array opNames: List of operations to filter for
         :param bool raw_ops: When set to True, it returns the unmodified operations (default: False)
+        :param str source: where the operations come from
+
+            * ``auto`` (default): ``virtual_ops`` when all ``opNames`` are
+              virtual operations and the node supports appbase, ``blocks`` otherwise
+            * ``blocks``: all blocks are downloaded (see :func:`blocks`)
+            * ``virtual_ops``: the node filters the virtual operations
+              (see :func:`virtual_op_blocks`), blocks without them are skipped
+
+        :param bool op_view: When set to True, each operation is yielded as
+            :class:`OpView`, which references the operation of the block
+            instead of copying it and hashes ``_id`` only when it is read
+            (default: False). Ignored when ``raw_ops`` is set.
         :param int start: Start at this block
         :param int stop: Stop at this block
         :param int max_batch_size: only for appbase nodes. When not None, batch calls of are used.
@@ -808,6 +1176,9 @@ class Blockchain(object):
         :param bool only_ops: Only yield operations (default: False)
             Cannot be combined with ``only_virtual_ops=True``
         :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param bool raw_blocks: Stream from plain block dicts, which are not
+            cached (see :func:`blocks`), the timestamps stay strings (default: False)
+        :param bool block_records: Stream from :class:`BlockRecord` objects (default: False)
 
         The dict output is formated such that ``type`` carries the
         operation type. Timestamp and block_num are taken from the
@@ -853,75 +1224,83 @@ class Blockchain(object):
             }
 
         """
-        for block in self.blocks(**kwargs):
-            if "transactions" in block:
-                trx = block["transactions"]
-            else:
-                trx = [block]
-            block_num = 0
-            trx_id = ""
-            _id = ""
-            timestamp = ""
-            for trx_nr in range(len(trx)):
-                if "operations" not in trx[trx_nr]:
-                    continue
-                for event in trx[trx_nr]["operations"]:
-                    if isinstance(event, list):
-                        op_type, op = event
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
-                    elif isinstance(event, dict) and "type" in event and "value" in event:
-                        op_type = event["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
-                            op_type = op_type[:-10]
-                        op = event["value"]
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
-                    elif (
-                        "op" in event
-                        and isinstance(event["op"], dict)
-                        and "type" in event["op"]
-                        and "value" in event["op"]
-                    ):
-                        op_type = event["op"]["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
-                            op_type = op_type[:-10]
-                        op = event["op"]["value"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
+        op_names = set(opNames)
+        for block in self._stream_source(opNames, source, kwargs):
+            yield from self._block_ops(block, op_names, raw_ops=raw_ops, op_view=op_view)
+
+    def _block_ops(self, block, op_names, raw_ops=False, op_view=False):
+        """Yields the ops of a block (or of a virtual op block) as :func:`stream` does"""
+        if "transactions" in block:
+            trx = block["transactions"]
+        else:
+            trx = [block]
+        block_num = 0
+        trx_id = ""
+        timestamp = ""
+        for trx_nr in range(len(trx)):
+            if "operations" not in trx[trx_nr]:
+                continue
+            for event in trx[trx_nr]["operations"]:
+                # _id is the hash of this event, computed for yielded ops only
+                hashed_event = event
+                if isinstance(event, list):
+                    op_type, op = event
+                    trx_id = block["transaction_ids"][trx_nr]
+                    block_num = block.get("id")
+                    timestamp = block.get("timestamp")
+                elif isinstance(event, dict) and "type" in event and "value" in event:
+                    op_type = event["type"]
+                    if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
+                        op_type = op_type[:-10]
+                    op = event["value"]
+                    trx_id = block["transaction_ids"][trx_nr]
+                    block_num = block.get("id")
+                    timestamp = block.get("timestamp")
+                elif (
+                    "op" in event
+                    and isinstance(event["op"], dict)
+                    and "type" in event["op"]
+                    and "value" in event["op"]
+                ):
+                    op_type = event["op"]["type"]
+                    if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
+                        op_type = op_type[:-10]
+                    op = event["op"]["value"]
+                    trx_id = event.get("trx_id")
+                    block_num = event.get("block")
+                    hashed_event = event["op"]
+                    timestamp = event.get("timestamp")
+                else:
+                    op_type, op = event["op"]
+                    trx_id = event.get("trx_id")
+                    block_num = event.get("block")
+                    hashed_event = event["op"]
+                    timestamp = event.get("timestamp")
+                if not op_names or op_type in op_names and block_num > 0:
+                    if raw_ops:
+                        yield {
+                            "block_num": block_num,
+                            "trx_num": trx_nr,
+                            "op": [op_type, op],
+                            "timestamp": timestamp,
+                        }
+                    elif op_view:
+                        yield OpView(
+                            op_type, op, hashed_event, block_num, trx_nr, trx_id, timestamp
+                        )
                     else:
-                        op_type, op = event["op"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
-                    if not bool(opNames) or op_type in opNames and block_num > 0:
-                        if raw_ops:
-                            yield {
+                        updated_op = {"type": op_type}
+                        updated_op.update(op)
+                        updated_op.update(
+                            {
+                                "_id": self.hash_op(hashed_event),
+                                "timestamp": timestamp,
                                 "block_num": block_num,
                                 "trx_num": trx_nr,
-                                "op": [op_type, op],
-                                "timestamp": timestamp,
+                                "trx_id": trx_id,
                             }
-                        else:
-                            updated_op = {"type": op_type}
-                            updated_op.update(op.copy())
-                            updated_op.update(
-                                {
-                                    "_id": _id,
-                                    "timestamp": timestamp,
-                                    "block_num": block_num,
-                                    "trx_num": trx_nr,
-                                    "trx_id": trx_id,
-                                }
-                            )
-                            yield updated_op
+                        )
+                        yield updated_op
 
     def awaitTxConfirmation(self, transaction, limit=10):
         """Returns the transaction as seen by the blockchain after being
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import json
 import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 
 from nectar.instance import shared_blockchain_instance
@@ -158,6 +159,30 @@ class BlockchainObject(dict):
     def clear_cache():
         BlockchainObject._cache = ObjectCache()
 
+    @staticmethod
+    @contextmanager
+    def bulk_cache():
+        """Context in which many objects can be created and cached at once
+
+        The cache removes its expired items once at the end and not on
+        every insert.
+
+        .. code-block:: python
+
+            with BlockchainObject.bulk_cache():
+                witnesses = [Witness(w) for w in witness_dicts]
+
+        """
+        cache = BlockchainObject._cache
+        auto_clean = cache.auto_clean
+        cache.auto_clean = False
+        try:
+            yield cache
+        finally:
+            cache.auto_clean = auto_clean
+            if auto_clean:
+                cache.clear_expired_items()
+
     def test_valid_objectid(self, i):
         if isinstance(i, string_types):
             return True
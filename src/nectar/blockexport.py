@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime
+
+from nectar.instance import shared_blockchain_instance
+
+from .blockchain import Blockchain
+from .utils import formatToTimeStamp
+
+log = logging.getLogger(__name__)
+
+# columns which every op table starts with
+BLOCK_COLUMNS = ("block_num", "trx_num", "trx_id", "timestamp")
+
+NCOL_MAGIC = b"NCOL\x01"
+
+
+def _is_amount(value):
+    """True for NAI amounts, as dict or ``[amount, precision, nai]`` list"""
+    if isinstance(value, dict):
+        return len(value) == 3 and "nai" in value and "amount" in value and "precision" in value
+    return (
+        isinstance(value, list)
+        and len(value) == 3
+        and isinstance(value[2], str)
+        and value[2].startswith("@@")
+    )
+
+
+def _timestamp(value):
+    """Epoch seconds of a block timestamp (int, datetime or string)"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return formatToTimeStamp(value)
+
+
+def _op_columns(op):
+    """Yields ``(column, kind, value)`` of the fields of an op
+
+    Amounts become an ``int64`` column with the satoshis and a ``string``
+    column with the asset id (``<field>_nai``), nested values are kept as json.
+    """
+    for key, value in op.items():
+        if key in BLOCK_COLUMNS:
+            key = "op_" + key
+        if isinstance(value, bool):
+            yield key, "bool", value
+        elif isinstance(value, int):
+            yield key, "int64", value
+        elif isinstance(value, str):
+            yield key, "string", value
+        elif _is_amount(value):
+            if isinstance(value, dict):
+                yield key, "int64", int(value["amount"])
+                yield key + "_nai", "string", value["nai"]
+            else:
+                yield key, "int64", int(value[0])
+                yield key + "_nai", "string", value[2]
+        elif value is None:
+            continue
+        else:
+            yield key, "json", value
+
+
+def _coerce(kind, value, column):
+    """Converts a value into the kind of its column"""
+    if value is None:
+        return None
+    if kind == "int64":
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError("Column %s expects integers, got %r" % (column, value))
+        return int(value)
+    if kind == "bool":
+        return bool(value)
+    if kind == "json" or not isinstance(value, str):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class _OpTable(object):
+    """Buffered rows of one op type, flushed as row groups into ``writer``"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.kinds = {
+            "block_num": "int64",
+            "trx_num": "int64",
+            "trx_id": "string",
+            "timestamp": "int64",
+        }
+        self.columns = {name: [] for name in self.kinds}
+        self.rows = 0
+        self.written = 0
+
+    def append(self, block_num, trx_num, trx_id, timestamp, op):
+        columns = self.columns
+        columns["block_num"].append(block_num)
+        columns["trx_num"].append(trx_num)
+        columns["trx_id"].append(trx_id)
+        columns["timestamp"].append(_timestamp(timestamp))
+        filled = len(BLOCK_COLUMNS)
+        for name, kind, value in _op_columns(op):
+            values = columns.get(name)
+            if values is None:
+                # a field which the former rows do not have
+                self.kinds[name] = kind
+                values = columns[name] = [None] * self.rows
+            elif len(values) > self.rows:
+                # the same column twice in one op
+                continue
+            values.append(value)
+            filled += 1
+        self.rows += 1
+        if filled < len(columns):
+            # fields which this row does not have
+            for values in columns.values():
+                if len(values) < self.rows:
+                    values.append(None)
+
+    def flush(self):
+        if not self.rows:
+            return
+        columns = []
+        for name, values in self.columns.items():
+            kind = self.kinds[name]
+            python_type = str if kind == "string" else int if kind == "int64" else None
+            if python_type is None or any(
+                type(v) is not python_type for v in values if v is not None
+            ):
+                values = [_coerce(kind, v, name) for v in values]
+            columns.append((name, kind, values))
+        self.writer.write(self.rows, columns)
+        self.written += self.rows
+        self.columns = {name: [] for name in self.kinds}
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def _encode_column(kind, values):
+    """Plain encoding of a column: validity flag (+ bytes), then the values"""
+    if any(v is None for v in values):
+        data = bytearray(b"\x01")
+        data += bytes(0 if v is None else 1 for v in values)
+    else:
+        data = bytearray(b"\x00")
+    if kind in ("int64", "bool"):
+        if kind == "bool":
+            data += bytes(1 if v else 0 for v in values)
+            return bytes(data)
+        numbers = array("q", [0 if v is None else v for v in values])
+    else:
+        encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+        numbers = array("q", [0])
+        offset = 0
+        for item in encoded:
+            offset += len(item)
+            numbers.append(offset)
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    data += numbers.tobytes()
+    if kind not in ("int64", "bool"):
+        data += b"".join(encoded)
+    return bytes(data)
+
+
+def _decode_column(kind, rows, data):
+    validity = None
+    pos = 1
+    if data[0] == 1:
+        validity = data[1 : 1 + rows]
+        pos += rows
+    if kind == "bool":
+        values = [b == 1 for b in data[pos : pos + rows]]
+    else:
+        count = rows if kind == "int64" else rows + 1
+        numbers = array("q")
+        numbers.frombytes(data[pos : pos + 8 * count])
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        if kind == "int64":
+            values = numbers.tolist()
+        else:
+            blob = data[pos + 8 * count :]
+            values = [blob[numbers[i] : numbers[i + 1]].decode("utf-8") for i in range(rows)]
+            if kind == "json":
+                values = [json.loads(v) if v else None for v in values]
+    if validity is not None:
+        values = [v if valid else None for v, valid in zip(values, validity)]
+    return values
+
+
+class _ColumnFileWriter(object):
+    """Writes row groups into a ``.ncol`` file
+
+    The file starts with ``NCOL\\x01``. Every row group is a little endian
+    uint32 with the length of a json header (``{"rows": n, "columns":
+    [[name, kind, size], ...]}``), the header and then one zlib compressed
+    block of ``size`` bytes per column.
+    """
+
+    extension = ".ncol"
+
+    def __init__(self, path, compression_level=6):
+        self.path = path
+        self.compression_level = compression_level
+        self.file = open(path, "wb")
+        self.file.write(NCOL_MAGIC)
+
+    def write(self, rows, columns):
+        blocks = []
+        header = {"rows": rows, "columns": []}
+        for name, kind, values in columns:
+            block = zlib.compress(_encode_column(kind, values), self.compression_level)
+            header["columns"].append([name, kind, len(block)])
+            blocks.append(block)
+        header = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        self.file.write(struct.pack("<I", len(header)))
+        self.file.write(header)
+        for block in blocks:
+            self.file.write(block)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowWriter(object):
+    """Writes row groups into a parquet file with pyarrow
+
+    The schema is set by the first row group. A row group with other
+    columns continues in a new file (``<name>_1.parquet``, ...).
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, path, compression="zstd"):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.types = {
+            "int64": pyarrow.int64(),
+            "bool": pyarrow.bool_(),
+            "string": pyarrow.string(),
+            "json": pyarrow.string(),
+        }
+        self.pyarrow = pyarrow
+        self.parquet = pyarrow.parquet
+        self.path = path
+        self.compression = compression
+        self.writer = None
+        self.schema = None
+        self.part = 0
+
+    def write(self, rows, columns):
+        pa = self.pyarrow
+        schema = pa.schema([(name, self.types[kind]) for name, kind, _ in columns])
+        if self.writer is not None and not schema.equals(self.schema):
+            self.writer.close()
+            self.writer = None
+            self.part += 1
+        if self.writer is None:
+            path = self.path
+            if self.part:
+                path = "%s_%d%s" % (path[: -len(self.extension)], self.part, self.extension)
+            self.schema = schema
+            self.writer = self.parquet.ParquetWriter(path, schema, compression=self.compression)
+        arrays = [pa.array(values, type=self.types[kind]) for _, kind, values in columns]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=rows)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def has_pyarrow():
+    """True when pyarrow is installed and parquet files can be written"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iter_row_groups(path, columns=None):
+    """Yields the row groups of a ``.ncol`` file as dict of column lists
+
+    :param str path: file written by :class:`BlockExporter` without pyarrow
+    :param list columns: read only these columns (default: all). Columns
+        which a row group does not have are filled with None.
+
+    Only the requested columns are decompressed, the others are skipped.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(NCOL_MAGIC)) != NCOL_MAGIC:
+            raise ValueError("%s is not a ncol file" % path)
+        while True:
+            size = f.read(4)
+            if not size:
+                break
+            header = json.loads(f.read(struct.unpack("<I", size)[0]))
+            rows = header["rows"]
+            group = {}
+            for name, kind, block_size in header["columns"]:
+                if columns is not None and name not in columns:
+                    f.seek(block_size, os.SEEK_CUR)
+                    continue
+                group[name] = _decode_column(kind, rows, zlib.decompress(f.read(block_size)))
+            if columns is not None:
+                for name in columns:
+                    if name not in group:
+                        group[name] = [None] * rows
+            yield group
+
+
+def read_column_file(path, columns=None):
+    """Returns all rows of a ``.ncol`` file as dict of column lists
+
+    :param str path: file written by :class:`BlockExporter` without pyarrow
+    :param list columns: read only these columns (default: all)
+    """
+    result = {}
+    total = 0
+    for group in iter_row_groups(path, columns=columns):
+        rows = len(next(iter(group.values()))) if group else 0
+        for name, values in group.items():
+            if name not in result:
+                result[name] = [None] * total
+            result[name].extend(values)
+        total += rows
+        for values in result.values():
+            if len(values) < total:
+                values.extend([None] * (total - len(values)))
+    return result
+
+
+class BlockExporter(object):
+    """Exports the operations of a block range into columnar files
+
+    :param str directory: output directory, it gets one sub directory per op type
+    :param list opNames: export only these op types (default: all)
+    :param str format: ``parquet``, ``ncol`` or ``auto`` (default), which is
+        ``parquet`` when pyarrow is installed and ``ncol`` otherwise
+    :param int row_group_size: rows per row group and op type (default: 65536)
+    :param int max_buffered_rows: when more rows of all op types are buffered,
+        the largest buffer is written as a row group (default: ``4 * row_group_size``)
+    :param str compression: parquet compression (default: ``zstd``)
+    :param int compression_level: zlib level of ``ncol`` files (default: 6)
+    :param Steem blockchain_instance: Steem instance
+
+    Each op type is one table with the columns ``block_num``, ``trx_num``,
+    ``trx_id``, ``timestamp`` (epoch seconds) and one column per op field.
+    Amounts are split into the satoshis (int64) and the asset id
+    (``<field>_nai``, e.g. ``@@000000021``), nested fields are stored as json
+    strings. Rows are buffered per op type and written as row groups, so
+    memory stays bounded for any range.
+
+    A range is written into ``<directory>/<op_type>/<start>-<stop>.parquet``
+    (or ``.ncol``). Parquet files are read with pyarrow (e.g.
+    ``pyarrow.dataset.dataset(directory + "/vote")``), ``ncol`` files with
+    :func:`read_column_file` or :func:`iter_row_groups`.
+
+    .. code-block:: python
+
+        from nectar.blockexport import BlockExporter, read_column_file
+
+        exporter = BlockExporter("export", opNames=["vote", "transfer"])
+        rows = exporter.export(80000000, 80028800)
+        print(rows)
+        votes = read_column_file("export/vote/0080000000-0080028800.ncol", ["voter", "weight"])
+
+    """
+
+    def __init__(
+        self,
+        directory,
+        opNames=[],
+        format="auto",
+        row_group_size=65536,
+        max_buffered_rows=None,
+        compression="zstd",
+        compression_level=6,
+        blockchain_instance=None,
+        **kwargs,
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if format == "auto":
+            format = "parquet" if has_pyarrow() else "ncol"
+        if format not in ("parquet", "ncol"):
+            raise ValueError("format must be parquet, ncol or auto!")
+        if format == "parquet" and not has_pyarrow():
+            raise ImportError("pyarrow is required for parquet files")
+        self.directory = directory
+        self.opNames = opNames
+        self.format = format
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows or 4 * row_group_size
+        self.compression = compression
+        self.compression_level = compression_level
+
+    def _writer(self, op_type, name):
+        directory = os.path.join(self.directory, op_type)
+        os.makedirs(directory, exist_ok=True)
+        if self.format == "parquet":
+            path = os.path.join(directory, name + _ArrowWriter.extension)
+            return _ArrowWriter(path, compression=self.compression)
+        path = os.path.join(directory, name + _ColumnFileWriter.extension)
+        return _ColumnFileWriter(path, compression_level=self.compression_level)
+
+    def write_ops(self, ops, name):
+        """Writes ops into the tables of their op types
+
+        :param ops: iterable of ops as yielded by
+            :func:`nectar.blockchain.Blockchain.stream` with ``op_view=True``
+        :param str name: file name (without extension) in each op type directory
+        :returns: dict with the number of rows per op type
+        """
+        tables = {}
+        buffered = 0
+        try:
+            for op in ops:
+                table = tables.get(op.type)
+                if table is None:
+                    table = tables[op.type] = _OpTable(self._writer(op.type, name))
+                table.append(op.block_num, op.trx_num, op.trx_id, op.timestamp, op.op)
+                buffered += 1
+                if table.rows >= self.row_group_size:
+                    buffered -= table.rows
+                    table.flush()
+                elif buffered >= self.max_buffered_rows:
+                    largest = max(tables.values(), key=lambda t: t.rows)
+                    buffered -= largest.rows
+                    largest.flush()
+        finally:
+            for table in tables.values():
+                table.close()
+        return {op_type: table.written for op_type, table in tables.items()}
+
+    def export(self, start, stop, **kwargs):
+        """Exports the ops of the blocks start to stop (both included)
+
+        :param int start: first block
+        :param int stop: last block
+        :returns: dict with the number of rows per op type
+
+        Further arguments are passed to :func:`nectar.blockchain.Blockchain.stream`,
+        e.g. ``only_virtual_ops``, ``threading`` or ``max_batch_size``.
+        """
+        chain = Blockchain(blockchain_instance=self.blockchain, lazy_time=True)
+        ops = chain.stream(opNames=self.opNames, start=start, stop=stop, op_view=True, **kwargs)
+        return self.write_ops(ops, "%010d-%010d" % (start, stop))
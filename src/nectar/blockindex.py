@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+import logging
+import sqlite3
+import threading
+from bisect import bisect_left
+
+from nectar.instance import shared_blockchain_instance
+from nectarstorage.sqlite import SQLiteCommon, SQLiteFile
+
+from .utils import formatToTimeStamp
+
+log = logging.getLogger(__name__)
+
+_shared_block_indexes = {}
+
+
+def shared_block_index(blockchain_instance=None):
+    """Returns the in-memory :class:`BlockIndex` of the chain of the given
+    instance, which is shared inside the process
+    """
+    blockchain = blockchain_instance or shared_blockchain_instance()
+    chain_id = blockchain.chain_params["chain_id"]
+    if chain_id not in _shared_block_indexes:
+        _shared_block_indexes[chain_id] = BlockIndex(blockchain_instance=blockchain)
+    return _shared_block_indexes[chain_id]
+
+
+class BlockIndex(SQLiteFile, SQLiteCommon):
+    """Sparse index of block_num -> timestamp and of account
+    op index -> block_num checkpoints
+
+    :param Steem blockchain_instance: Steem instance
+    :param str data_dir: Directory of the sqlite file (default: nectar user data dir)
+    :param str profile: Name of the sqlite file (default: ``block_index``)
+    :param int resolution: observed blocks closer than this number of blocks to an
+        existing checkpoint are not stored (default: 1200, one hour)
+
+    The checkpoints are only kept in memory, unless ``data_dir`` or
+    ``profile`` is given. Then they are stored in a sqlite file and loaded
+    again by the next index on the same file.
+
+    Checkpoints are added whenever a block time or the block of an account
+    op is known: by :func:`nectar.blockchain.Blockchain.get_estimated_block_num`,
+    :func:`nectar.account.Account.estimate_virtual_op_num` and by blocks
+    streamed through a :class:`nectar.blockchain.Blockchain` that was created
+    with ``block_index=``. They are loaded lazily into sorted lists, so that a
+    date is converted into a block number by a bisect and an interpolation
+    between the two neighbouring checkpoints.
+
+    .. code-block:: python
+
+        from datetime import datetime
+        from nectar.blockchain import Blockchain
+        from nectar.blockindex import BlockIndex
+
+        index = BlockIndex(profile="block_index")
+        b = Blockchain(block_index=index)
+        block_num = b.get_estimated_block_num(datetime(2024, 1, 1))
+
+    """
+
+    __tablename__ = "block_times"
+    __ops_tablename__ = "account_op_blocks"
+
+    def __init__(
+        self, blockchain_instance=None, data_dir=None, profile=None, resolution=1200, **kwargs
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.resolution = resolution
+        self.sqlite_file = None
+        if data_dir is not None or profile is not None:
+            if profile is None:
+                profile = "block_index"
+            file_kwargs = {"profile": profile}
+            if data_dir is not None:
+                file_kwargs["data_dir"] = data_dir
+            SQLiteFile.__init__(self, **file_kwargs)
+            if not self.exists():
+                self.create()
+        # one connection for all inserts
+        self._connection = None
+        self._lock = threading.Lock()
+        self._block_nums = None
+        self._timestamps = None
+        self._accounts = {}
+
+    def exists(self):
+        """Check if the database tables exist"""
+        query = (
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.__tablename__,),
+        )
+        return True if self.sql_fetchone(query) else False
+
+    def create(self):
+        """Create the checkpoint tables in the SQLite database"""
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                block_num INTEGER PRIMARY KEY,
+                timestamp INTEGER NOT NULL
+            )""".format(self.__tablename__),
+            )
+        )
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                account TEXT NOT NULL,
+                op_index INTEGER NOT NULL,
+                block_num INTEGER NOT NULL,
+                PRIMARY KEY (account, op_index)
+            )""".format(self.__ops_tablename__),
+            )
+        )
+
+    def wipe(self):
+        """Removes all checkpoints"""
+        if self.sqlite_file is not None:
+            self.sql_execute(("DELETE FROM {}".format(self.__tablename__),))
+            self.sql_execute(("DELETE FROM {}".format(self.__ops_tablename__),))
+        self._block_nums = None
+        self._timestamps = None
+        self._accounts = {}
+
+    def __len__(self):
+        self._load_blocks()
+        return len(self._block_nums)
+
+    def _load_blocks(self):
+        if self._block_nums is None:
+            rows = []
+            if self.sqlite_file is not None:
+                rows = self.sql_fetchall(
+                    (
+                        "SELECT block_num, timestamp FROM {} ORDER BY block_num".format(
+                            self.__tablename__
+                        ),
+                    )
+                )
+            self._block_nums = [row[0] for row in rows]
+            self._timestamps = [row[1] for row in rows]
+
+    def _insert(self, table, row):
+        if self.sqlite_file is None:
+            return
+        with self._lock:
+            if self._connection is None:
+                self._connection = sqlite3.connect(self.sqlite_file, check_same_thread=False)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO {} VALUES ({})".format(table, ",".join("?" * len(row))),
+                row,
+            )
+            self._connection.commit()
+
+    def close(self):
+        """Closes the connection which stores new checkpoints"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def add_block(self, block_num, timestamp, force=True):
+        """Adds a block_num -> timestamp checkpoint
+
+        :param int block_num: block number
+        :param timestamp: block time as unix timestamp, datetime or time string
+        :param bool force: when False, the checkpoint is only stored when no other
+            checkpoint is closer than ``resolution`` blocks (default: True)
+        """
+        if not isinstance(timestamp, int):
+            timestamp = formatToTimeStamp(timestamp)
+        self._load_blocks()
+        i = bisect_left(self._block_nums, block_num)
+        if i < len(self._block_nums) and self._block_nums[i] == block_num:
+            if self._timestamps[i] == timestamp:
+                return
+            self._timestamps[i] = timestamp
+        else:
+            if not force and (
+                (i > 0 and block_num - self._block_nums[i - 1] < self.resolution)
+                or (i < len(self._block_nums) and self._block_nums[i] - block_num < self.resolution)
+            ):
+                return
+            self._block_nums.insert(i, block_num)
+            self._timestamps.insert(i, timestamp)
+        self._insert(self.__tablename__, (block_num, timestamp))
+
+    def observe_block(self, block):
+        """Adds a checkpoint for a received block, when no other checkpoint is
+        closer than ``resolution`` blocks
+
+        :param Block block: block with ``timestamp``
+        """
+        if "timestamp" not in block:
+            return
+        self.add_block(block.block_num, block["timestamp"], force=False)
+
+    def get_timestamp(self, block_num):
+        """Returns the stored unix timestamp of a block (or None)"""
+        self._load_blocks()
+        i = bisect_left(self._block_nums, block_num)
+        if i < len(self._block_nums) and self._block_nums[i] == block_num:
+            return self._timestamps[i]
+        return None
+
+    def estimate_block_num(self, timestamp, block_interval=3):
+        """Returns the estimated block number for a unix timestamp (or None
+        when the index is empty)
+
+        The estimation interpolates between the two checkpoints around
+        the timestamp, and extrapolates with ``block_interval`` outside
+        of the indexed range.
+        """
+        self._load_blocks()
+        if not self._block_nums:
+            return None
+        timestamps = self._timestamps
+        block_nums = self._block_nums
+        i = bisect_left(timestamps, timestamp)
+        if i < len(timestamps) and timestamps[i] == timestamp:
+            return block_nums[i]
+        if i == 0:
+            return block_nums[0] - int((timestamps[0] - timestamp) // block_interval)
+        if i == len(timestamps):
+            return block_nums[-1] + int((timestamp - timestamps[-1]) // block_interval)
+        t_lower, t_upper = timestamps[i - 1], timestamps[i]
+        b_lower, b_upper = block_nums[i - 1], block_nums[i]
+        block_num = b_lower + (timestamp - t_lower) * (b_upper - b_lower) // (t_upper - t_lower)
+        return int(min(max(block_num, b_lower), b_upper))
+
+    def _load_account(self, account):
+        if account not in self._accounts:
+            rows = []
+            if self.sqlite_file is not None:
+                rows = self.sql_fetchall(
+                    (
+                        "SELECT op_index, block_num FROM {} WHERE account=? ORDER BY op_index".format(
+                            self.__ops_tablename__
+                        ),
+                        (account,),
+                    )
+                )
+            self._accounts[account] = ([row[0] for row in rows], [row[1] for row in rows])
+        return self._accounts[account]
+
+    def add_op(self, account, op_index, block_num):
+        """Adds an op index -> block_num checkpoint of an account"""
+        op_indices, block_nums = self._load_account(account)
+        i = bisect_left(op_indices, op_index)
+        if i < len(op_indices) and op_indices[i] == op_index:
+            if block_nums[i] == block_num:
+                return
+            block_nums[i] = block_num
+        else:
+            op_indices.insert(i, op_index)
+            block_nums.insert(i, block_num)
+        self._insert(self.__ops_tablename__, (account, op_index, block_num))
+
+    def get_op_block_num(self, account, op_index):
+        """Returns the stored block number of an account op (or None)"""
+        op_indices, block_nums = self._load_account(account)
+        i = bisect_left(op_indices, op_index)
+        if i < len(op_indices) and op_indices[i] == op_index:
+            return block_nums[i]
+        return None
+
+    def op_bounds(self, account, block_num):
+        """Returns the checkpoints around a block number as
+        ``(op_index, block_num)`` tuples
+
+        The lower checkpoint is the last one with a block below ``block_num``,
+        the upper checkpoint the first one at or after ``block_num``. Each of
+        them is None when no such checkpoint is stored.
+        """
+        op_indices, block_nums = self._load_account(account)
+        lower = None
+        upper = None
+        i = bisect_left(block_nums, block_num)
+        if i > 0:
+            lower = (op_indices[i - 1], block_nums[i - 1])
+        if i < len(block_nums):
+            upper = (op_indices[i], block_nums[i])
+        return lower, upper
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.sqlite_file or "memory")
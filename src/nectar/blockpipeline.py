@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+
+from nectar.instance import shared_blockchain_instance
+
+from .block import Block
+from .blockchain import Blockchain
+from .exceptions import OfflineHasNoRPCException
+
+log = logging.getLogger(__name__)
+
+
+def _start_worker():
+    return os.getpid()
+
+
+def _process_blocks(func, blocks, parse, lazy_time):
+    """Runs in the worker processes, returns ``(block_num, result)`` per block"""
+    results = []
+    for block in blocks:
+        if parse:
+            block = Block._parse_json_data(block, lazy_time=lazy_time)
+        results.append((block["id"], func(block)))
+    return results
+
+
+class BlockPipeline(object):
+    """Processes a block range with a pool of worker processes
+
+    :param func: picklable function (e.g. defined at module level) which is
+        called with each block in a worker process, its return value must be picklable
+    :param int start: first block (default: current block)
+    :param int stop: last block (default: follow the chain forever)
+    :param int workers: number of worker processes (default: number of cpus)
+    :param int chunk_size: blocks per fetch call and per worker task (default: 50)
+    :param int max_pending: maximum number of chunks which are processed but
+        not yet consumed, the fetch stage buffers as many (default: ``2 * workers``)
+    :param checkpoint: function which is called with the last consumed block
+        number, every ``checkpoint_interval`` blocks and when the range is done
+    :param int checkpoint_interval: blocks between two checkpoints (default: 1000)
+    :param bool parse: when True (default), the timestamps of the block are
+        parsed in the worker as done by :class:`nectar.block.Block`
+    :param bool lazy_time: parse ``timestamp`` into an epoch int and keep
+        the expirations as string (default: False)
+    :param str mode: ``irreversible`` (default) or ``head``, only used without ``stop``
+    :param mp_context: multiprocessing context of the worker pool (default: platform default)
+    :param Steem blockchain_instance: Steem instance
+
+    Three stages run concurrently: a thread fetches raw blocks with
+    ``block_api.get_block_range``, the worker processes parse them and call
+    ``func(block)`` with a plain block dict (``block["id"]`` is the block
+    number), and iterating the pipeline yields ``(block_num, result)`` in
+    block order. Fetching stops while ``max_pending`` chunks wait for the
+    consumer. A block counts as done when the consumer asks for the result
+    after it, so a pipeline which is restarted at the last checkpoint
+    + 1 processes every block at least once.
+
+    .. code-block:: python
+
+        import json
+        from nectar.blockpipeline import BlockPipeline
+
+        def count_follows(block):
+            n = 0
+            for trx in block["transactions"]:
+                for op in trx["operations"]:
+                    if op["type"] == "custom_json_operation" and op["value"]["id"] == "follow":
+                        json.loads(op["value"]["json"])
+                        n += 1
+            return n
+
+        if __name__ == "__main__":
+            pipeline = BlockPipeline(count_follows, start=80000000, stop=80010000,
+                                     checkpoint=lambda block_num: print("done", block_num))
+            for block_num, follows in pipeline:
+                print(block_num, follows)
+
+    .. note:: The fetch thread uses the rpc of ``blockchain_instance``;
+              do not use the same instance in the loop body.
+
+    """
+
+    def __init__(
+        self,
+        func,
+        start=None,
+        stop=None,
+        workers=None,
+        chunk_size=50,
+        max_pending=None,
+        checkpoint=None,
+        checkpoint_interval=1000,
+        parse=True,
+        lazy_time=False,
+        mode="irreversible",
+        mp_context=None,
+        blockchain_instance=None,
+        **kwargs,
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.func = func
+        self.start = start
+        self.stop = stop
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.workers
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.parse = parse
+        self.lazy_time = lazy_time
+        self.mode = mode
+        self.mp_context = mp_context
+        # last block whose result was consumed
+        self.block_num = None
+
+    def _get_blocks(self, block_num, count):
+        rpc = self.blockchain.rpc
+        rpc.set_next_node_on_empty_reply(False)
+        if rpc.get_use_appbase():
+            blocks = rpc.get_block_range(
+                {"starting_block_num": block_num, "count": count}, api="block"
+            )["blocks"]
+        else:
+            blocks = []
+            for i in range(count):
+                block = rpc.get_block(block_num + i)
+                if not block:
+                    break
+                blocks.append(block)
+        for i, block in enumerate(blocks):
+            block["id"] = block_num + i
+        return blocks
+
+    def _put(self, queue, stop_event, item):
+        while not stop_event.is_set():
+            try:
+                queue.put(item, timeout=0.5)
+                return
+            except Full:
+                pass
+
+    def _fetch(self, queue, stop_event, block_num):
+        """Fetch stage, puts chunks of raw blocks into ``queue``, then None"""
+        try:
+            chain = Blockchain(blockchain_instance=self.blockchain, mode=self.mode)
+            while not stop_event.is_set():
+                if self.stop:
+                    head_block = self.stop
+                else:
+                    # returns regularly to check stop_event
+                    head_block = chain.wait_for_block_num(block_num, timeout=chain.block_interval)
+                while block_num <= head_block and not stop_event.is_set():
+                    count = min(self.chunk_size, head_block - block_num + 1)
+                    blocks = self._get_blocks(block_num, count)
+                    if not blocks:
+                        # the node is behind the head block it reported
+                        stop_event.wait(chain.block_interval)
+                        break
+                    self._put(queue, stop_event, blocks)
+                    block_num += len(blocks)
+                if self.stop and block_num > self.stop:
+                    break
+        except Exception as e:
+            self._put(queue, stop_event, e)
+        self._put(queue, stop_event, None)
+
+    def _checkpoint(self, last_checkpoint):
+        if self.checkpoint is not None and self.block_num is not None:
+            if last_checkpoint is None or self.block_num > last_checkpoint:
+                self.checkpoint(self.block_num)
+                return self.block_num
+        return last_checkpoint
+
+    def __iter__(self):
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        start = self.start
+        if not start:
+            start = Blockchain(
+                blockchain_instance=self.blockchain, mode=self.mode
+            ).get_current_block_num()
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+        queue = Queue(maxsize=self.max_pending)
+        stop_event = Event()
+        try:
+            # fork the workers before the fetch thread exists
+            executor.submit(_start_worker).result()
+            fetcher = Thread(target=self._fetch, args=(queue, stop_event, start), daemon=True)
+            fetcher.start()
+            pending = deque()
+            fetching = True
+            last_checkpoint = self.start - 1 if self.start else None
+            while fetching or pending:
+                # keep the workers busy, but wait for the fetcher only when idle
+                while fetching and len(pending) < self.max_pending:
+                    try:
+                        item = queue.get(block=not pending)
+                    except Empty:
+                        break
+                    if item is None:
+                        fetching = False
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        pending.append(
+                            executor.submit(
+                                _process_blocks, self.func, item, self.parse, self.lazy_time
+                            )
+                        )
+                if not pending:
+                    continue
+                for block_num, result in pending.popleft().result():
+                    yield block_num, result
+                    self.block_num = block_num
+                if (
+                    last_checkpoint is None
+                    or self.block_num - last_checkpoint >= self.checkpoint_interval
+                ):
+                    last_checkpoint = self._checkpoint(last_checkpoint)
+            self._checkpoint(last_checkpoint)
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
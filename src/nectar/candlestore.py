@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from nectar.instance import shared_blockchain_instance
+from nectarstorage.sqlite import SQLiteCommon, SQLiteFile
+
+from .blockchain import Blockchain
+from .market import Market, _parse_amount
+from .utils import addTzInfo, formatToTimeStamp
+
+log = logging.getLogger(__name__)
+
+
+class CandleStore(SQLiteFile, SQLiteCommon):
+    """Local, append-only store of the trades of an internal market from which
+    OHLCV candles of any resolution are computed
+
+    :param Market market: Market of the trades (default: ``HIVE:HBD``)
+    :param Steem blockchain_instance: Steem instance
+    :param str data_dir: Directory of the sqlite file (default: nectar user data dir)
+    :param str profile: Name of the sqlite file (default: ``candles_<QUOTE>_<BASE>``)
+
+    Trades are stored as integer satoshis together with their unix timestamp.
+    The store is filled either from ``get_trade_history`` pages (:func:`sync`) or
+    from ``fill_order`` virtual operations (:func:`apply`, :func:`stream`) and
+    only new trades are downloaded on each call. Resampling, volume and VWAP
+    are aggregated inside sqlite, so no trade is converted into a Python object.
+
+    ``get_trade_history`` does not return the block position of a trade, so
+    trades are identified by their timestamp, amounts and the number of
+    identical trades before them in the same second. A trade which is
+    stored again, by :func:`sync` and :func:`stream` or by a restarted
+    stream, is ignored.
+
+    .. code-block:: python
+
+        from nectar.candlestore import CandleStore
+
+        store = CandleStore("HIVE:HBD")
+        store.sync()
+        for candle in store.candles(interval=3600):
+            print(candle["open_time"], candle["close"], candle["vwap"])
+
+    """
+
+    __tablename__ = "trades"
+    __cursortable__ = "trades_cursor"
+
+    def __init__(
+        self, market=None, blockchain_instance=None, data_dir=None, profile=None, **kwargs
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if not isinstance(market, Market):
+            market = Market(market, blockchain_instance=self.blockchain)
+        self.market = market
+        self.quote = market["quote"]
+        self.base = market["base"]
+        self._assets = {}
+        for asset in [self.quote, self.base]:
+            self._assets[asset["symbol"]] = asset
+            self._assets[asset["asset"]] = asset
+        self._price_factor = 10 ** (self.quote["precision"] - self.base["precision"])
+
+        if profile is None:
+            profile = "candles_%s_%s" % (self.quote["symbol"], self.base["symbol"])
+        file_kwargs = {"profile": profile}
+        if data_dir is not None:
+            file_kwargs["data_dir"] = data_dir
+        SQLiteFile.__init__(self, **file_kwargs)
+        if not self.exists():
+            self.create()
+        # numbering of the trades of the block which was applied last
+        self._apply_block = None
+        self._apply_counts = {}
+
+    def exists(self):
+        """Check if the database table exists"""
+        query = (
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.__tablename__,),
+        )
+        return True if self.sql_fetchone(query) else False
+
+    def create(self):
+        """Create the trade table in the SQLite database"""
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp INTEGER NOT NULL,
+                quote_amount INTEGER NOT NULL,
+                base_amount INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                UNIQUE (timestamp, quote_amount, base_amount, seq)
+            )""".format(self.__tablename__),
+            )
+        )
+        self.sql_execute(
+            ("CREATE INDEX {0}_timestamp ON {0} (timestamp)".format(self.__tablename__),)
+        )
+        self.sql_execute(
+            (
+                "CREATE TABLE {} (id INTEGER PRIMARY KEY, block_num INTEGER NOT NULL)".format(
+                    self.__cursortable__
+                ),
+            )
+        )
+
+    def wipe(self):
+        """Removes all stored trades and the stream cursor"""
+        self.sql_execute(("DELETE FROM {}".format(self.__tablename__),))
+        self.sql_execute(("DELETE FROM {}".format(self.__cursortable__),))
+
+    @property
+    def cursor(self):
+        """Block at which :func:`stream` continues (or None)"""
+        row = self.sql_fetchone(("SELECT block_num FROM {}".format(self.__cursortable__),))
+        return row[0] if row else None
+
+    def __len__(self):
+        return self.sql_fetchone(("SELECT COUNT(*) FROM {}".format(self.__tablename__),))[0]
+
+    def last_timestamp(self):
+        """Returns the unix timestamp of the newest stored trade (or None)"""
+        return self.sql_fetchone(("SELECT MAX(timestamp) FROM {}".format(self.__tablename__),))[0]
+
+    def _trade_row(self, timestamp, current_pays, open_pays):
+        """Converts a trade into a ``(timestamp, quote_amount, base_amount)`` row"""
+        current_amount, current_symbol = _parse_amount(current_pays, self._assets)
+        open_amount, open_symbol = _parse_amount(open_pays, self._assets)
+        if current_symbol is None or open_symbol is None or current_symbol == open_symbol:
+            return None
+        if not isinstance(timestamp, int):
+            timestamp = formatToTimeStamp(timestamp)
+        if current_symbol == self.quote["symbol"]:
+            return (timestamp, current_amount, open_amount)
+        return (timestamp, open_amount, current_amount)
+
+    @staticmethod
+    def _numbered(rows, counts=None):
+        """Appends to each row the number of identical rows before it"""
+        if counts is None:
+            counts = {}
+        ret = []
+        for row in rows:
+            seq = counts.get(row, 0)
+            counts[row] = seq + 1
+            ret.append(row + (seq,))
+        return ret
+
+    def add_trades(self, rows):
+        """Appends trades to the store and returns the number of new trades
+
+        :param list rows: list of ``(timestamp, quote_amount, base_amount)`` tuples,
+            amounts as integer satoshis
+
+        All trades of a second must be given, in the order of the chain,
+        identical trades are numbered in the given order.
+        """
+        return self._insert(self._numbered(rows))
+
+    def _insert(self, rows, cursor=None):
+        """Stores numbered rows, and the stream cursor in the same transaction"""
+        if not rows and cursor is None:
+            return 0
+        connection = sqlite3.connect(self.sqlite_file)
+        try:
+            connection.executemany(
+                "INSERT OR IGNORE INTO {} (timestamp, quote_amount, base_amount, seq) "
+                "VALUES (?, ?, ?, ?)".format(self.__tablename__),
+                rows,
+            )
+            cnt = connection.total_changes
+            if cursor is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO {} VALUES (0, ?)".format(self.__cursortable__),
+                    (cursor,),
+                )
+            connection.commit()
+        finally:
+            connection.close()
+        return cnt
+
+    def _fill_row(self, op):
+        """Returns the ``(timestamp, quote_amount, base_amount)`` row of a
+        ``fill_order`` operation, or None"""
+        if "op" in op:
+            if isinstance(op["op"], dict):
+                op_type, value = op["op"]["type"], op["op"]["value"]
+            else:
+                op_type, value = op["op"]
+        else:
+            op_type, value = op["type"], op
+        if op_type not in ["fill_order", "fill_order_operation"]:
+            return None
+        return self._trade_row(op["timestamp"], value["current_pays"], value["open_pays"])
+
+    def apply(self, op):
+        """Appends the trade of a ``fill_order`` operation
+
+        :param dict op: ``fill_order`` operation as yielded by
+            :func:`nectar.blockchain.Blockchain.stream` (``raw_ops`` True or False)
+
+        The ops of a block must be applied in their order. Returns True
+        when a new trade was stored.
+        """
+        row = self._fill_row(op)
+        if row is None:
+            return False
+        block = op.get("block_num") or row[0]
+        if block != self._apply_block:
+            self._apply_block = block
+            self._apply_counts = {}
+        return self._insert(self._numbered([row], self._apply_counts)) > 0
+
+    def sync(self, start=None, stop=None, limit=1000):
+        """Downloads all trades since the newest stored trade with ``get_trade_history``
+
+        :param datetime start: Start date, when the store is empty (default: 24h before ``stop``)
+        :param datetime stop: Stop date (default: now)
+        :param int limit: Number of trades fetched with each call
+
+        Returns the number of new trades.
+        """
+        if stop is None:
+            stop = datetime.now(timezone.utc)
+        stop = addTzInfo(stop)
+        boundary = self.last_timestamp()
+        if boundary is not None:
+            # the newest stored second is loaded again, its trades are ignored
+            start = datetime.fromtimestamp(boundary, tz=timezone.utc)
+        elif start is None:
+            start = stop - timedelta(hours=24)
+        start = addTzInfo(start)
+        cnt = 0
+        while start < stop:
+            trades = self.market.trades(start=start, stop=stop, limit=limit, raw_data=True)
+            rows = []
+            for trade in trades:
+                row = self._trade_row(trade["date"], trade["current_pays"], trade["open_pays"])
+                if row is not None:
+                    rows.append(row)
+            # each page starts with the first trade of its first second
+            cnt += self.add_trades(rows)
+            if len(trades) < limit:
+                break
+            timestamps = [formatToTimeStamp(trade["date"]) for trade in trades]
+            if timestamps[-1] == formatToTimeStamp(start):
+                log.warning("More than %d trades at %s, increase limit" % (limit, start))
+                break
+            start = datetime.fromtimestamp(timestamps[-1], tz=timezone.utc)
+        return cnt
+
+    def stream(self, start=None, stop=None, **kwargs):
+        """Appends the trades of all ``fill_order`` operations from the block stream
+        and yields the operations
+
+        :param int start: Start at this block, when :attr:`cursor` is not behind it
+        :param int stop: Stop at this block
+
+        The trades of a block are stored together with the cursor, so that a
+        restarted stream continues at the block after the last stored one.
+        All other parameters are handed over to :func:`nectar.blockchain.Blockchain.stream`.
+        """
+        cursor = self.cursor
+        if cursor is not None and (start is None or cursor > start):
+            start = cursor
+        mode = kwargs.pop("mode", "irreversible")
+        blockchain = Blockchain(mode=mode, blockchain_instance=self.blockchain)
+        block_num = None
+        rows = []
+        counts = {}
+        try:
+            for op in blockchain.stream(
+                opNames=["fill_order"],
+                start=start,
+                stop=stop,
+                raw_ops=True,
+                only_virtual_ops=True,
+                **kwargs,
+            ):
+                if op["block_num"] != block_num:
+                    if rows:
+                        self._insert(rows, cursor=block_num + 1)
+                    block_num = op["block_num"]
+                    rows = []
+                    counts = {}
+                row = self._fill_row(op)
+                if row is not None:
+                    rows.extend(self._numbered([row], counts))
+                yield op
+            if stop is not None:
+                block_num = max(block_num or 0, stop)
+            if block_num is not None:
+                self._insert(rows, cursor=block_num + 1)
+                rows = []
+        finally:
+            # the trades of an interrupted block are stored, it is streamed again
+            self._insert(rows)
+
+    def _time_filter(self, start, stop):
+        where = []
+        args = []
+        if start is not None:
+            where.append("timestamp >= ?")
+            args.append(start if isinstance(start, int) else formatToTimeStamp(start))
+        if stop is not None:
+            where.append("timestamp < ?")
+            args.append(stop if isinstance(stop, int) else formatToTimeStamp(stop))
+        if not where:
+            return "", args
+        return " WHERE " + " AND ".join(where), args
+
+    def candles(self, interval=60, start=None, stop=None):
+        """Returns OHLCV candles
+
+        :param int interval: Candle size in seconds, e.g. 60, 3600 or 86400
+            (a ``timedelta`` is also accepted)
+        :param datetime start: Only trades at or after this time
+        :param datetime stop: Only trades before this time
+
+        Each candle is a dict with ``open_time``, ``open``, ``high``, ``low``,
+        ``close`` (prices in ``base``/``quote``), ``quote_volume``,
+        ``base_volume``, ``vwap`` and ``trades``. Candles without trades are omitted.
+        """
+        if isinstance(interval, timedelta):
+            interval = int(interval.total_seconds())
+        if interval <= 0:
+            raise ValueError("interval must be positive!")
+        where, args = self._time_filter(start, stop)
+        query = (
+            """
+            SELECT bucket, MIN(price), MAX(price), SUM(quote_amount), SUM(base_amount),
+                COUNT(*), MAX(open_price), MAX(close_price)
+            FROM (
+                SELECT timestamp / {interval} AS bucket, quote_amount, base_amount,
+                    CAST(base_amount AS REAL) / quote_amount AS price,
+                    FIRST_VALUE(CAST(base_amount AS REAL) / quote_amount) OVER w AS open_price,
+                    LAST_VALUE(CAST(base_amount AS REAL) / quote_amount) OVER w AS close_price
+                FROM {table}{where}
+                WINDOW w AS (
+                    PARTITION BY timestamp / {interval} ORDER BY timestamp, id
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                )
+            )
+            GROUP BY bucket ORDER BY bucket
+            """.format(interval=int(interval), table=self.__tablename__, where=where),
+            args,
+        )
+        quote_factor = 10 ** self.quote["precision"]
+        base_factor = 10 ** self.base["precision"]
+        ret = []
+        for bucket, low, high, quote, base, trades, open_price, close_price in self.sql_fetchall(
+            query
+        ):
+            ret.append(
+                {
+                    "open_time": datetime.fromtimestamp(bucket * interval, tz=timezone.utc),
+                    "open": open_price * self._price_factor,
+                    "high": high * self._price_factor,
+                    "low": low * self._price_factor,
+                    "close": close_price * self._price_factor,
+                    "quote_volume": quote / quote_factor,
+                    "base_volume": base / base_factor,
+                    "vwap": base / quote * self._price_factor,
+                    "trades": trades,
+                }
+            )
+        return ret
+
+    def volume(self, start=None, stop=None):
+        """Returns the traded volume as dict with the quote and base symbol as keys
+
+        :param datetime start: Only trades at or after this time
+        :param datetime stop: Only trades before this time
+        """
+        where, args = self._time_filter(start, stop)
+        quote, base = self.sql_fetchone(
+            (
+                "SELECT TOTAL(quote_amount), TOTAL(base_amount) FROM {}{}".format(
+                    self.__tablename__, where
+                ),
+                args,
+            )
+        )
+        return {
+            self.quote["symbol"]: quote / 10 ** self.quote["precision"],
+            self.base["symbol"]: base / 10 ** self.base["precision"],
+        }
+
+    def vwap(self, start=None, stop=None):
+        """Returns the volume weighted average price in ``base``/``quote`` (or None)
+
+        :param datetime start: Only trades at or after this time
+        :param datetime stop: Only trades before this time
+        """
+        where, args = self._time_filter(start, stop)
+        quote, base = self.sql_fetchone(
+            (
+                "SELECT TOTAL(quote_amount), TOTAL(base_amount) FROM {}{}".format(
+                    self.__tablename__, where
+                ),
+                args,
+            )
+        )
+        if not quote:
+            return None
+        return base / quote * self._price_factor
+
+    def market_history(self, bucket_seconds=300, start=None, stop=None):
+        """Returns the candles in the format of :func:`nectar.market.Market.market_history`
+
+        :param int bucket_seconds: Bucket size in seconds
+        :param datetime start: Only trades at or after this time
+        :param datetime stop: Only trades before this time
+        """
+        quote_key = self.quote["symbol"].lower()
+        base_key = self.base["symbol"].lower()
+        quote_factor = 10 ** self.quote["precision"]
+        base_factor = 10 ** self.base["precision"]
+        ret = []
+        for candle in self.candles(interval=bucket_seconds, start=start, stop=stop):
+            ret.append(
+                {
+                    "open": candle["open_time"],
+                    "seconds": bucket_seconds,
+                    "%s_volume" % quote_key: int(round(candle["quote_volume"] * quote_factor)),
+                    "%s_volume" % base_key: int(round(candle["base_volume"] * base_factor)),
+                    "open_price": candle["open"],
+                    "high_price": candle["high"],
+                    "low_price": candle["low"],
+                    "close_price": candle["close"],
+                }
+            )
+        return ret
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.market.get_string())
@@ -18,13 +18,14 @@ from click_shell import shell
 from prettytable import PrettyTable
 
 from nectar import exceptions
-from nectar.account import Account
+from nectar.account import Account, Accounts
 from nectar.amount import Amount
 from nectar.asciichart import AsciiChart
 from nectar.asset import Asset
 from nectar.block import Block
 from nectar.blockchain import Blockchain
 from nectar.blurt import Blurt
+from nectar.clidaemon import CliClient, CliDaemon, default_socket_path, running_daemon
 from nectar.comment import Comment
 from nectar.community import Communities, Community
 from nectar.conveyor import Conveyor
@@ -260,6 +261,18 @@ def export_trx(tx, export):
             json.dump(tx, f)
 
 
+def load_accounts(stm, account):
+    """Loads all accounts with one bulk call, raises for missing accounts"""
+    if not stm.is_connected():
+        raise exceptions.OfflineHasNoRPCException("No RPC available in offline mode!")
+    accounts = Accounts(account, blockchain_instance=stm)
+    found = [a["name"] for a in accounts]
+    for name in account:
+        if name not in found:
+            raise exceptions.AccountDoesNotExistsException(name)
+    return accounts
+
+
 @shell(
     prompt="hive-nectar> ",
     intro="Starting hive-nectar... (use help to list all commands)",
@@ -381,6 +394,29 @@ def cli(
             steem = True
         elif config["default_chain"].lower() == "blurt":
             blurt = True
+    chain = "hive" if hive else "steem" if steem else "blurt"
+    # Inside a daemon, commands without own connection, wallet or verbosity options
+    # share one warm instance per chain
+    daemon = running_daemon()
+    if daemon is not None and (
+        node
+        or offline
+        or keys_list
+        or create_link
+        or use_ledger
+        or token
+        or path
+        or no_wallet
+        or verbose != 3
+    ):
+        daemon = None
+    if daemon is not None and daemon.get_instance(chain) is not None:
+        stm = daemon.get_instance(chain)
+        stm.nobroadcast = no_broadcast
+        stm.unsigned = unsigned
+        stm.expiration = expires
+        set_shared_blockchain_instance(stm)
+        return
     if hive:
         stm = Hive(
             node=node,
@@ -439,6 +475,8 @@ def cli(
             autoconnect=autoconnect,
         )
 
+    if daemon is not None:
+        daemon.add_instance(chain, stm)
     set_shared_blockchain_instance(stm)
 
     pass
@@ -1794,8 +1832,7 @@ def power(account):
     if len(account) == 0:
         if "default_account" in stm.config:
             account = [stm.config["default_account"]]
-    for name in account:
-        a = Account(name, blockchain_instance=stm)
+    for a in load_accounts(stm, account):
         print("\n@%s" % a.name)
         a.print_info(use_table=True)
 
@@ -1810,8 +1847,7 @@ def balance(account):
     if len(account) == 0:
         if "default_account" in stm.config:
             account = [stm.config["default_account"]]
-    for name in account:
-        a = Account(name, blockchain_instance=stm)
+    for a in load_accounts(stm, account):
         print("\n@%s" % a.name)
         t = PrettyTable(["Account", stm.token_symbol, stm.backed_token_symbol, "VESTS"])
         t.align = "r"
@@ -1865,8 +1901,7 @@ def interest(account):
         ["Account", "Last Interest Payment", "Next Payment", "Interest rate", "Interest"]
     )
     t.align = "r"
-    for a in account:
-        a = Account(a, blockchain_instance=stm)
+    for a in load_accounts(stm, account):
         i = a.interest()
         t.add_row(
             [
@@ -6277,6 +6312,70 @@ def draw(
         reply_comment.reply(body, author=account)
 
 
+@cli.command()
+@click.option(
+    "--socket", "socket_path", help="Path of the unix socket (default: in the nectar data dir)"
+)
+@click.option(
+    "--unlock", "-u", is_flag=True, default=False, help="Unlock the wallet before serving commands"
+)
+@click.option(
+    "--unlock-timeout",
+    "-t",
+    type=float,
+    default=None,
+    help="Lock the wallet again after this number of seconds",
+)
+@click.option("--stop", is_flag=True, default=False, help="Stop the running daemon")
+@click.option("--status", is_flag=True, default=False, help="Show the state of the running daemon")
+@click.option("--lock", is_flag=True, default=False, help="Lock the wallet of the running daemon")
+def daemon(socket_path, unlock, unlock_timeout, stop, status, lock):
+    """Serve hive-nectar commands from a long-running process
+
+    While the daemon runs, hive-nectar sends its commands over a unix socket
+    to the daemon, which keeps the node connection, the chain state and the
+    (optionally unlocked) wallet between commands. Set NECTAR_NO_DAEMON=1
+    to run a command without the daemon. A daemon on a non-default --socket
+    is used when NECTAR_DAEMON_SOCKET points to it.
+
+    Examples:
+
+    hive-nectar daemon --unlock --unlock-timeout 3600 &
+
+    hive-nectar daemon --status
+    """
+    socket_path = socket_path or default_socket_path()
+    client = CliClient(socket_path)
+    if stop or status or lock:
+        if stop:
+            reply = client.send({"command": "stop"}, timeout=5)
+        elif lock:
+            reply = client.send({"command": "lock"}, timeout=5)
+        else:
+            reply = client.send({"command": "status"}, timeout=5)
+        if reply is None:
+            print("No daemon is running on %s" % socket_path)
+            return
+        if status:
+            t = PrettyTable(["Key", "Value"])
+            t.align = "l"
+            for key, value in json.loads(reply["stdout"]).items():
+                t.add_row([key, value])
+            print(t)
+        else:
+            print(reply["stdout"], end="")
+        return
+    stm = shared_blockchain_instance()
+    cli_daemon = CliDaemon(socket_path=socket_path, unlock_timeout=unlock_timeout)
+    cli_daemon.add_instance(stm.__class__.__name__.lower(), stm)
+    if unlock:
+        if not unlock_wallet(stm):
+            return
+        cli_daemon.wallet_unlocked()
+    print("Serving hive-nectar commands on %s" % socket_path)
+    cli_daemon.serve()
+
+
 if __name__ == "__main__":
     if getattr(sys, "frozen", False):
         os.environ["SSL_CERT_FILE"] = os.path.join(sys._MEIPASS, "lib", "cert.pem")
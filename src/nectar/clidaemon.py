@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+log = logging.getLogger(__name__)
+
+# Set in the daemon process while it serves CLI commands
+_running_daemon = None
+
+# Options of the cli group which take a value
+_VALUE_OPTIONS = ("--node", "-n", "--keys", "-k", "--path", "--expires", "-e", "--verbose", "-v")
+
+
+def default_socket_path():
+    """Returns the socket path of the CLI daemon, ``NECTAR_DAEMON_SOCKET``
+    overrides the default inside the nectar user data dir"""
+    if os.environ.get("NECTAR_DAEMON_SOCKET"):
+        return os.environ["NECTAR_DAEMON_SOCKET"]
+    from appdirs import user_data_dir
+
+    return os.path.join(user_data_dir("nectar", "nectar"), "cli-daemon.sock")
+
+
+def running_daemon():
+    """Returns the :class:`CliDaemon` of this process (or None)"""
+    return _running_daemon
+
+
+class _DaemonServer(socketserver.UnixStreamServer):
+    def service_actions(self):
+        self.cli_daemon.service_actions()
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+            reply = self.server.cli_daemon.handle_request(request)
+        except Exception as e:
+            reply = {"exit_code": 1, "stdout": "", "stderr": "%s\n" % str(e)}
+        self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class CliDaemon(object):
+    """Runs ``hive-nectar`` commands from a long-running process
+
+    :param str socket_path: path of the unix socket (default: :func:`default_socket_path`)
+    :param float unlock_timeout: the wallets are locked again this number of
+        seconds after they were unlocked (default: None, never)
+
+    Commands which are sent by :class:`CliClient` run inside the daemon
+    process, one after the other. The blockchain instance of each chain is
+    created once and reused by all commands without their own connection
+    options (``--node``, ``--offline``, ``--keys``, ...). It keeps its
+    rpc connection, the cached chain properties, the object caches and,
+    when the daemon was started with ``--unlock``, the unlocked wallet.
+
+    .. code-block:: bash
+
+        hive-nectar daemon --unlock --unlock-timeout 3600 &
+        hive-nectar balance thecrazygm
+        hive-nectar daemon --stop
+
+    """
+
+    def __init__(self, socket_path=None, unlock_timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.unlock_timeout = unlock_timeout
+        self.instances = {}
+        self.started = None
+        self.unlocked_at = None
+        self.served = 0
+        self.server = None
+
+    def get_instance(self, chain):
+        """Returns the shared blockchain instance of a chain (or None)"""
+        return self.instances.get(chain)
+
+    def add_instance(self, chain, blockchain_instance):
+        """Keeps a blockchain instance for the following commands"""
+        self.instances[chain] = blockchain_instance
+
+    def wallet_unlocked(self):
+        """Marks the wallets as unlocked, they are locked again after ``unlock_timeout``"""
+        self.unlocked_at = time.time()
+
+    def lock_wallets(self):
+        """Locks the wallets of all shared instances"""
+        for stm in self.instances.values():
+            try:
+                stm.wallet.lock()
+            except Exception as e:
+                log.debug(str(e))
+        self.unlocked_at = None
+
+    def service_actions(self):
+        if (
+            self.unlocked_at is not None
+            and self.unlock_timeout is not None
+            and time.time() - self.unlocked_at > self.unlock_timeout
+        ):
+            log.info("Unlock timeout reached, locking the wallet")
+            self.lock_wallets()
+
+    def status(self):
+        """Returns the state of the daemon as dict"""
+        wallet_unlocked = False
+        for stm in self.instances.values():
+            try:
+                wallet_unlocked = wallet_unlocked or stm.wallet.unlocked()
+            except Exception:
+                pass
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime": time.time() - self.started if self.started else 0,
+            "chains": sorted(self.instances),
+            "wallet_unlocked": wallet_unlocked,
+            "served": self.served,
+        }
+
+    def run_cli(self, args, cwd=None):
+        """Runs one CLI command inside the daemon process"""
+        from click.testing import CliRunner
+
+        from nectar.cli import cli
+
+        self.service_actions()
+        cli_log = logging.getLogger("nectar.cli")
+        handlers = list(cli_log.handlers)
+        old_cwd = os.getcwd()
+        if cwd is not None:
+            os.chdir(cwd)
+        try:
+            # Commands which wait for input fail instead of blocking the daemon
+            result = CliRunner().invoke(cli, args, input="")
+        finally:
+            os.chdir(old_cwd)
+            # every command adds a handler to the cli logger, keep only the previous ones
+            for handler in cli_log.handlers[:]:
+                if handler not in handlers:
+                    cli_log.removeHandler(handler)
+        self.served += 1
+        try:
+            stdout, stderr = result.stdout, result.stderr
+        except ValueError:
+            stdout, stderr = result.output, ""
+        if result.exception is not None and not isinstance(result.exception, SystemExit):
+            stderr += "".join(traceback.format_exception(*result.exc_info))
+        return {"exit_code": result.exit_code, "stdout": stdout, "stderr": stderr}
+
+    def handle_request(self, request):
+        command = request.get("command", "run")
+        if command == "status":
+            return {"exit_code": 0, "stdout": json.dumps(self.status()) + "\n", "stderr": ""}
+        elif command == "stop":
+            # shutdown() waits for the serve loop, which is busy with this request
+            threading.Thread(target=self.server.shutdown).start()
+            return {"exit_code": 0, "stdout": "Daemon stopped\n", "stderr": ""}
+        elif command == "lock":
+            self.lock_wallets()
+            return {"exit_code": 0, "stdout": "Wallet locked\n", "stderr": ""}
+        return self.run_cli(request.get("args", []), cwd=request.get("cwd"))
+
+    def serve(self, poll_interval=0.5):
+        """Serves CLI commands until the daemon is stopped"""
+        global _running_daemon
+        if os.path.exists(self.socket_path):
+            if CliClient(self.socket_path).status() is not None:
+                raise RuntimeError("A daemon is already running on %s" % self.socket_path)
+            os.remove(self.socket_path)
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir and not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir)
+        old_umask = os.umask(0o077)
+        try:
+            self.server = _DaemonServer(self.socket_path, _DaemonRequestHandler)
+        finally:
+            os.umask(old_umask)
+        # only the owner may use the unlocked wallet
+        os.chmod(self.socket_path, 0o600)
+        self.server.cli_daemon = self
+        self.started = time.time()
+        _running_daemon = self
+        try:
+            self.server.serve_forever(poll_interval=poll_interval)
+        finally:
+            _running_daemon = None
+            self.server.server_close()
+            self.lock_wallets()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+class CliClient(object):
+    """Sends ``hive-nectar`` commands to a running :class:`CliDaemon`
+
+    :param str socket_path: path of the unix socket (default: :func:`default_socket_path`)
+    :param float timeout: socket timeout in seconds (default: None, wait for
+        the command to finish)
+    """
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def available(self):
+        """Returns True when a daemon socket exists"""
+        return hasattr(socket, "AF_UNIX") and os.path.exists(self.socket_path)
+
+    def send(self, request, timeout=None):
+        """Sends a request, returns the reply or None when no daemon answers"""
+        if not self.available():
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                return None
+            sock.sendall((json.dumps(request) + "\n").encode())
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            sock.close()
+        if not data:
+            return None
+        return json.loads(data)
+
+    def run(self, args):
+        """Runs a CLI command in the daemon, returns the reply or None"""
+        return self.send({"command": "run", "args": list(args), "cwd": os.getcwd()})
+
+    def status(self):
+        """Returns the daemon status or None when no daemon is running"""
+        reply = self.send({"command": "status"}, timeout=5)
+        if reply is None:
+            return None
+        return json.loads(reply["stdout"])
+
+    def stop(self):
+        """Stops the daemon, returns False when no daemon was running"""
+        return self.send({"command": "stop"}, timeout=5) is not None
+
+
+def subcommand(args):
+    """Returns the first non-option argument of the CLI arguments, or None"""
+    args = iter(args)
+    for arg in args:
+        if arg == "--":
+            return next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+        elif arg in _VALUE_OPTIONS:
+            # skip the value of the option
+            next(args, None)
+    return None
+
+
+def main(args=None):
+    """Entry point of ``hive-nectar``
+
+    Commands are sent to a running daemon, when one listens on the daemon
+    socket. Without daemon, or when ``NECTAR_NO_DAEMON`` is set, the command
+    runs in this process. The interactive shell (no arguments) and the
+    ``daemon`` command itself always run locally.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    if args and subcommand(args) != "daemon" and not os.environ.get("NECTAR_NO_DAEMON"):
+        reply = CliClient().run(args)
+        if reply is not None:
+            sys.stdout.write(reply["stdout"])
+            sys.stderr.write(reply["stderr"])
+            sys.exit(reply["exit_code"])
+    from nectar.cli import cli
+
+    cli(args)
@@ -2,6 +2,7 @@
 import json
 import logging
 import math
+from array import array
 from datetime import date, datetime, timezone
 
 from nectar.constants import (
@@ -19,6 +20,7 @@ from .exceptions import ContentDoesNotExistsException, VotingInvalidOnArchivedPo
 from .instance import shared_blockchain_instance
 from .price import Price
 from .utils import (
+    _batched_call,
     construct_authorperm,
     formatTimeString,
     formatToTimeStamp,
@@ -780,18 +782,42 @@ class Comment(BlockchainObject):
             return replies
         return [Comment(c, blockchain_instance=self.blockchain) for c in replies]
 
-    def get_all_replies(self, parent=None):
-        """Returns all content replies"""
+    def get_all_replies(self, parent=None, max_depth=None, max_size=None):
+        """Returns all content replies
+
+        :param Comment parent: Post of which the replies are returned (default: this post)
+        :param int max_depth: Only replies up to this depth below ``parent`` are returned
+        :param int max_size: Maximum number of returned replies
+
+        The replies are loaded level by level with :class:`ReplyTree` and are
+        returned in breadth-first order.
+        """
         if parent is None:
             parent = self
-        if parent["children"] > 0:
-            children = parent.get_replies()
-            if children is None:
-                return []
-            for cc in children[:]:
-                children.extend(self.get_all_replies(parent=cc))
-            return children
-        return []
+        if parent["children"] == 0:
+            return []
+        tree = ReplyTree(
+            parent,
+            max_depth=max_depth,
+            max_size=max_size,
+            observer=self.observer,
+            blockchain_instance=self.blockchain,
+        )
+        return tree.get_comments()
+
+    def get_reply_tree(self, max_depth=None, max_size=None):
+        """Returns the discussion below this post as :class:`ReplyTree`
+
+        :param int max_depth: Only replies up to this depth are loaded
+        :param int max_size: Maximum number of loaded replies
+        """
+        return ReplyTree(
+            self,
+            max_depth=max_depth,
+            max_size=max_size,
+            observer=self.observer,
+            blockchain_instance=self.blockchain,
+        )
 
     def get_parent(self, children=None):
         """Returns the parent post with depth == 0"""
@@ -972,6 +998,186 @@ class Comment(BlockchainObject):
         )
 
 
+class ReplyTree(object):
+    """Loads all replies below a post level by level into a flat, indexed tree
+
+    :param str authorperm: Root post as ``@author/permlink`` (or :class:`Comment`)
+    :param int max_depth: Only replies up to this depth below the root are loaded
+    :param int max_size: Maximum number of loaded replies
+    :param int batch_size: Number of ``get_discussion`` calls sent in one batch request
+    :param str observer: Observer account handed to ``bridge.get_discussion``
+    :param Steem blockchain_instance: Steem() instance to use when accesing a RPC
+
+    ``bridge.get_discussion`` returns a post together with its replies, each of them
+    listing the keys of its own replies. The tree is walked breadth-first from the
+    root; only nodes whose data was not part of an earlier answer are requested, and
+    all requests of one level are sent as a single batched RPC call. Every reply is
+    stored once (keyed by ``author/permlink``) and gets an integer id in
+    breadth-first order, the root having id 0.
+
+    * ``keys``: ``author/permlink`` of every node
+    * ``parent``: parent id of every node (-1 for the root)
+    * ``children``: list of child ids for every node
+    * ``data``: raw ``bridge`` data of every node
+
+    .. code-block:: python
+
+        from nectar.comment import ReplyTree
+
+        tree = ReplyTree("@gtg/hive-first-community-hardfork-complete", max_depth=2)
+        for child_id in tree.children[0]:
+            print(tree.keys[child_id])
+
+    """
+
+    def __init__(
+        self,
+        authorperm,
+        max_depth=None,
+        max_size=None,
+        batch_size=20,
+        observer="",
+        blockchain_instance=None,
+        **kwargs,
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if isinstance(authorperm, Comment):
+            authorperm = authorperm.authorperm
+        [author, permlink] = resolve_authorperm(authorperm)
+        self.root = "%s/%s" % (author, permlink)
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.observer = observer
+        self.keys = []
+        self.index = {}
+        self.parent = array("i")
+        self.children = []
+        self.data = []
+        self.truncated = False
+        self.load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key.lstrip("@") in self.index
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __repr__(self):
+        return "<%s %s n=%d>" % (self.__class__.__name__, self.root, len(self.keys))
+
+    def _fetch(self, keys):
+        """Returns the merged ``get_discussion`` answers for all keys"""
+        rpc = self.blockchain.rpc
+        queries = []
+        for key in keys:
+            author, permlink = key.split("/", 1)
+            queries.append({"author": author, "permlink": permlink, "observer": self.observer})
+        # a deleted post is answered with an RPCError
+        ret = _batched_call(rpc.get_discussion, [(query,) for query in queries], api="bridge")
+        for query, r in zip(queries, ret):
+            if r is None:
+                log.warning("Could not load %s/%s" % (query["author"], query["permlink"]))
+        discussion = {}
+        for r in ret:
+            if isinstance(r, dict):
+                discussion.update(r)
+        return discussion
+
+    def _add(self, key, parent_id, data):
+        node_id = len(self.keys)
+        self.keys.append(key)
+        self.index[key] = node_id
+        self.parent.append(parent_id)
+        self.children.append([])
+        self.data.append(data)
+        if parent_id >= 0:
+            self.children[parent_id].append(node_id)
+        return node_id
+
+    def load(self):
+        """(Re)loads the tree"""
+        self.keys = []
+        self.index = {}
+        self.parent = array("i")
+        self.children = []
+        self.data = []
+        self.truncated = False
+        if not self.blockchain.is_connected():
+            return
+        self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        known = {}
+        visited = set([self.root])
+        level = [(self.root, -1)]
+        depth = 0
+        while level:
+            missing = [key for key, parent_id in level if key not in known]
+            for i in range(0, len(missing), self.batch_size):
+                known.update(self._fetch(missing[i : i + self.batch_size]))
+            next_level = []
+            for key, parent_id in level:
+                if key not in known:
+                    continue
+                if self.max_size is not None and len(self.keys) > self.max_size:
+                    self.truncated = True
+                    return
+                node_id = self._add(key, parent_id, known[key])
+                replies = known[key].get("replies", [])
+                if self.max_depth is not None and depth >= self.max_depth:
+                    if len(replies) > 0:
+                        self.truncated = True
+                    continue
+                for child in replies:
+                    if child not in visited:
+                        visited.add(child)
+                        next_level.append((child, node_id))
+            level = next_level
+            depth += 1
+
+    def get_children(self, key):
+        """Returns the keys of the direct replies of a node"""
+        return [self.keys[i] for i in self.children[self.index[key.lstrip("@")]]]
+
+    def get_parent(self, key):
+        """Returns the key of the parent node (None for the root)"""
+        parent_id = self.parent[self.index[key.lstrip("@")]]
+        if parent_id < 0:
+            return None
+        return self.keys[parent_id]
+
+    def get_depth(self, key):
+        """Returns the depth of a node below the root"""
+        node_id = self.index[key.lstrip("@")]
+        depth = 0
+        while self.parent[node_id] >= 0:
+            node_id = self.parent[node_id]
+            depth += 1
+        return depth
+
+    def get_comment(self, key):
+        """Returns a node as :class:`Comment` without an RPC call"""
+        return Comment(
+            dict(self.data[self.index[key.lstrip("@")]]),
+            observer=self.observer,
+            blockchain_instance=self.blockchain,
+        )
+
+    def get_comments(self):
+        """Returns all replies (without the root) as :class:`Comment` in breadth-first order"""
+        return [
+            Comment(dict(data), observer=self.observer, blockchain_instance=self.blockchain)
+            for data in self.data[1:]
+        ]
+
+
 class RecentReplies(list):
     """Obtain a list of recent replies
 
@@ -7,8 +7,6 @@ import struct
 from binascii import hexlify
 from datetime import datetime, timezone
 
-import requests
-
 from nectargraphenebase.ecdsasig import sign_message
 from nectargraphenebase.py23 import py23_bytes
 
@@ -91,6 +89,8 @@ class Conveyor(object):
         :param str key: Steem posting key for signing
 
         """
+        import requests
+
         params_bytes = py23_bytes(json.dumps(params), self.ENCODING)
         params_enc = base64.b64encode(params_bytes).decode(self.ENCODING)
         timestamp = datetime.now(timezone.utc).strftime(self.TIMEFORMAT)[:-3] + "Z"
@@ -304,6 +304,8 @@ class Conveyor(object):
             }
 
         """
+        import requests
+
         url = urljoin(self.url, "/.well-known/healthcheck.json")
         r = requests.get(url)
         return r.json()
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from .comment import Comment
+from .executor import node_instances
 from .instance import shared_blockchain_instance
 
 log = logging.getLogger(__name__)
@@ -81,14 +84,43 @@ class Discussions(object):
         self.blockchain = blockchain_instance or shared_blockchain_instance()
         self.lazy = lazy
         self.use_appbase = use_appbase
-
-    def get_discussions(self, discussion_type, discussion_query, limit=1000, raw_data=False):
+        self._prefetch_instance = None
+        self._prefetch_lock = threading.Lock()
+
+    def prefetch_instance(self):
+        """Returns the blockchain instance of the prefetch thread, it is
+        created on first use and reused by all following calls"""
+        with self._prefetch_lock:
+            if self._prefetch_instance is None:
+                self._prefetch_instance = node_instances(self.blockchain, 2)[1]
+            return self._prefetch_instance
+
+    def close(self):
+        """Closes the connection of the prefetch instance"""
+        with self._prefetch_lock:
+            if self._prefetch_instance is not None:
+                if self._prefetch_instance.rpc is not None:
+                    self._prefetch_instance.rpc.rpcclose()
+                self._prefetch_instance = None
+
+    def get_discussions(
+        self, discussion_type, discussion_query, limit=1000, raw_data=False, prefetch=False
+    ):
         """Get Discussions
 
+        Pages are fetched through :class:`CursorPaginator`, so discussions
+        are yielded lazily. With ``prefetch``, the next page is requested
+        while the current one is consumed.
+
         :param str discussion_type: Defines the used discussion query
         :param Query discussion_query: Defines the parameter for
                searching posts
         :param bool raw_data: returns list of comments when False, default is False
+        :param bool prefetch: fetch the next page in a background thread while
+            the current page is consumed, default is False. The background
+            thread uses its own blockchain instance on the same nodes, so the
+            loop body can use the blockchain instance. This instance is created
+            once per :class:`Discussions` object, :func:`close` closes it.
 
         .. testcode::
 
@@ -101,201 +133,147 @@ class Discussions(object):
                 count += 1
 
         """
+        if discussion_type not in _discussion_types:
+            raise ValueError("Wrong discussion_type")
         if limit >= 100 and discussion_query["limit"] == 0:
             discussion_query["limit"] = 100
         elif limit < 100 and discussion_query["limit"] == 0:
             discussion_query["limit"] = limit
-        query_count = 0
-        found_more_than_start_entry = True
-        if "start_author" in discussion_query:
-            start_author = discussion_query["start_author"]
-        else:
-            start_author = None
-        if "start_permlink" in discussion_query:
-            start_permlink = discussion_query["start_permlink"]
-        else:
-            start_permlink = None
-        if "start_tag" in discussion_query:
-            start_tag = discussion_query["start_tag"]
-        else:
-            start_tag = None
-        if "start_parent_author" in discussion_query:
-            start_parent_author = discussion_query["start_parent_author"]
-        else:
-            start_parent_author = None
         if not discussion_query["before_date"]:
             discussion_query["before_date"] = "1970-01-01T00:00:00"
-        while query_count < limit and found_more_than_start_entry:
-            rpc_query_count = 0
-            dd = None
-            discussion_query["start_author"] = start_author
-            discussion_query["start_permlink"] = start_permlink
-            discussion_query["start_tag"] = start_tag
-            discussion_query["start_parent_author"] = start_parent_author
-            if discussion_type == "trending":
-                dd = Discussions_by_trending(
-                    discussion_query, blockchain_instance=self.blockchain, lazy=self.lazy
-                )
-            elif discussion_type == "author_before_date":
-                dd = Discussions_by_author_before_date(
-                    author=discussion_query["author"],
-                    start_permlink=discussion_query["start_permlink"],
-                    before_date=discussion_query["before_date"],
-                    limit=discussion_query["limit"],
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                )
-            elif discussion_type == "payout":
-                dd = Comment_discussions_by_payout(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "post_payout":
-                dd = Post_discussions_by_payout(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "created":
-                dd = Discussions_by_created(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "active":
-                dd = Discussions_by_active(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "cashout":
-                dd = Discussions_by_cashout(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "votes":
-                dd = Discussions_by_votes(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "children":
-                dd = Discussions_by_children(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "hot":
-                dd = Discussions_by_hot(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "feed":
-                dd = Discussions_by_feed(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "blog":
-                dd = Discussions_by_blog(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "comments":
-                dd = Discussions_by_comments(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "promoted":
-                dd = Discussions_by_promoted(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "replies":
-                dd = Discussions_by_replies(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                    raw_data=raw_data,
-                )
-            elif discussion_type == "tags":
-                dd = Trending_tags(
-                    discussion_query,
-                    blockchain_instance=self.blockchain,
-                    lazy=self.lazy,
-                    use_appbase=self.use_appbase,
-                )
-            else:
-                raise ValueError("Wrong discussion_type")
-            if not dd:
-                return
-
-            for d in dd:
-                double_result = False
-                if discussion_type == "tags":
-                    if query_count != 0 and rpc_query_count == 0 and (d["name"] == start_tag):
-                        double_result = True
-                        if len(dd) == 1:
-                            found_more_than_start_entry = False
-                    start_tag = d["name"]
-                elif discussion_type == "replies":
-                    if (
-                        query_count != 0
-                        and rpc_query_count == 0
-                        and (d["author"] == start_parent_author and d["permlink"] == start_permlink)
-                    ):
-                        double_result = True
-                        if len(dd) == 1:
-                            found_more_than_start_entry = False
-                    start_parent_author = d["author"]
-                    start_permlink = d["permlink"]
-                else:
-                    if (
-                        query_count != 0
-                        and rpc_query_count == 0
-                        and (d["author"] == start_author and d["permlink"] == start_permlink)
-                    ):
-                        double_result = True
-                        if len(dd) == 1:
-                            found_more_than_start_entry = False
-                    start_author = d["author"]
-                    start_permlink = d["permlink"]
-                rpc_query_count += 1
-                if not double_result:
-                    query_count += 1
-                    if query_count <= limit:
-                        yield d
+        discussion_class, cursor_fields, query_fields, comments = _discussion_types[discussion_type]
+        start = tuple(discussion_query.get(key) for key in query_fields)
+
+        def fetch_page(cursor):
+            blockchain = self.blockchain
+            if prefetch and cursor != start:
+                # following pages are fetched in the prefetch thread, the rpc
+                # of an instance is not shared between threads
+                blockchain = self.prefetch_instance()
+            # Every page works on its own copy, the prefetch thread must not
+            # see cursor updates of the page which is currently consumed.
+            query = dict(discussion_query)
+            query.update(zip(query_fields, cursor))
+            return discussion_class(
+                query,
+                blockchain_instance=blockchain,
+                lazy=self.lazy,
+                use_appbase=self.use_appbase,
+                raw_data=True,
+            )
+
+        if comments and not raw_data:
+
+            def wrap(post):
+                return Comment(post, lazy=self.lazy, blockchain_instance=self.blockchain)
+
+        else:
+            wrap = None
+        return iter(
+            CursorPaginator(
+                fetch_page,
+                cursor_fields,
+                start=start,
+                limit=limit,
+                prefetch=prefetch,
+                wrap=wrap,
+            )
+        )
+
+
+class CursorPaginator(object):
+    """Generic cursor based pagination over list returning API calls
+
+    Bridge, tags and condenser list calls page by repeating the query with
+    the cursor fields (e.g. ``start_author`` and ``start_permlink``) set to
+    the last returned entry. The answer then starts with that entry again.
+    The paginator drops this overlapping entry on the raw data, so that
+    only entries which are really yielded get wrapped, and requests the
+    next page while the current page is consumed.
+
+    :param callable fetch_page: is called with a cursor tuple and returns
+        a list of raw entries
+    :param tuple cursor_fields: entry keys from which the cursor of the
+        next page is built, e.g. ``("author", "permlink")``
+    :param tuple start: cursor for the first page, all ``None`` values or
+        ``None`` starts at the beginning
+    :param int limit: maximum number of yielded entries, ``None`` for no limit
+    :param bool prefetch: request the next page in a background thread
+        while the current page is consumed, default is False. ``fetch_page``
+        is then called from that thread and must not use the rpc of an
+        instance which the consumer of the paginator uses at the same time.
+    :param callable wrap: is applied to every yielded entry, e.g. to build
+        :class:`nectar.comment.Comment` objects (default: entries are yielded as returned)
+
+    .. code-block:: python
+
+        from nectar.discussions import CursorPaginator
+
+        def fetch_page(cursor):
+            return hive.rpc.get_ranked_posts(
+                {"sort": "created", "tag": "hive", "limit": 100,
+                 "start_author": cursor[0], "start_permlink": cursor[1]},
+                api="bridge",
+            )
+
+        for post in CursorPaginator(fetch_page, ("author", "permlink"), limit=500):
+            print(post["title"])
+
+    """
+
+    def __init__(
+        self, fetch_page, cursor_fields, start=None, limit=None, prefetch=False, wrap=None
+    ):
+        self.fetch_page = fetch_page
+        self.cursor_fields = tuple(cursor_fields)
+        if start is None:
+            start = (None,) * len(self.cursor_fields)
+        self.start = tuple(start)
+        self.limit = limit
+        self.prefetch = prefetch
+        self.wrap = wrap
+
+    def cursor(self, entry):
+        """Returns the cursor tuple of a raw entry"""
+        return tuple(entry[key] for key in self.cursor_fields)
+
+    def __iter__(self):
+        limit = self.limit
+        if limit is not None and limit <= 0:
+            return
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        try:
+            cursor = self.start
+            page = self.fetch_page(cursor)
+            first_page = True
+            count = 0
+            while page:
+                skip = 0
+                if not first_page and self.cursor(page[0]) == cursor:
+                    skip = 1
+                if len(page) <= skip:
+                    return
+                next_cursor = self.cursor(page[-1])
+                has_next = next_cursor != cursor
+                if limit is not None and count + len(page) - skip >= limit:
+                    has_next = False
+                future = None
+                if has_next and executor is not None:
+                    future = executor.submit(self.fetch_page, next_cursor)
+                for i in range(skip, len(page)):
+                    entry = page[i]
+                    yield entry if self.wrap is None else self.wrap(entry)
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+                if not has_next:
+                    return
+                page = future.result() if future is not None else self.fetch_page(next_cursor)
+                cursor = next_cursor
+                first_page = False
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Discussions_by_trending(list):
@@ -1707,3 +1685,40 @@ class Trending_tags(list):
             # If API fails, return empty list
             pass
         super(Trending_tags, self).__init__(tags)
+
+
+def _discussions_by_author_before_date(discussion_query, **kwargs):
+    return Discussions_by_author_before_date(
+        author=discussion_query["author"],
+        start_permlink=discussion_query["start_permlink"],
+        before_date=discussion_query["before_date"],
+        limit=discussion_query["limit"],
+        **kwargs,
+    )
+
+
+# discussion_type: (list class, cursor entry keys, cursor query keys, entries are comments)
+_post_cursor = (("author", "permlink"), ("start_author", "start_permlink"))
+_discussion_types = {
+    "trending": (Discussions_by_trending,) + _post_cursor + (True,),
+    "author_before_date": (_discussions_by_author_before_date,) + _post_cursor + (True,),
+    "payout": (Comment_discussions_by_payout,) + _post_cursor + (True,),
+    "post_payout": (Post_discussions_by_payout,) + _post_cursor + (True,),
+    "created": (Discussions_by_created,) + _post_cursor + (True,),
+    "active": (Discussions_by_active,) + _post_cursor + (True,),
+    "cashout": (Discussions_by_cashout,) + _post_cursor + (True,),
+    "votes": (Discussions_by_votes,) + _post_cursor + (True,),
+    "children": (Discussions_by_children,) + _post_cursor + (True,),
+    "hot": (Discussions_by_hot,) + _post_cursor + (True,),
+    "feed": (Discussions_by_feed,) + _post_cursor + (True,),
+    "blog": (Discussions_by_blog,) + _post_cursor + (True,),
+    "comments": (Discussions_by_comments,) + _post_cursor + (True,),
+    "promoted": (Discussions_by_promoted,) + _post_cursor + (True,),
+    "replies": (
+        Discussions_by_replies,
+        ("author", "permlink"),
+        ("start_parent_author", "start_permlink"),
+        True,
+    ),
+    "tags": (Trending_tags, ("name",), ("start_tag",), False),
+}
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+log = logging.getLogger(__name__)
+
+_shared_executor = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor():
+    """Returns the :class:`ExecutorService` which is shared by all parallel
+    work of nectar inside the process
+    """
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None or _shared_executor.closed:
+            _shared_executor = ExecutorService()
+        return _shared_executor
+
+
+def node_instances(blockchain, count):
+    """Returns ``count`` blockchain instances, the first one is ``blockchain``
+    and the others are new instances on its working nodes"""
+    instances = [blockchain]
+    if count > 1:
+        nodelist = blockchain.rpc.nodes.export_working_nodes()
+        for i in range(count - 1):
+            instances.append(
+                blockchain.__class__(
+                    node=nodelist,
+                    num_retries=blockchain.rpc.num_retries,
+                    num_retries_call=blockchain.rpc.num_retries_call,
+                    timeout=blockchain.rpc.timeout,
+                )
+            )
+    return instances
+
+
+class ExecutorService(object):
+    """Long-lived thread pool for the parallel work of nectar
+
+    :param int max_workers: maximum number of threads, which are started on
+        demand (default: number of CPUs + 4, at most 32)
+    :param str name: prefix of the thread names (default: ``nectar``)
+
+    All tasks are taken from one queue, so an idle thread always takes the
+    next task, no task waits behind a slow one. :func:`imap` yields the
+    results in order as soon as the next one is ready and limits the
+    number of tasks per call, so that many callers can share the threads.
+
+    .. code-block:: python
+
+        from nectar.block import Block
+        from nectar.executor import shared_executor
+
+        def fetch(block_num, attempt):
+            return Block(block_num)
+
+        for block in shared_executor().imap(fetch, range(1000, 1100), window=8):
+            print(block.block_num)
+
+    """
+
+    def __init__(self, max_workers=None, name="nectar"):
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.closed = False
+
+    def submit(self, fn, *args, **kwargs):
+        """Runs ``fn(*args, **kwargs)`` in the pool and returns its
+        :class:`concurrent.futures.Future`"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def imap(self, fn, iterable, window=None, timeout=None, retries=0):
+        """Calls ``fn(item, attempt)`` for all items in the pool and yields
+        the results in the order of the items
+
+        :param fn: function of an item and the attempt number (0 for the first call)
+        :param iterable: items, which are read as the results are consumed
+        :param int window: maximum number of items in progress (default: ``max_workers``)
+        :param float timeout: seconds after which an attempt is abandoned
+            and the item is dispatched again (default: no timeout)
+        :param int retries: number of re-dispatches of an item after a
+            timeout or an exception (default: 0)
+
+        The result of an item is the first successful attempt. When the
+        last attempt fails, its exception is raised. An abandoned attempt
+        keeps its thread until it returns, its result is ignored, so ``fn``
+        should pick another node for ``attempt > 0``. The last attempt is
+        waited for without timeout. The tasks of the remaining items are
+        cancelled when the generator is closed.
+        """
+        if window is None:
+            window = self.max_workers
+        items = iter(iterable)
+        # [item, attempts, running futures, last exception] in the order of the items
+        pending = deque()
+
+        def dispatch(entry):
+            entry[2].append(self.submit(fn, entry[0], entry[1]))
+            entry[1] += 1
+
+        try:
+            while True:
+                while len(pending) < window:
+                    try:
+                        entry = [next(items), 0, [], None]
+                    except StopIteration:
+                        break
+                    dispatch(entry)
+                    pending.append(entry)
+                if not pending:
+                    return
+                entry = pending[0]
+                while True:
+                    can_retry = entry[1] <= retries
+                    done, running = wait(
+                        entry[2],
+                        timeout=timeout if can_retry else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    result = None
+                    for future in done:
+                        if future.exception() is None:
+                            result = future
+                            break
+                        entry[3] = future.exception()
+                    if result is not None:
+                        for future in running:
+                            future.cancel()
+                        break
+                    entry[2] = list(running)
+                    if done and running:
+                        continue
+                    if not can_retry:
+                        if not running:
+                            raise entry[3]
+                        continue
+                    if not done and not any(future.running() for future in running):
+                        # the attempt is still queued behind other tasks
+                        continue
+                    if not done:
+                        log.warning("%r timed out, dispatching it again" % (entry[0],))
+                    dispatch(entry)
+                pending.popleft()
+                yield result.result()
+        finally:
+            for entry in pending:
+                for future in entry[2]:
+                    future.cancel()
+
+    def shutdown(self, wait=True, cancel_futures=True):
+        """Stops the threads after their current task, queued tasks are cancelled"""
+        self.closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from array import array
+from xml.sax.saxutils import quoteattr
+
+from nectar.instance import shared_blockchain_instance
+
+from .account import extract_account_name
+from .blockchain import Blockchain
+from .utils import _batched_call
+
+log = logging.getLogger(__name__)
+
+
+class FollowGraph(object):
+    """Compact directed follow graph of many accounts
+
+    :param Steem blockchain_instance: Steem instance
+    :param int batch_size: number of accounts whose next follow page is
+        requested in one batched RPC call (default: 50)
+    :param int page_size: follow entries per page (default: 1000)
+
+    Account names are interned into integer ids (:attr:`names` maps id -> name).
+    An edge ``a -> b`` means that ``a`` follows ``b``. Edges are kept in
+    CSR form: the following ids of account ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``. Follow lists of many accounts
+    are paged together, one batched call per page round. ``follow``
+    custom_json ops are applied as pending changes on top of the CSR
+    arrays and merged by :func:`compact`.
+
+    .. code-block:: python
+
+        from nectar.followgraph import FollowGraph
+
+        graph = FollowGraph()
+        graph.load(["alice", "bob", "carol"], direction="following")
+        print(graph.following("alice"))
+        graph.to_edgelist("follows.tsv")
+
+    """
+
+    def __init__(self, blockchain_instance=None, batch_size=50, page_size=1000, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.names = []
+        self._ids = {}
+        self.indptr = array("Q", [0])
+        self.indices = array("I")
+        # edges from the last load, merged into the CSR arrays by compact()
+        self._src = array("I")
+        self._dst = array("I")
+        # rows whose stored edges are replaced by the loaded ones
+        self._replace_out = set()
+        self._replace_in = set()
+        # (follower id, following id) -> True for follow, False for unfollow
+        self._delta = {}
+        self._reverse = None
+        self.block_num = None
+
+    def intern(self, name):
+        """Returns the integer id of an account name, a new id is assigned
+        to unknown names"""
+        i = self._ids.get(name)
+        if i is None:
+            i = len(self.names)
+            self._ids[name] = i
+            self.names.append(name)
+        return i
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def _fetch(self, pages, direction, what):
+        """Returns one follow page (or None) per ``(account, start)`` pair"""
+        rpc = self.blockchain.rpc
+        method = rpc.get_followers if direction == "follower" else rpc.get_following
+        return _batched_call(
+            method,
+            [(account, start, what, self.page_size) for account, start in pages],
+            api="condenser",
+        )
+
+    def load(self, accounts, direction="following", what="blog"):
+        """Loads the complete follow lists of the given accounts
+
+        :param list accounts: account names (or :class:`nectar.account.Account`)
+        :param str direction: ``following`` loads who the accounts follow,
+            ``follower`` loads who follows them
+        :param str what: follow type, ``blog`` (default) or ``ignore``
+
+        Stored edges of a loaded account in this direction are replaced by
+        the loaded ones. Accounts of which a page could not be loaded keep
+        their stored edges, they are returned as list.
+        """
+        if direction not in ["following", "follower"]:
+            raise ValueError("direction must be following or follower!")
+        if not self.blockchain.is_connected():
+            return []
+        self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        if self._delta:
+            # older stream changes must not override the loaded lists
+            self.compact()
+        names = [extract_account_name(account) for account in accounts]
+        failed = []
+        # account -> start of the next page
+        open_pages = {name: "" for name in names}
+        # account -> ids of the loaded entries, stored when all pages are loaded
+        loaded = {name: [] for name in names}
+        while open_pages:
+            pending = list(open_pages.items())
+            for i in range(0, len(pending), self.batch_size):
+                chunk = pending[i : i + self.batch_size]
+                for (name, start), page in zip(chunk, self._fetch(chunk, direction, what)):
+                    if page is None:
+                        # keep the stored edges instead of replacing them by a part
+                        failed.append(name)
+                        del open_pages[name]
+                        del loaded[name]
+                        continue
+                    if isinstance(page, dict):
+                        page = page.get("followers", page.get("following", []))
+                    for entry in page:
+                        if start != "" and entry[direction] == start:
+                            # each page starts with the last entry of the previous page
+                            continue
+                        loaded[name].append(self.intern(entry[direction]))
+                    if len(page) >= self.page_size and page[-1][direction] != start:
+                        open_pages[name] = page[-1][direction]
+                        continue
+                    del open_pages[name]
+                    account_id = self.intern(name)
+                    others = loaded.pop(name)
+                    if direction == "following":
+                        self._replace_out.add(account_id)
+                        self._src.extend([account_id] * len(others))
+                        self._dst.extend(others)
+                    else:
+                        self._replace_in.add(account_id)
+                        self._src.extend(others)
+                        self._dst.extend([account_id] * len(others))
+            log.debug("%d %s lists still open" % (len(open_pages), direction))
+        self.compact()
+        return failed
+
+    def follow(self, follower, following, state=True):
+        """Adds (``state=True``) or removes (``state=False``) the edge
+        follower -> following as pending change"""
+        key = (self.intern(follower), self.intern(following))
+        self._delta[key] = state
+
+    def apply(self, op):
+        """Applies a ``follow`` custom_json operation
+
+        :param dict op: custom_json operation (also as ``[type, value]``
+            or ``{"type": ..., "value": ...}``)
+
+        Returns True when the op was a follow op.
+        """
+        if isinstance(op, (list, tuple)):
+            op = op[1]
+        else:
+            block_num = op.get("block_num", op.get("block"))
+            if block_num:
+                self.block_num = block_num
+            if "value" in op and "type" in op:
+                op = op["value"]
+        if op.get("id") != "follow":
+            return False
+        try:
+            data = op["json"]
+            if isinstance(data, str):
+                data = json.loads(data)
+        except ValueError:
+            return False
+        if isinstance(data, list):
+            if len(data) != 2 or data[0] != "follow":
+                return False
+            data = data[1]
+        if not isinstance(data, dict):
+            return False
+        follower = data.get("follower")
+        if follower not in op.get("required_posting_auths", []):
+            return False
+        following = data.get("following")
+        what = data.get("what") or []
+        if isinstance(what, str):
+            what = [what]
+        if not isinstance(following, list):
+            following = [following]
+        for name in following:
+            if isinstance(name, str) and name != follower:
+                self.follow(follower, name, state="blog" in what)
+        return True
+
+    def stream(self, start=None, stop=None, **kwargs):
+        """Applies all ``follow`` ops of a block range and yields them
+
+        :param int start: first block (default: current block)
+        :param int stop: last block (default: stream forever)
+        """
+        b = Blockchain(blockchain_instance=self.blockchain, **kwargs)
+        for op in b.stream(opNames=["custom_json"], start=start, stop=stop):
+            if self.apply(op):
+                yield op
+
+    def compact(self):
+        """Merges loaded edges and pending follow changes into the CSR arrays"""
+        n = len(self.names)
+        rows = [None] * n
+        old_rows = len(self.indptr) - 1
+        for i in range(old_rows):
+            if i in self._replace_out:
+                continue
+            begin, end = self.indptr[i], self.indptr[i + 1]
+            if begin == end:
+                continue
+            if self._replace_in:
+                row = [j for j in self.indices[begin:end] if j not in self._replace_in]
+            else:
+                row = list(self.indices[begin:end])
+            if row:
+                rows[i] = set(row)
+        for i, j in zip(self._src, self._dst):
+            if rows[i] is None:
+                rows[i] = set()
+            rows[i].add(j)
+        for (i, j), state in self._delta.items():
+            if state:
+                if rows[i] is None:
+                    rows[i] = set()
+                rows[i].add(j)
+            elif rows[i] is not None:
+                rows[i].discard(j)
+        indptr = array("Q", [0])
+        indices = array("I")
+        for row in rows:
+            if row:
+                indices.extend(sorted(row))
+            indptr.append(len(indices))
+        self.indptr = indptr
+        self.indices = indices
+        self._src = array("I")
+        self._dst = array("I")
+        self._replace_out = set()
+        self._replace_in = set()
+        self._delta = {}
+        self._reverse = None
+
+    def _following_ids(self, i):
+        if i + 1 < len(self.indptr):
+            row = set(self.indices[self.indptr[i] : self.indptr[i + 1]])
+        else:
+            row = set()
+        for (src, dst), state in self._delta.items():
+            if src == i:
+                if state:
+                    row.add(dst)
+                else:
+                    row.discard(dst)
+        return row
+
+    def _reverse_csr(self):
+        """Returns the transposed CSR arrays (followers of each account)"""
+        if self._reverse is None:
+            n = len(self.indptr) - 1
+            counts = array("Q", [0] * (len(self.names) + 1))
+            for j in self.indices:
+                counts[j + 1] += 1
+            for i in range(len(self.names)):
+                counts[i + 1] += counts[i]
+            indices = array("I", [0] * len(self.indices))
+            pos = array("Q", counts[:-1])
+            for i in range(n):
+                for j in self.indices[self.indptr[i] : self.indptr[i + 1]]:
+                    indices[pos[j]] = i
+                    pos[j] += 1
+            self._reverse = (counts, indices)
+        return self._reverse
+
+    def following(self, name):
+        """Returns the sorted names which the account follows"""
+        i = self._ids.get(name)
+        if i is None:
+            return []
+        return sorted(self.names[j] for j in self._following_ids(i))
+
+    def followers(self, name):
+        """Returns the sorted names which follow the account"""
+        j = self._ids.get(name)
+        if j is None:
+            return []
+        indptr, indices = self._reverse_csr()
+        row = set(indices[indptr[j] : indptr[j + 1]]) if j + 1 < len(indptr) else set()
+        for (src, dst), state in self._delta.items():
+            if dst == j:
+                if state:
+                    row.add(src)
+                else:
+                    row.discard(src)
+        return sorted(self.names[i] for i in row)
+
+    def edges(self):
+        """Yields all ``(follower, following)`` name pairs"""
+        if self._delta or len(self._src):
+            self.compact()
+        names = self.names
+        for i in range(len(self.indptr) - 1):
+            follower = names[i]
+            for j in self.indices[self.indptr[i] : self.indptr[i + 1]]:
+                yield follower, names[j]
+
+    def to_csr(self):
+        """Returns ``(names, indptr, indices)`` after merging all pending changes"""
+        self.compact()
+        return self.names, self.indptr, self.indices
+
+    def to_edgelist(self, path, delimiter="\t"):
+        """Writes one ``follower<delimiter>following`` line per edge"""
+        with open(path, "w") as f:
+            for follower, following in self.edges():
+                f.write("%s%s%s\n" % (follower, delimiter, following))
+
+    def to_graphml(self, path):
+        """Writes the graph as GraphML file, nodes are identified by account name"""
+        with open(path, "w") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            f.write('  <graph id="follows" edgedefault="directed">\n')
+            self.compact()
+            for name in self.names:
+                f.write("    <node id=%s/>\n" % quoteattr(name))
+            for follower, following in self.edges():
+                f.write(
+                    "    <edge source=%s target=%s/>\n"
+                    % (quoteattr(follower), quoteattr(following))
+                )
+            f.write("  </graph>\n</graphml>\n")
+
+    def to_networkx(self):
+        """Returns the graph as ``networkx.DiGraph`` (requires networkx)"""
+        try:
+            import networkx
+        except ImportError:
+            raise ImportError("networkx is required for to_networkx()")
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(self.names)
+        graph.add_edges_from(self.edges())
+        return graph
+
+    def __repr__(self):
+        return "<%s accounts=%d edges=%d>" % (
+            self.__class__.__name__,
+            len(self.names),
+            len(self.indices),
+        )
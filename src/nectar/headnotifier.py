@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from collections import deque
+
+from nectar.instance import shared_blockchain_instance
+
+from .utils import formatToTimeStamp
+
+log = logging.getLogger(__name__)
+
+_shared_head_notifiers = {}
+_shared_lock = threading.Lock()
+
+
+def shared_head_notifier(blockchain_instance=None):
+    """Returns the :class:`HeadNotifier` of the chain of the given instance,
+    which is shared by all streams inside the process
+    """
+    blockchain = blockchain_instance or shared_blockchain_instance()
+    chain_id = blockchain.chain_params["chain_id"]
+    with _shared_lock:
+        if chain_id not in _shared_head_notifiers:
+            _shared_head_notifiers[chain_id] = HeadNotifier(blockchain_instance=blockchain)
+        return _shared_head_notifiers[chain_id]
+
+
+class HeadNotifier(object):
+    """Waits for new blocks on behalf of many streams with a single poll
+
+    :param Steem blockchain_instance: Steem instance
+    :param float margin: seconds to wait after the expected time of the next
+        block before polling (default: 0.1)
+    :param float min_backoff: first retry delay in seconds when the next block
+        is late, it doubles up to one block interval (default: 0.25)
+
+    The dynamic global properties are only polled when the next block is
+    expected: the timestamp of the head block plus one block interval,
+    shifted by the smallest observed difference between the local clock and
+    the head block time. When the block is late, the poll is repeated with
+    an exponential back-off. Streams in other threads which wait at the same
+    time do not poll, they are woken up by the result of the running poll.
+
+    A push source (e.g. a node subscription) can hand new properties to
+    :func:`publish`, which wakes up all waiting streams at once.
+
+    :class:`nectar.blockchain.Blockchain` uses the notifier which is shared
+    by all instances of a chain (see :func:`shared_head_notifier`), unless
+    one is given with ``head_notifier=``.
+
+    .. code-block:: python
+
+        from nectar.headnotifier import shared_head_notifier
+
+        notifier = shared_head_notifier()
+        props = notifier.wait_for(notifier.head_block_number + 1)
+        print(props["head_block_number"], props["time"])
+
+    """
+
+    def __init__(self, blockchain_instance=None, margin=0.1, min_backoff=0.25, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.block_interval = self.blockchain.get_block_interval()
+        self.margin = margin
+        self.min_backoff = min_backoff
+        self.props = None
+        self.polls = 0
+        self._received = None
+        # local time - head block time of the last updates
+        self._offsets = deque(maxlen=20)
+        self._misses = 0
+        self._retry_at = None
+        self._polling = False
+        self._condition = threading.Condition()
+
+    @property
+    def head_block_number(self):
+        """Head block number of the last received properties, or 0"""
+        if self.props is None:
+            return 0
+        return self.props["head_block_number"]
+
+    @staticmethod
+    def _head_time(props):
+        head_time = props["time"]
+        if isinstance(head_time, (int, float)):
+            return head_time
+        return formatToTimeStamp(head_time)
+
+    def _position(self, props):
+        return (props["head_block_number"], props["last_irreversible_block_num"])
+
+    def _update(self, props):
+        """Stores newer properties and wakes up the waiting streams, must hold the lock"""
+        if props is None:
+            return False
+        if self.props is not None and self._position(props) <= self._position(self.props):
+            return False
+        self.props = props
+        self._received = time.time()
+        if props.get("time"):
+            self._offsets.append(self._received - self._head_time(props))
+        self._misses = 0
+        self._condition.notify_all()
+        return True
+
+    def publish(self, props):
+        """Hands over dynamic global properties from another source, returns
+        False when they are not newer than the known ones
+        """
+        with self._condition:
+            return self._update(props)
+
+    def next_poll(self):
+        """Returns the local time at which the next poll is due"""
+        if self.props is None:
+            return 0
+        if self._misses:
+            return self._retry_at
+        if not self._offsets:
+            return self._received + self.block_interval
+        expected = self._head_time(self.props) + self.block_interval
+        return expected + min(self._offsets) + self.margin
+
+    def wait_for(self, block_num, key="head_block_number", timeout=None, blockchain_instance=None):
+        """Waits until ``key`` of the dynamic global properties has reached
+        ``block_num`` and returns the properties
+
+        :param int block_num: block number to wait for
+        :param str key: ``head_block_number`` (default) or ``last_irreversible_block_num``
+        :param float timeout: when set, the last known properties are
+            returned after ``timeout`` seconds, even when the block is not reached
+        :param Steem blockchain_instance: instance which polls, when this
+            call has to poll (default: the instance of the notifier)
+
+        """
+        blockchain = blockchain_instance or self.blockchain
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._condition:
+                while True:
+                    if self.props is not None and self.props[key] >= block_num:
+                        return self.props
+                    now = time.time()
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        return self.props
+                    if not self._polling:
+                        delay = self.next_poll() - now
+                        if delay <= 0:
+                            break
+                        if remaining is not None:
+                            delay = min(delay, remaining)
+                    else:
+                        delay = remaining
+                    # woken up by a poll of another stream or by publish
+                    self._condition.wait(delay)
+                self._polling = True
+            props = None
+            try:
+                props = blockchain.get_dynamic_global_properties(False)
+            finally:
+                with self._condition:
+                    self._polling = False
+                    self.polls += 1
+                    if not self._update(props):
+                        # the block is late
+                        self._misses += 1
+                        backoff = self.min_backoff * 2 ** (self._misses - 1)
+                        self._retry_at = time.time() + min(backoff, self.block_interval)
+                        self._condition.notify_all()
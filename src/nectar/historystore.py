@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import sqlite3
+from datetime import date, datetime, time
+
+from nectar.instance import shared_blockchain_instance
+from nectarstorage.sqlite import SQLiteCommon, SQLiteFile
+
+from .account import (
+    Account,
+    AccountHistoryFetcher,
+    _construct_history_op,
+    _parse_history_event,
+)
+from .utils import formatToTimeStamp
+
+log = logging.getLogger(__name__)
+
+
+class AccountHistoryStore(SQLiteFile, SQLiteCommon):
+    """Local, incremental store of account history operations
+
+    :param Steem blockchain_instance: Steem instance
+    :param str data_dir: Directory of the sqlite file (default: nectar user data dir)
+    :param str profile: Name of the sqlite file (default: ``account_history``)
+
+    The ops of any number of accounts are stored in one sqlite file, indexed by
+    account and op index, block number and op type. :func:`sync` downloads only
+    the ops behind the highest stored index of an account, so repeated reports
+    over the same accounts only fetch what is new. Stored ops are returned by
+    :func:`history` in the same format as :func:`nectar.account.Account.history`.
+
+    .. code-block:: python
+
+        from nectar.account import Account
+        from nectar.historystore import AccountHistoryStore
+
+        store = AccountHistoryStore()
+        acc = Account("gtg")
+        acc.sync_history(history_store=store)
+        for op in acc.history(only_ops=["producer_reward"], history_store=store):
+            print(op)
+
+    """
+
+    __tablename__ = "account_history"
+
+    def __init__(self, blockchain_instance=None, data_dir=None, profile=None, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if profile is None:
+            profile = "account_history"
+        file_kwargs = {"profile": profile}
+        if data_dir is not None:
+            file_kwargs["data_dir"] = data_dir
+        SQLiteFile.__init__(self, **file_kwargs)
+        if not self.exists():
+            self.create()
+
+    def exists(self):
+        """Check if the database table exists"""
+        query = (
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.__tablename__,),
+        )
+        return True if self.sql_fetchone(query) else False
+
+    def create(self):
+        """Create the history table in the SQLite database"""
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                account TEXT NOT NULL,
+                op_index INTEGER NOT NULL,
+                block INTEGER NOT NULL,
+                timestamp INTEGER NOT NULL,
+                op_type TEXT NOT NULL,
+                event TEXT NOT NULL,
+                PRIMARY KEY (account, op_index)
+            )""".format(self.__tablename__),
+            )
+        )
+        self.sql_execute(
+            ("CREATE INDEX {0}_block ON {0} (account, block)".format(self.__tablename__),)
+        )
+        self.sql_execute(
+            ("CREATE INDEX {0}_timestamp ON {0} (account, timestamp)".format(self.__tablename__),)
+        )
+        self.sql_execute(
+            (
+                "CREATE INDEX {0}_op_type ON {0} (account, op_type, op_index)".format(
+                    self.__tablename__
+                ),
+            )
+        )
+
+    def wipe(self, account=None):
+        """Removes all stored ops, or only the ops of one account
+
+        :param str account: account name (*optional*)
+        """
+        if account is None:
+            self.sql_execute(("DELETE FROM {}".format(self.__tablename__),))
+        else:
+            self.sql_execute(
+                ("DELETE FROM {} WHERE account=?".format(self.__tablename__), (account,))
+            )
+
+    def __len__(self):
+        return self.sql_fetchone(("SELECT COUNT(*) FROM {}".format(self.__tablename__),))[0]
+
+    def accounts(self):
+        """Returns the names of all accounts with stored ops"""
+        rows = self.sql_fetchall(
+            ("SELECT DISTINCT account FROM {} ORDER BY account".format(self.__tablename__),)
+        )
+        return [row[0] for row in rows]
+
+    def count(self, account):
+        """Returns the number of stored ops of an account"""
+        return self.sql_fetchone(
+            ("SELECT COUNT(*) FROM {} WHERE account=?".format(self.__tablename__), (account,))
+        )[0]
+
+    def last_index(self, account):
+        """Returns the highest stored op index of an account (or None)"""
+        return self.sql_fetchone(
+            (
+                "SELECT MAX(op_index) FROM {} WHERE account=?".format(self.__tablename__),
+                (account,),
+            )
+        )[0]
+
+    def add_items(self, account, items):
+        """Stores raw account history items
+
+        :param str account: account name
+        :param list items: list of ``[index, event]`` items as returned by
+            ``get_account_history``
+        """
+        rows = []
+        for item_index, event in items:
+            op_type, op = _parse_history_event(event)
+            rows.append(
+                (
+                    account,
+                    item_index,
+                    event["block"],
+                    formatToTimeStamp(event["timestamp"]),
+                    op_type,
+                    json.dumps(event, separators=(",", ":")),
+                )
+            )
+        if not rows:
+            return
+        connection = sqlite3.connect(self.sqlite_file)
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO {} (account, op_index, block, timestamp, op_type, event) "
+                "VALUES (?, ?, ?, ?, ?, ?)".format(self.__tablename__),
+                rows,
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def sync(
+        self, account, stop=None, irreversible=True, thread_num=1, range_size=10000, chunk_size=1000
+    ):
+        """Downloads all ops of an account which are newer than the highest
+        stored op index and returns the number of new ops.
+
+        Ops are written in chunks in ascending index order, so an
+        interrupted sync resumes where it stopped.
+
+        :param str account: account name or :class:`nectar.account.Account`
+        :param int stop: highest op index to fetch (*optional*, default
+            is the current virtual op count)
+        :param bool irreversible: when True (default), ops from reversible
+            blocks are not stored. They are fetched by the next sync.
+        :param int thread_num: number of parallel downloads,
+            see :class:`nectar.account.AccountHistoryFetcher`
+        :param int range_size: number of op indices in each downloaded range
+        :param int chunk_size: number of ops written in one transaction
+        """
+        if not isinstance(account, Account):
+            account = Account(account, blockchain_instance=self.blockchain)
+        name = account["name"]
+        last_index = self.last_index(name)
+        start = 0 if last_index is None else last_index + 1
+        if stop is None:
+            stop = account.virtual_op_count()
+        if stop < start:
+            return 0
+        last_block = None
+        if irreversible:
+            props = self.blockchain.get_dynamic_global_properties(False)
+            last_block = props["last_irreversible_block_num"]
+        fetcher = AccountHistoryFetcher(
+            account,
+            thread_num=thread_num,
+            range_size=range_size,
+            blockchain_instance=self.blockchain,
+        )
+        n_new = 0
+        chunk = []
+        for item in fetcher.history(start=start, stop=stop, raw_output=True):
+            if last_block is not None and item[1]["block"] > last_block:
+                break
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                self.add_items(name, chunk)
+                n_new += len(chunk)
+                chunk = []
+        self.add_items(name, chunk)
+        n_new += len(chunk)
+        log.debug("%d new ops stored for %s" % (n_new, name))
+        return n_new
+
+    def history(
+        self,
+        account,
+        start=None,
+        stop=None,
+        use_block_num=True,
+        only_ops=[],
+        exclude_ops=[],
+        order=1,
+        raw_output=False,
+    ):
+        """Returns a generator for the stored ops of an account
+
+        :param str account: account name
+        :param start: start number/date of the returned ops (*optional*)
+        :type start: int, datetime
+        :param stop: stop number/date of the returned ops (*optional*)
+        :type stop: int, datetime
+        :param bool use_block_num: if true, start and stop are block numbers,
+            otherwise virtual OP count numbers.
+        :param array only_ops: Limit generator by these
+            operations (*optional*)
+        :param array exclude_ops: Exclude these operations from
+            generator (*optional*)
+        :param int order: 1 for chronological order, -1 for reverse order.
+            For reverse order, start is the newest and stop the oldest op.
+        :param bool raw_output: if False, the output is a dict, which
+            includes all values. Otherwise, the output is list.
+        """
+        if order != -1 and order != 1:
+            raise ValueError("order must be -1 or 1!")
+        account = account["name"] if isinstance(account, dict) else account
+        lowest, highest = (start, stop) if order == 1 else (stop, start)
+        conditions = ["account=?"]
+        args = [account]
+        for value, operator in [(lowest, ">="), (highest, "<=")]:
+            if value is None:
+                continue
+            if isinstance(value, (datetime, date, time)):
+                conditions.append("timestamp %s ?" % operator)
+                args.append(formatToTimeStamp(value))
+            elif use_block_num:
+                conditions.append("block %s ?" % operator)
+                args.append(value)
+            else:
+                conditions.append("op_index %s ?" % operator)
+                args.append(value)
+        if only_ops:
+            conditions.append("op_type IN (%s)" % ",".join("?" * len(only_ops)))
+            args.extend(only_ops)
+        if exclude_ops:
+            conditions.append("op_type NOT IN (%s)" % ",".join("?" * len(exclude_ops)))
+            args.extend(exclude_ops)
+        query = "SELECT op_index, event FROM {} WHERE {} ORDER BY op_index {}".format(
+            self.__tablename__, " AND ".join(conditions), "ASC" if order == 1 else "DESC"
+        )
+        connection = sqlite3.connect(self.sqlite_file)
+        try:
+            cursor = connection.execute(query, args)
+            for item_index, event in cursor:
+                event = json.loads(event)
+                if raw_output:
+                    yield [item_index, event]
+                else:
+                    op_type, op = _parse_history_event(event)
+                    yield _construct_history_op(item_index, event, op_type, op, account)
+        finally:
+            connection.close()
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.sqlite_file)
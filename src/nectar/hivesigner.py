@@ -9,7 +9,6 @@ except ImportError:
     from urlparse import urljoin
 import logging
 
-import requests
 from six import PY2
 
 from nectar.amount import Amount
@@ -243,6 +242,8 @@ class HiveSigner(object):
             return urljoin(self.hs_oauth_base_url, "authorize?" + urlencode(params, safe=","))
 
     def get_access_token(self, code):
+        import requests
+
         post_data = {
             "grant_type": "authorization_code",
             "code": code,
@@ -265,6 +266,8 @@ class HiveSigner(object):
             hs.me(username="test")
 
         """
+        import requests
+
         if username:
             self.set_username(username)
         url = urljoin(self.hs_api_url, "me/")
@@ -303,6 +306,8 @@ class HiveSigner(object):
             ]
 
         """
+        import requests
+
         url = urljoin(self.hs_api_url, "broadcast/")
         data = {
             "operations": operations,
@@ -324,6 +329,8 @@ class HiveSigner(object):
             return r.content
 
     def refresh_access_token(self, code, scope):
+        import requests
+
         post_data = {
             "grant_type": "refresh_token",
             "refresh_token": code,
@@ -340,6 +347,8 @@ class HiveSigner(object):
         return r.json()
 
     def revoke_token(self, access_token):
+        import requests
+
         post_data = {
             "access_token": access_token,
         }
@@ -349,6 +358,8 @@ class HiveSigner(object):
         return r.json()
 
     def update_user_metadata(self, metadata):
+        import requests
+
         put_data = {
             "user_metadata": metadata,
         }
@@ -2,8 +2,6 @@
 import io
 from binascii import hexlify
 
-import requests
-
 from nectar.account import Account
 from nectargraphenebase.ecdsasig import sign_message
 from nectargraphenebase.py23 import py23_bytes, string_types
@@ -47,6 +45,8 @@ class ImageUploader(object):
             iu.upload("path/to/image.png", "account_name") # "private posting key belongs to account_name
 
         """
+        import requests
+
         account = Account(account, blockchain_instance=self.steem)
         if "posting" not in account:
             account.refresh()
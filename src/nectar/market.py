@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import heapq
 import logging
 import random
 from datetime import datetime, timedelta, timezone
@@ -9,6 +10,8 @@ from nectarbase import operations
 from .account import Account
 from .amount import Amount
 from .asset import Asset
+from .block import Block
+from .blockchain import Blockchain
 from .price import FilledOrder, Order, Price
 from .utils import (
     addTzInfo,
@@ -17,14 +20,6 @@ from .utils import (
     formatTimeString,
 )
 
-REQUEST_MODULE = None
-if not REQUEST_MODULE:
-    try:
-        import requests
-
-        REQUEST_MODULE = "requests"
-    except ImportError:
-        REQUEST_MODULE = None
 log = logging.getLogger(__name__)
 
 
@@ -313,6 +308,17 @@ class Market(dict):
         data = {"asks": asks, "bids": bids, "asks_date": asks_date, "bids_date": bids_date}
         return data
 
+    def live_orderbook(self, seed=True):
+        """Returns a :class:`LiveOrderBook` for this market, which is kept up to
+        date from the block stream instead of polling :func:`orderbook`
+
+        :param bool seed: when True, all open orders are loaded (default: True)
+        """
+        book = LiveOrderBook(self, blockchain_instance=self.blockchain)
+        if seed:
+            book.seed()
+        return book
+
     def recent_trades(self, limit=25, raw_data=False):
         """Returns the order book for a given market. You may also
         specify "all" to get the orderbooks of all markets.
@@ -772,6 +778,8 @@ class Market(dict):
         """Returns the BTC/USD price from bitfinex, gdax, kraken, okcoin and bitstamp. The mean price is
         weighted by the exchange volume.
         """
+        import requests
+
         prices = {}
         responses = []
         urls = [
@@ -849,6 +857,8 @@ class Market(dict):
         """Returns the STEEM/BTC price from bittrex, binance, huobi and upbit. The mean price is
         weighted by the exchange volume.
         """
+        import requests
+
         prices = {}
         responses = []
         urls = [
@@ -931,6 +941,8 @@ class Market(dict):
         """Returns the HIVE/BTC price from bittrex and upbit. The mean price is
         weighted by the exchange volume.
         """
+        import requests
+
         prices = {}
         responses = []
         urls = [
@@ -1011,3 +1023,444 @@ class Market(dict):
     def hive_usd_implied(self):
         """Returns the current HIVE/USD market price"""
         return self.hive_btc_ticker() * self.btc_usd_ticker()
+
+
+def _parse_amount(amount, assets):
+    """Returns ``(satoshis, symbol)`` of a raw amount without creating an Amount object
+
+    :param amount: Amount as string (``"1.000 HIVE"``), NAI dict or ``[amount, precision, nai]`` list
+    :param dict assets: maps symbols and NAIs to :class:`nectar.asset.Asset`
+
+    ``(None, None)`` is returned for assets that are not in ``assets``.
+    """
+    if isinstance(amount, dict):
+        asset = assets.get(amount["nai"])
+        if asset is None:
+            return None, None
+        return int(amount["amount"]), asset["symbol"]
+    elif isinstance(amount, (list, tuple)):
+        asset = assets.get(amount[2])
+        if asset is None:
+            return None, None
+        return int(amount[0]), asset["symbol"]
+    value, symbol = amount.split(" ")
+    asset = assets.get(symbol)
+    if asset is None:
+        return None, None
+    return int(round(float(value) * 10 ** asset["precision"])), asset["symbol"]
+
+
+class _OrderBookSide(object):
+    """One side of a :class:`LiveOrderBook`
+
+    A dict maps each price to the aggregated amount for sale, a heap of the
+    prices (best price first) serves the best level. Removed levels stay in
+    the heap until they reach its top, so adding and removing a level is
+    O(log n).
+    """
+
+    __slots__ = ["_heap", "_in_heap", "_levels", "_sign"]
+
+    def __init__(self, descending=False):
+        self._heap = []
+        self._in_heap = set()
+        self._levels = {}
+        self._sign = -1 if descending else 1
+
+    def __len__(self):
+        return len(self._levels)
+
+    def add(self, price, amount):
+        if price in self._levels:
+            self._levels[price] += amount
+            return
+        self._levels[price] = amount
+        if price not in self._in_heap:
+            self._in_heap.add(price)
+            heapq.heappush(self._heap, self._sign * price)
+
+    def remove(self, price, amount):
+        if price not in self._levels:
+            return
+        rest = self._levels[price] - amount
+        if rest > 0:
+            self._levels[price] = rest
+            return
+        del self._levels[price]
+        if len(self._heap) > 2 * len(self._levels) + 64:
+            # drop the removed levels
+            self._heap = [self._sign * p for p in self._levels]
+            heapq.heapify(self._heap)
+            self._in_heap = set(self._levels)
+
+    def best(self):
+        heap = self._heap
+        while heap and self._sign * heap[0] not in self._levels:
+            self._in_heap.discard(self._sign * heapq.heappop(heap))
+        if not heap:
+            return None
+        return self._sign * heap[0]
+
+    def levels(self, limit=None):
+        if limit is None:
+            keys = sorted(self._sign * p for p in self._levels)
+        else:
+            keys = heapq.nsmallest(limit, (self._sign * p for p in self._levels))
+        return [(self._sign * k, self._levels[self._sign * k]) for k in keys]
+
+    def volume_until(self, price):
+        """Returns the summed amount of all levels that are at least as good as ``price``"""
+        limit = self._sign * price
+        return sum(a for p, a in self._levels.items() if self._sign * p <= limit)
+
+
+class LiveOrderBook(object):
+    """Locally maintained order book of the internal market
+
+    The book is seeded once with all open limit orders (``list_limit_orders``) and
+    is afterwards kept up to date by applying ``limit_order_create``,
+    ``limit_order_create2``, ``limit_order_cancel``, ``limit_order_cancelled``
+    and ``fill_order`` operations from the block stream. Best bid/ask, depth and
+    snapshots are then served from memory without any RPC call.
+
+    :param Market market: Market of the order book (default: ``HIVE:HBD``)
+    :param Steem blockchain_instance: Steem instance
+
+    Amounts are stored as integer satoshis of the asset being sold; prices are
+    denoted in ``base``/``quote`` like everywhere else in :class:`Market`.
+
+    .. code-block:: python
+
+        from nectar.market import Market
+
+        book = Market("HIVE:HBD").live_orderbook()
+        for op in book.stream():
+            print(book.best_bid(), book.best_ask())
+
+    """
+
+    op_names = [
+        "limit_order_create",
+        "limit_order_create2",
+        "limit_order_cancel",
+        "limit_order_cancelled",
+        "fill_order",
+    ]
+
+    def __init__(self, market=None, blockchain_instance=None, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if not isinstance(market, Market):
+            market = Market(market, blockchain_instance=self.blockchain)
+        self.market = market
+        self.quote = market["quote"]
+        self.base = market["base"]
+        self._assets = {}
+        for asset in [self.quote, self.base]:
+            self._assets[asset["symbol"]] = asset
+            self._assets[asset["asset"]] = asset
+        self._price_factor = 10 ** (self.quote["precision"] - self.base["precision"])
+        self.clear()
+
+    def clear(self):
+        """Removes all orders from the book"""
+        self.asks = _OrderBookSide()
+        self.bids = _OrderBookSide(descending=True)
+        # (owner, orderid) -> [is_ask, price, for_sale]
+        self._orders = {}
+        self.latest = None
+        self.block_num = None
+
+    def __len__(self):
+        return len(self._orders)
+
+    def _parse_amount(self, amount):
+        return _parse_amount(amount, self._assets)
+
+    def _price(self, base_amount, quote_amount):
+        """Price in base/quote from satoshi amounts"""
+        return base_amount / quote_amount * self._price_factor
+
+    def _add_order(self, owner, orderid, sell, receive, for_sale=None):
+        sell_amount, sell_symbol = self._parse_amount(sell)
+        receive_amount, receive_symbol = self._parse_amount(receive)
+        if sell_symbol is None or receive_symbol is None or sell_symbol == receive_symbol:
+            return
+        self._insert_order(owner, orderid, sell_amount, sell_symbol, receive_amount, for_sale)
+
+    def _insert_order(
+        self, owner, orderid, sell_amount, sell_symbol, receive_amount, for_sale=None
+    ):
+        if not sell_amount or not receive_amount:
+            return
+        if for_sale is None:
+            for_sale = sell_amount
+        key = (owner, orderid)
+        if key in self._orders:
+            self._remove_order(key)
+        is_ask = sell_symbol == self.quote["symbol"]
+        if is_ask:
+            price = self._price(receive_amount, sell_amount)
+            self.asks.add(price, for_sale)
+        else:
+            price = self._price(sell_amount, receive_amount)
+            self.bids.add(price, for_sale)
+        self._orders[key] = [is_ask, price, for_sale]
+
+    def _remove_order(self, key):
+        order = self._orders.pop(key, None)
+        if order is None:
+            return
+        is_ask, price, for_sale = order
+        if is_ask:
+            self.asks.remove(price, for_sale)
+        else:
+            self.bids.remove(price, for_sale)
+
+    def _reduce_order(self, key, pays):
+        order = self._orders.get(key)
+        if order is None:
+            return
+        amount, symbol = self._parse_amount(pays)
+        if amount is None:
+            return
+        is_ask, price, for_sale = order
+        side = self.asks if is_ask else self.bids
+        if amount >= for_sale:
+            del self._orders[key]
+            side.remove(price, for_sale)
+        else:
+            order[2] = for_sale - amount
+            side.remove(price, amount)
+
+    def seed(self, limit=1000):
+        """Loads all open orders of the market and resets the book
+
+        :param int limit: Number of orders fetched with each ``list_limit_orders`` call
+        """
+        self.clear()
+        if not self.blockchain.is_connected():
+            return
+        self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        props = self.blockchain.get_dynamic_global_properties(False)
+        if props is not None:
+            self.block_num = props["head_block_number"]
+        start = ["", 0]
+        while True:
+            orders = self.blockchain.rpc.list_limit_orders(
+                {"start": start, "limit": limit, "order": "by_account"}, api="database"
+            )["orders"]
+            for order in orders:
+                if [order["seller"], order["orderid"]] == start:
+                    continue
+                self._add_order(
+                    order["seller"],
+                    order["orderid"],
+                    order["sell_price"]["base"],
+                    order["sell_price"]["quote"],
+                    for_sale=int(order["for_sale"]),
+                )
+            if len(orders) < limit:
+                break
+            start = [orders[-1]["seller"], orders[-1]["orderid"]]
+
+    def apply(self, op):
+        """Applies a single market operation to the book
+
+        :param dict op: Operation as yielded by :func:`nectar.blockchain.Blockchain.stream`
+            (``raw_ops`` True or False) or an ``[op_type, op]`` list
+
+        Returns True when the book was changed.
+        """
+        if isinstance(op, (list, tuple)):
+            op_type, value = op
+        elif "op" in op:
+            if isinstance(op["op"], dict):
+                op_type, value = op["op"]["type"], op["op"]["value"]
+            else:
+                op_type, value = op["op"]
+            if op.get("block_num"):
+                self.block_num = op["block_num"]
+        elif "value" in op:
+            op_type, value = op["type"], op["value"]
+        else:
+            op_type, value = op["type"], op
+            if op.get("block_num"):
+                self.block_num = op["block_num"]
+        if op_type.endswith("_operation"):
+            op_type = op_type[:-10]
+        if op_type == "limit_order_create":
+            self._add_order(
+                value["owner"], value["orderid"], value["amount_to_sell"], value["min_to_receive"]
+            )
+        elif op_type == "limit_order_create2":
+            sell_amount, sell_symbol = self._parse_amount(value["amount_to_sell"])
+            rate_base, base_symbol = self._parse_amount(value["exchange_rate"]["base"])
+            rate_quote, quote_symbol = self._parse_amount(value["exchange_rate"]["quote"])
+            if not rate_base or sell_symbol != base_symbol or base_symbol == quote_symbol:
+                return False
+            self._insert_order(
+                value["owner"],
+                value["orderid"],
+                sell_amount,
+                sell_symbol,
+                sell_amount * rate_quote / rate_base,
+            )
+        elif op_type == "limit_order_cancel":
+            self._remove_order((value["owner"], value["orderid"]))
+        elif op_type == "limit_order_cancelled":
+            self._remove_order((value["seller"], value["orderid"]))
+        elif op_type == "fill_order":
+            self._reduce_order(
+                (value["current_owner"], value["current_orderid"]), value["current_pays"]
+            )
+            self._reduce_order((value["open_owner"], value["open_orderid"]), value["open_pays"])
+            current_pays, current_symbol = self._parse_amount(value["current_pays"])
+            open_pays, _ = self._parse_amount(value["open_pays"])
+            if current_pays and open_pays:
+                if current_symbol == self.quote["symbol"]:
+                    self.latest = self._price(open_pays, current_pays)
+                else:
+                    self.latest = self._price(current_pays, open_pays)
+        else:
+            return False
+        return True
+
+    def stream(self, start=None, stop=None, **kwargs):
+        """Applies all market operations from the block stream and yields them
+
+        :param int start: Start at this block (default: block after :func:`seed`)
+        :param int stop: Stop at this block
+
+        ``fill_order`` and ``limit_order_cancelled`` are virtual operations,
+        which are not part of the block transactions. They are read with
+        ``get_ops_in_block`` for every block and applied in the order in
+        which the node applied them, i.e. a fill right after the order
+        which caused it. The operations are yielded as with ``raw_ops=True``.
+
+        All other parameters are handed over to :func:`nectar.blockchain.Blockchain.blocks`.
+        The book is seeded when this has not been done before.
+        """
+        if self.block_num is None:
+            self.seed()
+        if start is None and self.block_num is not None:
+            start = self.block_num + 1
+        mode = kwargs.pop("mode", "head")
+        blockchain = Blockchain(mode=mode, blockchain_instance=self.blockchain)
+        for block in blockchain.blocks(start=start, stop=stop, raw_blocks=True, **kwargs):
+            virtual_ops = Block.get_raw(
+                block["id"], only_virtual_ops=True, blockchain_instance=self.blockchain
+            )["operations"]
+            for op in self._block_ops(block, virtual_ops):
+                self.apply(op)
+                yield op
+
+    def _block_ops(self, block, virtual_ops):
+        """Returns the market operations of a raw block and its virtual
+        operations, sorted by transaction and operation index"""
+        ops = []
+        for trx_num, trx in enumerate(block.get("transactions", [])):
+            for op_index, op in enumerate(trx["operations"]):
+                if isinstance(op, dict):
+                    op = [op["type"], op["value"]]
+                op_type = op[0][:-10] if op[0].endswith("_operation") else op[0]
+                if op_type in self.op_names:
+                    ops.append(((trx_num, op_index, 0), trx_num, [op_type, op[1]]))
+        for op in virtual_ops:
+            value = op["op"]
+            if isinstance(value, dict):
+                value = [value["type"], value["value"]]
+            op_type = value[0][:-10] if value[0].endswith("_operation") else value[0]
+            if op_type not in self.op_names:
+                continue
+            # virtual ops outside of a transaction have trx_in_block 2**32 - 1
+            trx_num = op.get("trx_in_block", -1)
+            if trx_num < 0:
+                trx_num = 2**32 - 1
+            ops.append(((trx_num, op.get("op_in_trx", 0), 1), trx_num, [op_type, value[1]]))
+        ops.sort(key=lambda op: op[0])
+        return [
+            {
+                "block_num": block["id"],
+                "trx_num": trx_num,
+                "op": op,
+                "timestamp": block["timestamp"],
+            }
+            for key, trx_num, op in ops
+        ]
+
+    def best_ask(self):
+        """Returns the lowest ask price (or None)"""
+        return self.asks.best()
+
+    def best_bid(self):
+        """Returns the highest bid price (or None)"""
+        return self.bids.best()
+
+    def spread(self):
+        """Returns the difference between best ask and best bid (or None)"""
+        ask = self.asks.best()
+        bid = self.bids.best()
+        if ask is None or bid is None:
+            return None
+        return ask - bid
+
+    def _level_amounts(self, price, amount, is_ask):
+        """Returns ``(quote, base)`` amounts of a level as float"""
+        if is_ask:
+            quote = amount / 10 ** self.quote["precision"]
+            return quote, quote * price
+        base = amount / 10 ** self.base["precision"]
+        return base / price, base
+
+    def depth(self, limit=25, side="both"):
+        """Returns the aggregated price levels
+
+        :param int limit: Number of levels per side (None for all)
+        :param str side: ``asks``, ``bids`` or ``both``
+
+        Each level is a tuple of ``(price, quote_amount, base_amount)``.
+        """
+        ret = {}
+        if side in ["asks", "both"]:
+            ret["asks"] = [
+                (p,) + self._level_amounts(p, a, True) for p, a in self.asks.levels(limit)
+            ]
+        if side in ["bids", "both"]:
+            ret["bids"] = [
+                (p,) + self._level_amounts(p, a, False) for p, a in self.bids.levels(limit)
+            ]
+        return ret
+
+    def volume_at_price(self, price, side="asks"):
+        """Returns the quote amount that can be bought (``asks``) or sold (``bids``)
+        up to the given price
+        """
+        if side == "asks":
+            return self.asks.volume_until(price) / 10 ** self.quote["precision"]
+        return sum(self._level_amounts(p, a, False)[0] for p, a in self.bids.levels() if p >= price)
+
+    def snapshot(self, limit=25, raw_data=False):
+        """Returns the order book in the same shape as :func:`Market.orderbook`
+
+        :param int limit: Number of price levels per side
+        :param bool raw_data: when True, the levels from :func:`depth` are returned
+        """
+        depth = self.depth(limit=limit)
+        if raw_data:
+            return depth
+        data = {"asks": [], "bids": []}
+        for side in ["asks", "bids"]:
+            for price, quote, base in depth[side]:
+                data[side].append(
+                    Order(
+                        Amount(base, self.base["symbol"], blockchain_instance=self.blockchain),
+                        Amount(quote, self.quote["symbol"], blockchain_instance=self.blockchain),
+                        blockchain_instance=self.blockchain,
+                    )
+                )
+        return data
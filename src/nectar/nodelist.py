@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 from timeit import default_timer as timer
 
 from nectar.account import Account
 from nectar.instance import shared_blockchain_instance
+from nectarapi.exceptions import RPCError
+from nectarapi.graphenerpc import create_ws_instance
+from nectarstorage.sqlite import SQLiteCommon, SQLiteFile
+
+from .utils import formatTimeString
 
 log = logging.getLogger(__name__)
 
@@ -26,6 +35,176 @@ def node_answer_time(node):
     return rpc_answer_time
 
 
+# (benchmark name, api method, params); ``{head}`` and ``{account}`` are
+# replaced by the head block number and the benchmark account
+NODE_BENCHMARKS = [
+    ("apicall", "database_api.get_dynamic_global_properties", {}),
+    ("config", "database_api.get_config", {}),
+    ("block", "block_api.get_block", {"block_num": "{head}"}),
+    (
+        "history",
+        "account_history_api.get_account_history",
+        {"account": "{account}", "start": -1, "limit": 1},
+    ),
+]
+
+
+class _BenchmarkConnection(object):
+    """Minimal json-rpc connection to one node, used for benchmarking only"""
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        self.session = None
+        self.request_id = 0
+
+    def call(self, method, params, timeout):
+        self.request_id += 1
+        payload = json.dumps(
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": self.request_id}
+        )
+        if self.url[:2] == "ws":
+            if self.ws is None:
+                self.ws = create_ws_instance(
+                    use_ssl=self.url[:3] == "wss", enable_multithread=False
+                )
+                self.ws.settimeout(timeout)
+                self.ws.connect(self.url)
+            self.ws.settimeout(timeout)
+            self.ws.send(payload)
+            reply = json.loads(self.ws.recv())
+        else:
+            if self.session is None:
+                import requests
+
+                self.session = requests.Session()
+            response = self.session.post(
+                self.url,
+                data=payload,
+                headers={"content-type": "application/json; charset=utf-8"},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            reply = response.json()
+        if "error" in reply:
+            raise RPCError(reply["error"].get("message", str(reply["error"])))
+        return reply.get("result")
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+        if self.session is not None:
+            self.session.close()
+
+
+def benchmark_node(node, account="steemit", timeout=5, deadline=None):
+    """Measures the answer times of the :data:`NODE_BENCHMARKS` calls of one node
+
+    :param str node: node url (http(s) or ws(s))
+    :param str account: account whose last history op is requested
+    :param float timeout: timeout of a single call in seconds
+    :param float deadline: ``timeit.default_timer()`` value after which no
+        further call is sent
+
+    Returns a dict with one ``{"ok": ..., "time": ...}`` entry per benchmark,
+    and the ``head_block``, ``head_delay`` (seconds), ``version`` and ``hive``
+    values reported by the node.
+    """
+    result = {"node": node}
+    connection = _BenchmarkConnection(node)
+    head = None
+    try:
+        for benchmark, method, params in NODE_BENCHMARKS:
+            call_timeout = timeout
+            if deadline is not None:
+                call_timeout = min(timeout, deadline - timer())
+            if call_timeout <= 0:
+                result[benchmark] = {"ok": False, "time": None, "error": "budget exceeded"}
+                continue
+            if "{head}" in params.values() and head is None:
+                result[benchmark] = {"ok": False, "time": None, "error": "no head block"}
+                continue
+            params = {
+                key: head if value == "{head}" else account if value == "{account}" else value
+                for key, value in params.items()
+            }
+            start = timer()
+            try:
+                ret = connection.call(method, params, call_timeout)
+            except Exception as e:
+                result[benchmark] = {"ok": False, "time": None, "error": str(e)}
+                continue
+            result[benchmark] = {"ok": ret is not None, "time": timer() - start}
+            if benchmark == "apicall" and ret:
+                head = ret.get("head_block_number")
+                result["head_block"] = head
+                if "time" in ret:
+                    result["head_delay"] = (
+                        datetime.now(timezone.utc) - formatTimeString(ret["time"])
+                    ).total_seconds()
+            elif benchmark == "config" and ret:
+                result["hive"] = "HIVE_CHAIN_ID" in ret
+                for key in ["HIVE_BLOCKCHAIN_VERSION", "STEEM_BLOCKCHAIN_VERSION"]:
+                    if key in ret:
+                        result["version"] = ret[key]
+                        break
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            log.debug(str(e))
+    return result
+
+
+def rank_node_benchmarks(results, max_head_lag=20):
+    """Ranks benchmark results of several nodes
+
+    :param list results: results of :func:`benchmark_node`
+    :param int max_head_lag: nodes whose head block is more than this number
+        of blocks behind the best node are failing
+
+    Returns the results in the nectarflower metadata format, which can be
+    passed to :func:`NodeList.update_nodes`: ``rank`` (1 is the fastest node)
+    is set for each benchmark, ``head_lag`` for each node and failing nodes
+    are collected in ``failing_nodes``.
+    """
+    benchmark_names = [benchmark for benchmark, method, params in NODE_BENCHMARKS]
+    for benchmark in benchmark_names:
+        answered = [
+            result
+            for result in results
+            if result.get(benchmark, {}).get("ok") and result[benchmark]["time"] is not None
+        ]
+        answered.sort(key=lambda result: result[benchmark]["time"])
+        for result in results:
+            if benchmark in result:
+                result[benchmark]["rank"] = -1
+        for rank, result in enumerate(answered, 1):
+            result[benchmark]["rank"] = rank
+    head_blocks = [result["head_block"] for result in results if result.get("head_block")]
+    best_head = max(head_blocks) if head_blocks else None
+    failing_nodes = {}
+    for result in results:
+        if result.get("head_block") and best_head is not None:
+            result["head_lag"] = best_head - result["head_block"]
+        if "error" in result:
+            failing_nodes[result["node"]] = result["error"]
+        elif not result.get("apicall", {}).get("ok"):
+            failing_nodes[result["node"]] = result.get("apicall", {}).get("error", "no answer")
+        elif result.get("head_lag", 0) > max_head_lag:
+            failing_nodes[result["node"]] = "%d blocks behind" % result["head_lag"]
+    return {
+        "report": results,
+        "failing_nodes": failing_nodes,
+        "parameter": {
+            "benchmarks": {
+                benchmark: {"method": method} for benchmark, method, params in NODE_BENCHMARKS
+            },
+            "max_head_lag": max_head_lag,
+        },
+    }
+
+
 class NodeList(list):
     """Returns HIVE/STEEM nodes as list
 
@@ -199,14 +378,16 @@ class NodeList(list):
         for i in range(len(node_list)):
             if node_list[i] not in available_nodes:
                 ping_times[i] = float("inf")
-                continue
-            try:
-                ping_times[i] = node_answer_time(node_list[i])
-                if verbose:
-                    log.info("node %s results in %.2f" % (node_list[i], ping_times[i]))
-            except KeyboardInterrupt:
-                ping_times[i] = float("inf")
-                break
+        pinged = [i for i in range(len(node_list)) if ping_times[i] != float("inf")]
+        if pinged:
+            # All nodes are pinged at the same time
+            with ThreadPoolExecutor(max_workers=len(pinged)) as executor:
+                for i, answer_time in zip(
+                    pinged, executor.map(node_answer_time, [node_list[i] for i in pinged])
+                ):
+                    ping_times[i] = answer_time
+                    if verbose:
+                        log.info("node %s results in %.2f" % (node_list[i], ping_times[i]))
         sorted_arg = sorted(range(len(ping_times)), key=ping_times.__getitem__)
         sorted_nodes = []
         for i in sorted_arg:
@@ -214,11 +395,13 @@ class NodeList(list):
                 sorted_nodes.append({"url": node_list[i], "delay_ms": ping_times[i] * 1000})
         return sorted_nodes
 
-    def update_nodes(self, weights=None, blockchain_instance=None, **kwargs):
+    def update_nodes(self, weights=None, blockchain_instance=None, metadata=None, **kwargs):
         """Reads metadata from nectarflower and recalculates the nodes score
 
         :param list/dict weight: can be used to weight the different benchmarks
         :type weight: list, dict
+        :param dict metadata: benchmark results in the nectarflower format,
+            e.g. from :func:`benchmark_nodes`. When set, nectarflower is not read.
 
         .. code-block:: python
 
@@ -234,6 +417,14 @@ class NodeList(list):
                 blockchain_instance = kwargs["steem_instance"]
             elif kwargs.get("hive_instance"):
                 blockchain_instance = kwargs["hive_instance"]
+        if metadata is None:
+            metadata = self._read_nectarflower(blockchain_instance)
+        if metadata is None:
+            log.warning("Failed to fetch nectarflower metadata after multiple attempts")
+            return
+        self._update_scores(metadata, weights)
+
+    def _read_nectarflower(self, blockchain_instance=None):
         steem = blockchain_instance or shared_blockchain_instance()
 
         metadata = None
@@ -249,11 +440,9 @@ class NodeList(list):
                 steem.rpc.next()
                 account = None
                 metadata = None
+        return metadata
 
-        if metadata is None:
-            log.warning("Failed to fetch nectarflower metadata after multiple attempts")
-            return
-
+    def _update_scores(self, metadata, weights=None):
         report = metadata.get("report", [])
         failing_nodes = metadata.get("failing_nodes", {})
         parameter = metadata.get("parameter", {})
@@ -332,6 +521,109 @@ class NodeList(list):
 
         super(NodeList, self).__init__(new_nodes)
 
+    def benchmark_nodes(
+        self,
+        node_list=None,
+        account="steemit",
+        timeout=5,
+        budget=10,
+        max_head_lag=20,
+        threads=None,
+        store=None,
+        max_age=None,
+        weights=None,
+    ):
+        """Benchmarks all nodes in parallel and updates the nodes score
+
+        :param list node_list: node urls (default: all nodes of the list)
+        :param str account: account whose history is requested
+        :param float timeout: timeout of a single call in seconds
+        :param float budget: all benchmarks are finished after this number of
+            seconds, nodes which have not answered until then are failing
+        :param int max_head_lag: nodes whose head block is more than this number
+            of blocks behind the best node are failing
+        :param int threads: number of parallel benchmarks (default: one per node)
+        :param NodeBenchmarkStore store: results are stored with their timestamp
+        :param float max_age: when set, results from ``store`` which are not
+            older than this number of seconds are used instead of new benchmarks
+        :param list/dict weights: benchmark weights, see :func:`update_nodes`
+
+        Each node answers the block, history, apicall and config benchmarks
+        on its own connection, so that the whole benchmark takes about as
+        long as the slowest answering node. Returns the ranked results in the
+        nectarflower metadata format.
+
+        .. code-block:: python
+
+            from nectar import Hive
+            from nectar.nodelist import NodeList
+            nl = NodeList()
+            nl.benchmark_nodes(node_list=nl.get_hive_nodes(wss=False), budget=3)
+            hv = Hive(node=nl.get_hive_nodes())
+
+        """
+        if node_list is None:
+            node_list = [node["url"] for node in self]
+        metadata = None
+        if store is not None and max_age is not None:
+            metadata = store.get_metadata(
+                node_list=node_list, max_age=max_age, max_head_lag=max_head_lag
+            )
+            if len(metadata["report"]) < len(node_list):
+                metadata = None
+        if metadata is None:
+            deadline = timer() + budget
+            executor = ThreadPoolExecutor(max_workers=threads or max(len(node_list), 1))
+            futures = {
+                executor.submit(benchmark_node, url, account, timeout, deadline): url
+                for url in node_list
+            }
+            done, not_done = wait(futures, timeout=budget)
+            executor.shutdown(wait=False, cancel_futures=True)
+            results = []
+            for future, url in futures.items():
+                if future in done and future.exception() is None:
+                    results.append(future.result())
+                elif future in done:
+                    results.append({"node": url, "error": str(future.exception())})
+                else:
+                    results.append({"node": url, "error": "budget exceeded"})
+            metadata = rank_node_benchmarks(results, max_head_lag=max_head_lag)
+            metadata["timestamp"] = time.time()
+            if store is not None:
+                store.add_results(metadata["report"], timestamp=metadata["timestamp"])
+        self._update_scores(metadata, weights)
+        return metadata
+
+    def sort_rpc_nodes(self, blockchain_instance=None, **kwargs):
+        """Reorders the nodes of a blockchain instance by their score
+
+        Nodes with the best score come first, failing nodes (negative score)
+        are moved to the end. The instance switches to the best node when
+        it is not connected to it.
+        """
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        steem = blockchain_instance or shared_blockchain_instance()
+        rpc = steem.rpc
+        if rpc is None or len(rpc.nodes) == 0:
+            return
+        scores = {node["url"]: node["score"] for node in self}
+        urls = [rpc.nodes[i].url for i in range(len(rpc.nodes))]
+        working = sorted(
+            [url for url in urls if scores.get(url, 0) >= 0 and url in scores],
+            key=lambda url: scores[url],
+            reverse=True,
+        )
+        unknown = [url for url in urls if url not in scores]
+        failing = [url for url in urls if scores.get(url, 0) < 0]
+        rpc.nodes.sort_nodes(working + unknown + failing)
+        if rpc.url != rpc.nodes[0].url:
+            rpc.next()
+
     def get_nodes(
         self,
         hive=False,
@@ -442,3 +734,117 @@ class NodeList(list):
     def get_testnet(self, testnet=True, testnetdev=False):
         """Returns testnet nodes"""
         return self.get_nodes(normal=False, appbase=False, testnet=testnet, testnetdev=testnetdev)
+
+
+class NodeBenchmarkStore(SQLiteFile, SQLiteCommon):
+    """Stores node benchmark results with their timestamp
+
+    :param str data_dir: Directory of the sqlite file (default: nectar user data dir)
+    :param str profile: Name of the sqlite file (default: ``node_benchmarks``)
+
+    .. code-block:: python
+
+        from nectar.nodelist import NodeBenchmarkStore, NodeList
+
+        store = NodeBenchmarkStore()
+        nl = NodeList()
+        # benchmarks only when the stored results are older than one hour
+        nl.benchmark_nodes(store=store, max_age=3600)
+
+    """
+
+    __tablename__ = "node_benchmarks"
+
+    def __init__(self, data_dir=None, profile=None):
+        if profile is None:
+            profile = "node_benchmarks"
+        file_kwargs = {"profile": profile}
+        if data_dir is not None:
+            file_kwargs["data_dir"] = data_dir
+        SQLiteFile.__init__(self, **file_kwargs)
+        if not self.exists():
+            self.create()
+
+    def exists(self):
+        """Check if the database table exists"""
+        query = (
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.__tablename__,),
+        )
+        return True if self.sql_fetchone(query) else False
+
+    def create(self):
+        """Create the benchmark table in the SQLite database"""
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                node TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                result TEXT NOT NULL
+            )""".format(self.__tablename__),
+            )
+        )
+        self.sql_execute(
+            ("CREATE INDEX {0}_node ON {0} (node, timestamp)".format(self.__tablename__),)
+        )
+
+    def wipe(self):
+        """Removes all stored results"""
+        self.sql_execute(("DELETE FROM {}".format(self.__tablename__),))
+
+    def __len__(self):
+        return self.sql_fetchone(("SELECT COUNT(*) FROM {}".format(self.__tablename__),))[0]
+
+    def add_results(self, results, timestamp=None):
+        """Stores the results of :func:`benchmark_node`
+
+        :param list results: benchmark results, one dict per node
+        :param float timestamp: unix timestamp of the benchmark (default: now)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        connection = sqlite3.connect(self.sqlite_file)
+        try:
+            connection.executemany(
+                "INSERT INTO {} VALUES (?, ?, ?)".format(self.__tablename__),
+                [(result["node"], timestamp, json.dumps(result)) for result in results],
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def get_results(self, node, limit=None):
+        """Returns the stored ``(timestamp, result)`` pairs of a node, newest first"""
+        query = "SELECT timestamp, result FROM {} WHERE node=? ORDER BY timestamp DESC".format(
+            self.__tablename__
+        )
+        args = (node,)
+        if limit is not None:
+            query += " LIMIT ?"
+            args = (node, limit)
+        return [(row[0], json.loads(row[1])) for row in self.sql_fetchall((query, args))]
+
+    def get_metadata(self, node_list=None, max_age=None, max_head_lag=20):
+        """Returns the newest stored result of each node, ranked by
+        :func:`rank_node_benchmarks`
+
+        :param list node_list: only these nodes are returned (default: all)
+        :param float max_age: results older than this number of seconds are ignored
+        """
+        query = "SELECT node, MAX(timestamp), result FROM {}".format(self.__tablename__)
+        args = ()
+        if max_age is not None:
+            query += " WHERE timestamp >= ?"
+            args = (time.time() - max_age,)
+        query += " GROUP BY node"
+        results = []
+        timestamps = []
+        for node, timestamp, result in self.sql_fetchall((query, args)):
+            if node_list is not None and node not in node_list:
+                continue
+            results.append(json.loads(result))
+            timestamps.append(timestamp)
+        metadata = rank_node_benchmarks(results, max_head_lag=max_head_lag)
+        metadata["timestamp"] = min(timestamps) if timestamps else None
+        return metadata
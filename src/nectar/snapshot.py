@@ -177,7 +177,7 @@ class AccountSnapshot(list):
             "index": index,
         }
 
-    def get_account_history(self, start=None, stop=None, use_block_num=True):
+    def get_account_history(self, start=None, stop=None, use_block_num=True, history_store=None):
         """Uses account history to fetch all related ops
 
         :param start: start number/date of transactions to
@@ -188,10 +188,20 @@ class AccountSnapshot(list):
         :type stop: int, datetime
         :param bool use_block_num: if true, start and stop are block numbers,
             otherwise virtual OP count numbers.
+        :param AccountHistoryStore history_store: read the ops from this local
+            store, see :func:`nectar.account.Account.sync_history` (*optional*)
 
         """
         super(AccountSnapshot, self).__init__(
-            [h for h in self.account.history(start=start, stop=stop, use_block_num=use_block_num)]
+            [
+                h
+                for h in self.account.history(
+                    start=start,
+                    stop=stop,
+                    use_block_num=use_block_num,
+                    history_store=history_store,
+                )
+            ]
         )
 
     def update_rewards(self, timestamp, curation_reward, author_vests, author_steem, author_sbd):
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+import logging
+import sqlite3
+import time
+
+from nectar.instance import shared_blockchain_instance
+from nectarstorage.sqlite import SQLiteCommon, SQLiteFile
+
+from .block import Block
+from .blockchain import Blockchain
+
+log = logging.getLogger(__name__)
+
+
+class StreamConsumer(SQLiteFile, SQLiteCommon):
+    """Streams operations like :func:`nectar.blockchain.Blockchain.stream`
+    and stores the position of the last processed op, so that a restarted
+    consumer continues behind it
+
+    :param str name: name of the cursor, many consumers can share one file
+    :param list opNames: operations to stream (default: all)
+    :param int start: first block, when no cursor is stored (default: current block)
+    :param int stop: last block (default: stream forever)
+    :param int commit_ops: the cursor is stored every ``commit_ops`` processed ops ...
+    :param float commit_interval: ... or every ``commit_interval`` seconds (default: 1000 ops, 5 s)
+    :param on_commit: function ``on_commit(cursor, connection)`` which is called
+        inside the transaction that stores the cursor
+    :param on_reorg: function ``on_reorg(block_num, stored_block_id, block_id)``
+        which is called when the block of the stored cursor was replaced by a fork
+    :param str mode: ``irreversible`` (default) or ``head``
+    :param str data_dir: Directory of the sqlite file (default: nectar user data dir)
+    :param str profile: Name of the sqlite file (default: ``stream_cursors``)
+    :param Steem blockchain_instance: Steem instance
+
+    The cursor is ``(block_num, trx_num, op_index)``, where ``op_index``
+    counts the streamed ops of a transaction. An op counts as processed when
+    the next op is requested from the consumer or when :func:`commit` is
+    called after it. Blocks without matching ops move the cursor, too.
+    After a restart, the stream starts at the block of the cursor and all
+    processed ops are skipped, so they are yielded only once as long as
+    ``opNames`` stays the same. Ops behind the last commit are yielded
+    again after a crash: write side effects within ``on_commit`` through
+    the given sqlite connection (they are committed together with the
+    cursor), or make them idempotent.
+
+    With ``mode="head"``, the id of the cursor block is compared with the
+    block of the chain on restart. When a fork replaced it, ``on_reorg`` is
+    called and the whole block is streamed again.
+
+    Further arguments (e.g. ``raw_ops``, ``op_view``, ``source``,
+    ``threading``, ``max_batch_size``, ``only_virtual_ops``) are passed to
+    :func:`nectar.blockchain.Blockchain.stream`.
+
+    .. code-block:: python
+
+        from nectar.streamconsumer import StreamConsumer
+
+        consumer = StreamConsumer("transfers", opNames=["transfer"], start=80000000)
+        for op in consumer:
+            print(op["block_num"], op["from"], op["to"], op["amount"])
+        print(consumer.cursor)
+
+    """
+
+    __tablename__ = "stream_cursors"
+
+    def __init__(
+        self,
+        name,
+        opNames=[],
+        start=None,
+        stop=None,
+        commit_ops=1000,
+        commit_interval=5,
+        on_commit=None,
+        on_reorg=None,
+        mode="irreversible",
+        data_dir=None,
+        profile=None,
+        blockchain_instance=None,
+        **kwargs,
+    ):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        kwargs.pop("steem_instance", None)
+        kwargs.pop("hive_instance", None)
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.name = name
+        self.opNames = opNames
+        self.start = start
+        self.stop = stop
+        self.commit_ops = commit_ops
+        self.commit_interval = commit_interval
+        self.on_commit = on_commit
+        self.on_reorg = on_reorg
+        self.mode = mode
+        self.stream_kwargs = kwargs
+        if profile is None:
+            profile = "stream_cursors"
+        file_kwargs = {"profile": profile}
+        if data_dir is not None:
+            file_kwargs["data_dir"] = data_dir
+        SQLiteFile.__init__(self, **file_kwargs)
+        if not self.exists():
+            self.create()
+        # processed position: block, its id, (trx_num, op_index) and whether it is complete
+        self.block_num = None
+        self.block_id = None
+        self.position = None
+        self.complete = False
+        self._uncommitted = 0
+        self._last_commit = time.time()
+        # the op which was yielded last
+        self._current = None
+        self._load()
+
+    def exists(self):
+        """Check if the database table exists"""
+        query = (
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.__tablename__,),
+        )
+        return True if self.sql_fetchone(query) else False
+
+    def create(self):
+        """Create the cursor table in the SQLite database"""
+        self.sql_execute(
+            (
+                """
+            CREATE TABLE {} (
+                name TEXT PRIMARY KEY,
+                block_num INTEGER NOT NULL,
+                block_id TEXT,
+                trx_num INTEGER NOT NULL,
+                op_index INTEGER NOT NULL,
+                complete INTEGER NOT NULL,
+                updated INTEGER NOT NULL
+            )""".format(self.__tablename__),
+            )
+        )
+
+    def _load(self):
+        row = self.sql_fetchone(
+            (
+                "SELECT block_num, block_id, trx_num, op_index, complete FROM {} "
+                "WHERE name=?".format(self.__tablename__),
+                (self.name,),
+            )
+        )
+        if row is None:
+            return
+        self.block_num, self.block_id, trx_num, op_index, complete = row
+        self.position = (trx_num, op_index)
+        self.complete = bool(complete)
+
+    @property
+    def cursor(self):
+        """``(block_num, trx_num, op_index)`` of the last processed op, or
+        ``(block_num, None, None)`` when the block is complete"""
+        if self.block_num is None:
+            return None
+        if self.complete or self.position is None:
+            return (self.block_num, None, None)
+        return (self.block_num,) + self.position
+
+    def reset(self):
+        """Removes the stored cursor"""
+        self.sql_execute(("DELETE FROM {} WHERE name=?".format(self.__tablename__), (self.name,)))
+        self.block_num = None
+        self.block_id = None
+        self.position = None
+        self.complete = False
+        self._current = None
+
+    def _acknowledge(self):
+        """Marks the op which was yielded last as processed"""
+        if self._current is None:
+            return
+        self.block_num, self.block_id, self.position = self._current
+        self.complete = False
+        self._current = None
+        self._uncommitted += 1
+
+    def commit(self):
+        """Stores the cursor, the op which was yielded last counts as processed"""
+        self._acknowledge()
+        if self.block_num is None:
+            return
+        trx_num, op_index = self.position if self.position is not None else (-1, -1)
+        connection = sqlite3.connect(self.sqlite_file)
+        try:
+            if self.on_commit is not None:
+                self.on_commit(self.cursor, connection)
+            connection.execute(
+                "INSERT OR REPLACE INTO {} VALUES (?, ?, ?, ?, ?, ?, ?)".format(self.__tablename__),
+                (
+                    self.name,
+                    self.block_num,
+                    self.block_id,
+                    trx_num,
+                    op_index,
+                    1 if self.complete else 0,
+                    int(time.time()),
+                ),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        self._uncommitted = 0
+        self._last_commit = time.time()
+
+    def _maybe_commit(self):
+        if self._uncommitted >= self.commit_ops or (
+            self._uncommitted and time.time() - self._last_commit >= self.commit_interval
+        ):
+            self.commit()
+
+    def _check_fork(self):
+        """Compares the stored block id with the block of the chain"""
+        if self.mode != "head" or not self.block_id:
+            return
+        block = Block(self.block_num, blockchain_instance=self.blockchain)
+        block_id = block.get("block_id")
+        if block_id is None or block_id == self.block_id:
+            return
+        log.warning(
+            "Block %d was replaced by a fork (%s -> %s)" % (self.block_num, self.block_id, block_id)
+        )
+        if self.on_reorg is not None:
+            self.on_reorg(self.block_num, self.block_id, block_id)
+        # stream the new block from its first op
+        self.position = None
+        self.complete = False
+
+    def _start_block(self):
+        if self.block_num is None:
+            return self.start
+        if self.complete:
+            return self.block_num + 1
+        return self.block_num
+
+    def __iter__(self):
+        chain = Blockchain(blockchain_instance=self.blockchain, mode=self.mode)
+        if self.block_num is not None:
+            self._check_fork()
+        kwargs = dict(self.stream_kwargs)
+        raw_ops = kwargs.pop("raw_ops", False)
+        op_view = kwargs.pop("op_view", False)
+        source = kwargs.pop("source", "auto")
+        kwargs["start"] = self._start_block()
+        kwargs["stop"] = self.stop
+        op_names = set(self.opNames)
+        skip_block = None if self.complete else self.block_num
+        skip_position = self.position
+        try:
+            for block in chain._stream_source(self.opNames, source, kwargs):
+                block_num = block["id"]
+                block_id = block.get("block_id")
+                trx_num = None
+                op_index = -1
+                for op in chain._block_ops(block, op_names, raw_ops=raw_ops, op_view=op_view):
+                    if op["trx_num"] == trx_num:
+                        op_index += 1
+                    else:
+                        trx_num = op["trx_num"]
+                        op_index = 0
+                    if (
+                        block_num == skip_block
+                        and skip_position is not None
+                        and (trx_num, op_index) <= skip_position
+                    ):
+                        continue
+                    self._current = (block_num, block_id, (trx_num, op_index))
+                    yield op
+                    self._acknowledge()
+                    self._maybe_commit()
+                self.block_num = block_num
+                self.block_id = block_id
+                self.position = None
+                self.complete = True
+                skip_block = None
+                if time.time() - self._last_commit >= self.commit_interval:
+                    self.commit()
+            self.commit()
+        except BaseException:
+            # the consumer left the loop or the stream failed, store what was processed
+            self._current = None
+            self.commit()
+            raise
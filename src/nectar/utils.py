@@ -8,9 +8,9 @@ import secrets
 import string
 import time as timenow
 from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
 
-from ruamel.yaml import YAML
-
+from nectarapi.exceptions import RPCError
 from nectargraphenebase.account import PasswordKey
 
 timeFormat = "%Y-%m-%dT%H:%M:%S"
@@ -59,11 +59,26 @@ def addTzInfo(t, timezone_str="UTC"):
     return t
 
 
+@lru_cache(maxsize=4096)
+def _parse_time_string(t):
+    """Parses a ``%Y-%m-%dT%H:%M:%S`` string into an UTC datetime
+
+    Chain timestamps repeat a lot (all ops of a block, expirations of
+    the transactions of a block), so the last results are cached.
+    """
+    if len(t) == 19 and t[4] == "-" and t[10] == "T" and t[13] == ":" and t[16] == ":":
+        try:
+            return datetime.fromisoformat(t).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return datetime.strptime(t, timeFormat).replace(tzinfo=timezone.utc)
+
+
 def formatTimeString(t):
     """Properly Format Time for permlinks"""
     if isinstance(t, (datetime, date, time)):
         return t.strftime(timeFormat)
-    return addTzInfo(datetime.strptime(t, timeFormat))
+    return _parse_time_string(t)
 
 
 def formatToTimeStamp(t):
@@ -72,14 +87,18 @@ def formatToTimeStamp(t):
     :param datetime t: datetime object
     :return: Timestamp as integer
     """
-    if isinstance(t, (datetime, date, time)):
-        t = addTzInfo(t)
-    else:
-        t = formatTimeString(t)
+    if not isinstance(t, (datetime, date, time)):
+        return int(_parse_time_string(t).timestamp())
+    t = addTzInfo(t)
     epoch = addTzInfo(datetime(1970, 1, 1))
     return int((t - epoch).total_seconds())
 
 
+def timestampToDatetime(t):
+    """Returns the UTC datetime of an epoch timestamp (as from :func:`formatToTimeStamp`)"""
+    return datetime.fromtimestamp(t, tz=timezone.utc)
+
+
 def formatTimeFromNow(secs=0):
     """Properly Format Time that is `x` seconds in the future
 
@@ -107,7 +126,7 @@ def parse_time(block_time):
     """Take a string representation of time from the blockchain, and parse it
     into datetime object.
     """
-    return datetime.strptime(block_time, timeFormat).replace(tzinfo=timezone.utc)
+    return _parse_time_string(block_time)
 
 
 def assets_from_string(text):
@@ -381,6 +400,8 @@ def derive_tags(tags):
 
 
 def seperate_yaml_dict_from_body(content):
+    from ruamel.yaml import YAML
+
     parameter = {}
     body = ""
     if len(content.split("---\n")) > 1:
@@ -543,3 +564,32 @@ def import_custom_json(jsonid, json_data):
             return [], []
     except (KeyError, ValueError, TypeError):
         return [], []
+
+
+def _batched_call(method, calls, expected_errors=(RPCError,), **kwargs):
+    """Sends ``method(*args, **kwargs)`` for all ``args`` in ``calls`` as one
+    batch request and returns the list of results
+
+    :param method: rpc method, e.g. ``rpc.get_active_votes``
+    :param list calls: one tuple of positional arguments per call
+    :param tuple expected_errors: errors of a single call, which are
+        answered with None instead of being raised
+
+    One failing call fails the whole batch, then the calls are sent one by one.
+    """
+    if len(calls) > 1:
+        for args in calls[:-1]:
+            method(*args, add_to_queue=True, **kwargs)
+        try:
+            ret = method(*calls[-1], add_to_queue=False, **kwargs)
+        except expected_errors:
+            ret = None
+        if isinstance(ret, list) and len(ret) == len(calls):
+            return ret
+    results = []
+    for args in calls:
+        try:
+            results.append(method(*args, **kwargs))
+        except expected_errors:
+            results.append(None)
+    return results
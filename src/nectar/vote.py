@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 import json
+from array import array
 from datetime import date, datetime, timezone
 
 from prettytable import PrettyTable
 
-from nectarapi.exceptions import InvalidParameters, UnknownKey
+from nectarapi.exceptions import InvalidParameters, RPCError, UnknownKey
 from nectargraphenebase.py23 import integer_types, string_types
 
 from .account import Account
@@ -13,10 +14,12 @@ from .comment import Comment
 from .exceptions import VoteDoesNotExistsException
 from .instance import shared_blockchain_instance
 from .utils import (
+    _batched_call,
     addTzInfo,
     construct_authorperm,
     construct_authorpermvoter,
     formatTimeString,
+    formatToTimeStamp,
     reputation_to_score,
     resolve_authorperm,
     resolve_authorpermvoter,
@@ -427,13 +430,13 @@ class ActiveVotes(VotesObject):
                 blockchain_instance = kwargs["hive_instance"]
         self.blockchain = blockchain_instance or shared_blockchain_instance()
         votes = None
-        if not self.blockchain.is_connected():
+        if not self.blockchain.is_connected() and not isinstance(authorperm, (list, dict)):
             return None
-        self.blockchain.rpc.set_next_node_on_empty_reply(False)
 
         if isinstance(authorperm, Comment):
             # if 'active_votes' in authorperm and len(authorperm["active_votes"]) > 0:
             #    votes = authorperm["active_votes"]
+            self.blockchain.rpc.set_next_node_on_empty_reply(False)
             if self.blockchain.rpc.get_use_appbase():
                 self.blockchain.rpc.set_next_node_on_empty_reply(False)
                 from nectarapi.exceptions import InvalidParameters
@@ -458,6 +461,7 @@ class ActiveVotes(VotesObject):
             authorperm = authorperm["authorperm"]
         elif isinstance(authorperm, string_types):
             [author, permlink] = resolve_authorperm(authorperm)
+            self.blockchain.rpc.set_next_node_on_empty_reply(False)
             if self.blockchain.rpc.get_use_appbase():
                 self.blockchain.rpc.set_next_node_on_empty_reply(False)
                 from nectarapi.exceptions import InvalidParameters
@@ -555,3 +559,170 @@ class AccountVotes(VotesObject):
                     vote_list.append(x)
 
         super(AccountVotes, self).__init__(vote_list)
+
+
+class VoteTable(object):
+    """Loads the active votes of many posts and stores them column-wise
+
+    :param list authorperms: list of authorperm strings (or :class:`nectar.comment.Comment`)
+    :param int batch_size: number of ``get_active_votes`` calls sent in one batch request
+    :param Steem blockchain_instance: Steem() instance to use when accesing a RPC
+
+    Instead of one :class:`ActiveVotes` (one RPC call and one :class:`Vote` object per
+    vote) for every post, the calls are sent as batched RPC requests and every vote is
+    stored as a row in the columns ``voter``, ``rshares``, ``weight``, ``percent`` and
+    ``time`` (unix timestamp). Posts whose votes could not be loaded are kept in
+    ``missing``. :class:`Vote` objects are only created on request with
+    :func:`get_votes`.
+
+    .. code-block:: python
+
+        from nectar.vote import VoteTable
+
+        table = VoteTable(["@gtg/hive-first-community-hardfork-complete", "@steemit/firstpost"])
+        for authorperm, voter, rshares, weight, percent, time in table:
+            print(authorperm, voter, rshares)
+
+    """
+
+    def __init__(self, authorperms, batch_size=50, blockchain_instance=None, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        self.batch_size = batch_size
+        self.authorperms = []
+        self.missing = []
+        self._ranges = {}
+        self.voter = []
+        self.rshares = array("q")
+        self.weight = array("Q")
+        self.percent = array("q")
+        self.time = array("q")
+        self._authorperm_idx = array("I")
+        if authorperms:
+            self.load(authorperms)
+
+    def __len__(self):
+        return len(self.voter)
+
+    def __iter__(self):
+        authorperms = self.authorperms
+        for i in range(len(self.voter)):
+            yield (
+                authorperms[self._authorperm_idx[i]],
+                self.voter[i],
+                self.rshares[i],
+                self.weight[i],
+                self.percent[i],
+                self.time[i],
+            )
+
+    def __contains__(self, authorperm):
+        return authorperm in self._ranges
+
+    def __repr__(self):
+        return "<%s posts=%d votes=%d>" % (
+            self.__class__.__name__,
+            len(self.authorperms),
+            len(self.voter),
+        )
+
+    def _fetch(self, author_permlinks):
+        """Returns one vote list (or None) per ``(author, permlink)`` pair"""
+        # a missing post is answered with InvalidParameters
+        return _batched_call(
+            self.blockchain.rpc.get_active_votes,
+            author_permlinks,
+            expected_errors=(RPCError, InvalidParameters),
+            api="condenser",
+        )
+
+    def load(self, authorperms):
+        """Loads the votes of the given posts and appends them to the table
+
+        :param list authorperms: list of authorperm strings (or :class:`nectar.comment.Comment`)
+        """
+        if not self.blockchain.is_connected():
+            return
+        self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        author_permlinks = []
+        for authorperm in authorperms:
+            if isinstance(authorperm, Comment):
+                authorperm = authorperm.authorperm
+            if authorperm in self._ranges:
+                continue
+            author_permlinks.append(resolve_authorperm(authorperm))
+        for i in range(0, len(author_permlinks), self.batch_size):
+            chunk = author_permlinks[i : i + self.batch_size]
+            for (author, permlink), votes in zip(chunk, self._fetch(chunk)):
+                authorperm = construct_authorperm(author, permlink)
+                if votes is None:
+                    self.missing.append(authorperm)
+                    continue
+                self.add_votes(authorperm, votes)
+
+    def add_votes(self, authorperm, votes):
+        """Appends raw votes (as returned by ``get_active_votes`` or ``list_votes``) of a post
+
+        :param str authorperm: authorperm of the post
+        :param list votes: list of vote dicts
+        """
+        if authorperm in self._ranges:
+            return
+        idx = len(self.authorperms)
+        self.authorperms.append(authorperm)
+        start = len(self.voter)
+        for vote in votes:
+            self.voter.append(vote["voter"])
+            self.rshares.append(int(vote.get("rshares", 0)))
+            self.weight.append(int(vote.get("weight", 0)))
+            self.percent.append(int(vote.get("percent", vote.get("vote_percent", 0))))
+            vote_time = vote.get("time", vote.get("last_update", ""))
+            if vote_time:
+                self.time.append(formatToTimeStamp(vote_time))
+            else:
+                self.time.append(0)
+            self._authorperm_idx.append(idx)
+        self._ranges[authorperm] = (start, len(self.voter))
+
+    def rows(self, authorperm):
+        """Returns the vote rows ``(voter, rshares, weight, percent, time)`` of a post"""
+        start, stop = self._ranges[authorperm]
+        return [
+            (self.voter[i], self.rshares[i], self.weight[i], self.percent[i], self.time[i])
+            for i in range(start, stop)
+        ]
+
+    def get_votes(self, authorperm, lazy=False):
+        """Returns the votes of a post as :class:`ActiveVotes` without any RPC call
+
+        :param str authorperm: authorperm of the post
+        :param bool lazy: when True, the :class:`Vote` objects are not stored
+            in the object cache (default: False)
+        """
+        votes = []
+        for voter, rshares, weight, percent, time in self.rows(authorperm):
+            votes.append(
+                {
+                    "voter": voter,
+                    "rshares": rshares,
+                    "weight": weight,
+                    "percent": percent,
+                    "time": formatTimeString(datetime.fromtimestamp(time, tz=timezone.utc)),
+                }
+            )
+        return ActiveVotes(
+            {"active_votes": votes, "authorperm": authorperm},
+            lazy=lazy,
+            blockchain_instance=self.blockchain,
+        )
+
+    def total_rshares(self, authorperm=None):
+        """Returns the summed rshares of a post or of all loaded posts"""
+        if authorperm is None:
+            return sum(self.rshares)
+        start, stop = self._ranges[authorperm]
+        return sum(self.rshares[start:stop])
@@ -5,9 +5,8 @@ from nectar.instance import shared_blockchain_instance
 from nectargraphenebase.account import PrivateKey
 from nectarstorage.exceptions import KeyAlreadyInStoreException
 
-from .account import Account
+from .account import Account, Accounts
 from .exceptions import (
-    AccountDoesNotExistsException,
     InvalidWifError,
     MissingKeyError,
     OfflineHasNoRPCException,
@@ -385,11 +384,8 @@ class Wallet(object):
 
         :param str pub: Public key
         """
-        for name in self.getAccountsFromPublicKey(pub):
-            try:
-                account = Account(name, blockchain_instance=self.blockchain)
-            except AccountDoesNotExistsException:
-                continue
+        names = list(self.getAccountsFromPublicKey(pub))
+        for account in Accounts(names, blockchain_instance=self.blockchain):
             yield {
                 "name": account["name"],
                 "account": account,
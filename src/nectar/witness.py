@@ -195,6 +195,51 @@ class Witness(BlockchainObject):
         return self.blockchain.witness_update(signing_key, url, props, account=account)
 
 
+def _find_witnesses(blockchain, names, batch_limit=100):
+    """Returns the witness dicts of ``names``, fetched with one call per ``batch_limit`` names"""
+    rpc = blockchain.rpc
+    witnesses = []
+    if rpc.get_use_appbase():
+        for i in range(0, len(names), batch_limit):
+            rpc.set_next_node_on_empty_reply(False)
+            witnesses += rpc.find_witnesses({"owners": names[i : i + batch_limit]}, api="database")[
+                "witnesses"
+            ]
+    else:
+        for name in names:
+            witnesses.append(rpc.get_witness_by_account(name))
+    return witnesses
+
+
+def _witness_list(witnesses, lazy=False, full=False, blockchain_instance=None):
+    """Returns a Witness for each witness dict or name, all are cached at once"""
+    with BlockchainObject.bulk_cache():
+        return [
+            Witness(x, lazy=lazy, full=full, blockchain_instance=blockchain_instance)
+            for x in witnesses
+        ]
+
+
+def _load_witnesses(names, lazy=False, full=False, blockchain_instance=None):
+    """Returns a Witness for each name, the witnesses are fetched in bulk
+
+    Names which are not found are loaded one by one as before, so a
+    missing witness still raises :class:`WitnessDoesNotExistsException`.
+    """
+    if lazy or not blockchain_instance.is_connected():
+        return _witness_list(names, lazy=lazy, full=full, blockchain_instance=blockchain_instance)
+    found = {}
+    for witness in _find_witnesses(blockchain_instance, [name for name in names if name]):
+        if witness:
+            found[witness["owner"]] = witness
+    return _witness_list(
+        [found.get(name, name) for name in names],
+        lazy=lazy,
+        full=full,
+        blockchain_instance=blockchain_instance,
+    )
+
+
 class WitnessesObject(list):
     def printAsTable(self, sort_key="votes", reverse=True, return_str=False, **kwargs):
         no_feed = False
@@ -372,24 +417,10 @@ class GetWitnesses(WitnessesObject):
         self.blockchain = blockchain_instance or shared_blockchain_instance()
         if not self.blockchain.is_connected():
             return
-        witnesses = []
-        name_cnt = 0
-        if self.blockchain.rpc.get_use_appbase():
-            while name_cnt < len(name_list):
-                self.blockchain.rpc.set_next_node_on_empty_reply(False)
-                witnesses += self.blockchain.rpc.find_witnesses(
-                    {"owners": name_list[name_cnt : batch_limit + name_cnt]}, api="database"
-                )["witnesses"]
-                name_cnt += batch_limit
-        else:
-            for witness in name_list:
-                witnesses.append(self.blockchain.rpc.get_witness_by_account(witness))
+        witnesses = _find_witnesses(self.blockchain, name_list, batch_limit=batch_limit)
         self.identifier = ""
         super(GetWitnesses, self).__init__(
-            [
-                Witness(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
-                for x in witnesses
-            ]
+            _witness_list(witnesses, lazy=lazy, full=full, blockchain_instance=self.blockchain)
         )
 
 
@@ -438,10 +469,12 @@ class Witnesses(WitnessesObject):
         ]
         self.identifier = ""
         super(Witnesses, self).__init__(
-            [
-                Witness(x, lazy=self.lazy, full=self.full, blockchain_instance=self.blockchain)
-                for x in self.active_witnessess
-            ]
+            _load_witnesses(
+                self.active_witnessess,
+                lazy=self.lazy,
+                full=self.full,
+                blockchain_instance=self.blockchain,
+            )
         )
 
 
@@ -488,10 +521,7 @@ class WitnessesVotedByAccount(WitnessesObject):
             witnessess = self.account["witness_votes"]
 
         super(WitnessesVotedByAccount, self).__init__(
-            [
-                Witness(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
-                for x in witnessess
-            ]
+            _load_witnesses(witnessess, lazy=lazy, full=full, blockchain_instance=self.blockchain)
         )
 
 
@@ -520,58 +550,53 @@ class WitnessesRankedByVote(WitnessesObject):
             elif kwargs.get("hive_instance"):
                 blockchain_instance = kwargs["hive_instance"]
         self.blockchain = blockchain_instance or shared_blockchain_instance()
-        witnessList = []
-        last_limit = limit
         self.identifier = ""
+        rpc = self.blockchain.rpc
         use_condenser = self.blockchain.config["use_condenser"]
-        self.blockchain.rpc.set_next_node_on_empty_reply(False)
-        if self.blockchain.rpc.get_use_appbase() and not use_condenser:
+        rpc.set_next_node_on_empty_reply(False)
+        use_database_api = rpc.get_use_appbase() and not use_condenser
+        if use_database_api:
             query_limit = 1000
         else:
             query_limit = 100
-        if self.blockchain.rpc.get_use_appbase() and not use_condenser and from_account == "":
-            last_account = None
-        elif self.blockchain.rpc.get_use_appbase() and not use_condenser:
-            last_account = Witness(from_account, blockchain_instance=self.blockchain)["votes"]
-        else:
-            last_account = from_account
-        if limit > query_limit:
-            while last_limit > query_limit:
-                tmpList = WitnessesRankedByVote(last_account, query_limit)
-                if last_limit < limit:
-                    witnessList.extend(tmpList[1:])
-                    last_limit -= query_limit - 1
-                else:
-                    witnessList.extend(tmpList)
-                    last_limit -= query_limit
-                if self.blockchain.rpc.get_use_appbase():
-                    last_account = witnessList[-1]["votes"]
-                else:
-                    last_account = witnessList[-1]["owner"]
-        if last_limit < limit:
-            last_limit += 1
-        if self.blockchain.rpc.get_use_appbase() and not use_condenser:
-            witnessess = self.blockchain.rpc.list_witnesses(
-                {"start": [0, last_account], "limit": last_limit, "order": "by_vote_name"},
-                api="database",
-            )["witnesses"]
-        elif self.blockchain.rpc.get_use_appbase() and use_condenser:
-            witnessess = self.blockchain.rpc.get_witnesses_by_vote(
-                last_account, last_limit, api="condenser"
-            )
+        if not use_database_api:
+            start = from_account
+        elif from_account == "":
+            start = [0, None]
         else:
-            witnessess = self.blockchain.rpc.get_witnesses_by_vote(last_account, last_limit)
-        # self.witness_count = len(self.voted_witnessess)
-        if last_limit < limit:
-            witnessess = witnessess[1:]
-        if len(witnessess) > 0:
-            for x in witnessess:
-                witnessList.append(
-                    Witness(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
-                )
-        if len(witnessList) == 0:
+            start = [self._get_votes(from_account), from_account]
+        witnessess = []
+        while len(witnessess) < limit:
+            # every page after the first one starts with the last witness of the page before
+            skip = 1 if witnessess else 0
+            count = min(query_limit, limit - len(witnessess) + skip)
+            if use_database_api:
+                page = rpc.list_witnesses(
+                    {"start": start, "limit": count, "order": "by_vote_name"}, api="database"
+                )["witnesses"]
+            elif rpc.get_use_appbase():
+                page = rpc.get_witnesses_by_vote(start, count, api="condenser")
+            else:
+                page = rpc.get_witnesses_by_vote(start, count)
+            witnessess.extend(page[skip:])
+            if len(page) < count:
+                break
+            if use_database_api:
+                start = [page[-1]["votes"], page[-1]["owner"]]
+            else:
+                start = page[-1]["owner"]
+        if len(witnessess) == 0:
             return
-        super(WitnessesRankedByVote, self).__init__(witnessList)
+        super(WitnessesRankedByVote, self).__init__(
+            _witness_list(witnessess, lazy=lazy, full=full, blockchain_instance=self.blockchain)
+        )
+
+    def _get_votes(self, owner):
+        """Returns the current votes of a witness"""
+        witnesses = _find_witnesses(self.blockchain, [owner])
+        if not witnesses:
+            raise WitnessDoesNotExistsException(owner)
+        return witnesses[0]["votes"]
 
 
 class ListWitnesses(WitnessesObject):
@@ -610,8 +635,5 @@ class ListWitnesses(WitnessesObject):
         if len(witnessess) == 0:
             return
         super(ListWitnesses, self).__init__(
-            [
-                Witness(x, lazy=lazy, full=full, blockchain_instance=self.blockchain)
-                for x in witnessess
-            ]
+            _witness_list(witnessess, lazy=lazy, full=full, blockchain_instance=self.blockchain)
         )
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import itertools
 import json
 import logging
 import re
@@ -16,31 +17,56 @@ from .exceptions import (
     WorkingNodeMissing,
 )
 from .node import Nodes
-from .rpcutils import get_api_name, get_query, is_network_appbase_ready
+from .rpcutils import encode_query, get_api_name, get_query_template, is_network_appbase_ready
 
+# websocket-client and requests are imported when the first connection of
+# their kind is opened, until then the names below are placeholders
 WEBSOCKET_MODULE = None
-if not WEBSOCKET_MODULE:
-    try:
-        import websocket
-        from websocket._exceptions import (
-            WebSocketConnectionClosedException,
-            WebSocketTimeoutException,
-        )
-
-        WEBSOCKET_MODULE = "websocket"
-    except ImportError:
-        WEBSOCKET_MODULE = None
 REQUEST_MODULE = None
-if not REQUEST_MODULE:
-    try:
-        import requests
-        from requests.adapters import HTTPAdapter
-        from requests.exceptions import ConnectionError
-        from requests.packages.urllib3.util.retry import Retry
+websocket = None
+requests = None
+
+
+class _TransportNotLoaded(Exception):
+    """Is never raised, stands in for the exceptions of a transport which is not imported"""
+
+
+WebSocketConnectionClosedException = _TransportNotLoaded
+WebSocketTimeoutException = _TransportNotLoaded
+ConnectionError = _TransportNotLoaded
+
+
+def _load_websocket():
+    """Imports websocket-client, returns False when it is not installed"""
+    global WEBSOCKET_MODULE, websocket
+    global WebSocketConnectionClosedException, WebSocketTimeoutException
+    if WEBSOCKET_MODULE is None:
+        try:
+            import websocket
+            from websocket._exceptions import (
+                WebSocketConnectionClosedException,
+                WebSocketTimeoutException,
+            )
+
+            WEBSOCKET_MODULE = "websocket"
+        except ImportError:
+            return False
+    return True
+
+
+def _load_requests():
+    """Imports requests, returns False when it is not installed"""
+    global REQUEST_MODULE, requests, ConnectionError
+    if REQUEST_MODULE is None:
+        try:
+            import requests
+            from requests.exceptions import ConnectionError
+
+            REQUEST_MODULE = "requests"
+        except ImportError:
+            return False
+    return True
 
-        REQUEST_MODULE = "requests"
-    except ImportError:
-        REQUEST_MODULE = None
 
 log = logging.getLogger(__name__)
 
@@ -58,7 +84,7 @@ def set_session_instance(instance):
 
 def shared_session_instance():
     """Get session instance"""
-    if REQUEST_MODULE is None:
+    if not _load_requests():
         raise Exception("Requests module is not available.")
     if not SessionInstance.instance:
         SessionInstance.instance = requests.Session()
@@ -67,7 +93,7 @@ def shared_session_instance():
 
 def create_ws_instance(use_ssl=True, enable_multithread=True):
     """Get websocket instance"""
-    if WEBSOCKET_MODULE is None:
+    if not _load_websocket():
         raise Exception("WebSocket module is not available.")
     if use_ssl:
         ssl_defaults = ssl.get_default_verify_paths()
@@ -99,7 +125,8 @@ class GrapheneRPC(object):
         """Initialize the RPC client."""
         self.rpc_methods = {"offline": -1, "ws": 0, "jsonrpc": 1, "wsappbase": 2, "appbase": 3}
         self.current_rpc = self.rpc_methods["ws"]
-        self._request_id = 0
+        # next() on a count is atomic, no lock is needed between threads
+        self._request_ids = itertools.count(1)
         self.timeout = kwargs.get("timeout", 60)
         num_retries = kwargs.get("num_retries", 100)
         num_retries_call = kwargs.get("num_retries_call", 5)
@@ -144,8 +171,7 @@ class GrapheneRPC(object):
 
     def get_request_id(self):
         """Get request id."""
-        self._request_id += 1
-        return self._request_id
+        return next(self._request_ids)
 
     def next(self):
         """Switches to the next node url"""
@@ -431,12 +457,16 @@ class GrapheneRPC(object):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(f"Payload: {json.dumps(payload)}")
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug(f"Payload: {json.dumps(payload)}")
         if self.nodes.working_nodes_count == 0:
             raise WorkingNodeMissing("No working nodes available.")
         if self.url is None:
             raise RPCConnection("RPC is not connected!")
 
+        # encoded once, also when the call is retried
+        data = encode_query(payload)
         reply = {}
         response = None
         while True:
@@ -446,11 +476,9 @@ class GrapheneRPC(object):
                     self.current_rpc == self.rpc_methods["ws"]
                     or self.current_rpc == self.rpc_methods["wsappbase"]
                 ):
-                    reply = self.ws_send(json.dumps(payload, ensure_ascii=False).encode("utf8"))
+                    reply = self.ws_send(data)
                 else:
-                    response = self.request_send(
-                        json.dumps(payload, ensure_ascii=False).encode("utf8")
-                    )
+                    response = self.request_send(data)
                     reply = response.text
                 if not bool(reply):
                     try:
@@ -495,7 +523,8 @@ class GrapheneRPC(object):
         except ValueError:
             self._check_for_server_error(reply)
 
-        log.debug(f"Reply: {json.dumps(reply)}")
+        if debug:
+            log.debug(f"Reply: {json.dumps(reply)}")
 
         if isinstance(ret, dict) and "error" in ret:
             if isinstance(ret["error"], dict):
@@ -540,13 +569,12 @@ class GrapheneRPC(object):
             stored_num_retries_call = self.nodes.num_retries_call
             self.nodes.num_retries_call = kwargs.get("num_retries_call", stored_num_retries_call)
             add_to_queue = kwargs.get("add_to_queue", False)
-            query = get_query(
+            template = get_query_template(
                 self.is_appbase_ready() and not self.use_condenser or api_name == "bridge",
-                self.get_request_id(),
                 api_name,
                 name,
-                args,
             )
+            query = template.query(self.get_request_id(), args)
             if add_to_queue:
                 self.rpc_queue.append(query)
                 self.nodes.num_retries_call = stored_num_retries_call
@@ -63,6 +63,23 @@ class Nodes(list):
 
     next = __next__  # Python 2
 
+    def sort_nodes(self, urls):
+        """Reorders the nodes, the given urls come first in the given order
+
+        Nodes which are not in ``urls`` are kept behind them in their
+        old order. Error counts are kept and the next call of ``next()``
+        returns the first node.
+        """
+        rank = {}
+        for url in urls:
+            if url not in rank:
+                rank[url] = len(rank)
+        nodes = sorted(
+            [self[i] for i in range(len(self))], key=lambda node: rank.get(node.url, len(rank))
+        )
+        super(Nodes, self).__init__(nodes)
+        self.current_node_index = -1
+
     def export_working_nodes(self):
         nodes_list = []
         for i in range(len(self)):
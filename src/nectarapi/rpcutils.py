@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+from functools import lru_cache
 
 log = logging.getLogger(__name__)
 
@@ -17,81 +18,88 @@ def is_network_appbase_ready(props):
         return False
 
 
-def get_query(appbase, request_id, api_name, name, args):
-    query = []
-    if not appbase or api_name == "condenser_api":
-        query = {
+class QueryTemplate(object):
+    """Precompiled json-rpc request of one method of one api
+
+    :param bool appbase: appbase request format
+    :param str api_name: api name, e.g. ``block_api``
+    :param str name: method name, e.g. ``get_block``
+
+    The envelope (``method`` and the request format) is decided once,
+    :func:`query` only fills in the request id and the arguments. The
+    arguments are referenced, not copied.
+    """
+
+    __slots__ = ("appbase", "api_name", "name", "method")
+
+    def __init__(self, appbase, api_name, name):
+        self.appbase = appbase and api_name != "condenser_api"
+        self.api_name = api_name
+        self.name = name
+        self.method = api_name + "." + name
+
+    def _call(self, request_id, args):
+        return {
             "method": "call",
-            "params": [api_name, name, list(args)],
+            "params": [self.api_name, self.name, list(args)],
             "jsonrpc": "2.0",
             "id": request_id,
         }
-    else:
-        args = json.loads(json.dumps(args))
-        # print(args)
-        if len(args) > 0 and isinstance(args, list) and isinstance(args[0], dict):
-            query = {
-                "method": api_name + "." + name,
-                "params": args[0],
-                "jsonrpc": "2.0",
-                "id": request_id,
-            }
-        elif (
-            len(args) > 0
-            and isinstance(args, list)
-            and isinstance(args[0], list)
-            and len(args[0]) > 0
-            and isinstance(args[0][0], dict)
-        ):
-            for a in args[0]:
-                query.append(
-                    {
-                        "method": api_name + "." + name,
-                        "params": a,
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                    }
-                )
-                request_id += 1
-        elif args:
-            query = {
-                "method": "call",
-                "params": [api_name, name, list(args)],
-                "jsonrpc": "2.0",
-                "id": request_id,
-            }
-            request_id += 1
-        elif api_name == "condenser_api":
-            query = {
-                "method": api_name + "." + name,
-                "jsonrpc": "2.0",
-                "params": [],
-                "id": request_id,
-            }
-        else:
-            query = {
-                "method": api_name + "." + name,
-                "jsonrpc": "2.0",
-                "params": {},
-                "id": request_id,
-            }
-    return query
 
+    def query(self, request_id, args):
+        """Returns the request (or a list of requests for a list of param dicts)"""
+        if not self.appbase:
+            return self._call(request_id, args)
+        if args and isinstance(args, (list, tuple)):
+            first = args[0]
+            if isinstance(first, dict):
+                return {"method": self.method, "params": first, "jsonrpc": "2.0", "id": request_id}
+            if isinstance(first, (list, tuple)) and len(first) > 0 and isinstance(first[0], dict):
+                query = []
+                for a in first:
+                    query.append(
+                        {"method": self.method, "params": a, "jsonrpc": "2.0", "id": request_id}
+                    )
+                    request_id += 1
+                return query
+        if args:
+            return self._call(request_id, args)
+        return {"method": self.method, "jsonrpc": "2.0", "params": {}, "id": request_id}
 
-def get_api_name(appbase, *args, **kwargs):
+
+@lru_cache(maxsize=1024)
+def get_query_template(appbase, api_name, name):
+    """Returns the cached :class:`QueryTemplate` of a method"""
+    return QueryTemplate(appbase, api_name, name)
+
+
+def get_query(appbase, request_id, api_name, name, args):
+    return get_query_template(bool(appbase), api_name, name).query(request_id, args)
+
+
+# compact separators, non-ascii characters are sent as utf8
+_query_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_query(query):
+    """Encodes a request (or a list of requests) to the bytes which are sent"""
+    return _query_encoder.encode(query).encode("utf8")
+
+
+@lru_cache(maxsize=256)
+def _api_name(appbase, api):
     if not appbase:
         # Sepcify the api to talk to
-        if ("api" in kwargs) and len(kwargs["api"]) > 0:
-            api_name = kwargs["api"].replace("_api", "") + "_api"
-        else:
-            api_name = None
-    else:
-        # Sepcify the api to talk to
-        if ("api" in kwargs) and len(kwargs["api"]) > 0:
-            if kwargs["api"] not in ["jsonrpc", "hive", "bridge"]:
-                api_name = kwargs["api"].replace("_api", "") + "_api"
-            else:
-                api_name = kwargs["api"]
-        else:
-            api_name = "condenser_api"
-    return api_name
+        if api:
+            return api.replace("_api", "") + "_api"
+        return None
+    # Sepcify the api to talk to
+    if api:
+        if api not in ["jsonrpc", "hive", "bridge"]:
+            return api.replace("_api", "") + "_api"
+        return api
+    return "condenser_api"
+
+
+def get_api_name(appbase, *args, **kwargs):
+    return _api_name(bool(appbase), kwargs.get("api"))
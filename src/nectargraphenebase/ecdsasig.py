@@ -12,30 +12,40 @@ from .py23 import bytes_types, py23_bytes
 
 log = logging.getLogger(__name__)
 
-SECP256K1_MODULE = None
-SECP256K1_AVAILABLE = False
-CRYPTOGRAPHY_AVAILABLE = False
-GMPY2_MODULE = False
-if not SECP256K1_MODULE:
+# The signing backend (secp256k1, cryptography or the pure python ecdsa) is
+# probed when it is needed for the first time. SECP256K1_MODULE,
+# SECP256K1_AVAILABLE and CRYPTOGRAPHY_AVAILABLE are set by _load_backend().
+_backend_loaded = False
+
+
+def _load_backend():
+    """Imports the fastest available signing backend"""
+    global _backend_loaded, SECP256K1_MODULE, SECP256K1_AVAILABLE, CRYPTOGRAPHY_AVAILABLE
+    global secp256k1, InvalidSignature, default_backend, hashes, ec
+    global decode_dss_signature, encode_dss_signature
+    if _backend_loaded:
+        return
+    module = None
+    SECP256K1_AVAILABLE = False
+    CRYPTOGRAPHY_AVAILABLE = False
     try:
         import secp256k1prp as secp256k1
 
-        SECP256K1_MODULE = "secp256k1"
+        module = "secp256k1"
         SECP256K1_AVAILABLE = True
     except:
         try:
             import secp256k1
 
-            SECP256K1_MODULE = "secp256k1"
+            module = "secp256k1"
             SECP256K1_AVAILABLE = True
         except ImportError:
             try:
-                import cryptography
+                import cryptography  # noqa: F401
 
-                SECP256K1_MODULE = "cryptography"
-                CRYPTOGRAPHY_AVAILABLE = True
+                module = "cryptography"
             except ImportError:
-                SECP256K1_MODULE = "ecdsa"
+                module = "ecdsa"
 
     try:
         from cryptography.exceptions import InvalidSignature
@@ -51,8 +61,18 @@ if not SECP256K1_MODULE:
     except ImportError:
         CRYPTOGRAPHY_AVAILABLE = False
         log.debug("Cryptography not available")
+    # a module which was set before the first use is kept
+    if "SECP256K1_MODULE" not in globals():
+        SECP256K1_MODULE = module
+    _backend_loaded = True
+    log.debug("Using SECP256K1 module: %s" % SECP256K1_MODULE)
 
-log.debug("Using SECP256K1 module: %s" % SECP256K1_MODULE)
+
+def __getattr__(name):
+    if name in ["SECP256K1_MODULE", "SECP256K1_AVAILABLE", "CRYPTOGRAPHY_AVAILABLE"]:
+        _load_backend()
+        return globals()[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 def _is_canonical(sig):
@@ -66,6 +86,7 @@ def _is_canonical(sig):
 
 
 def compressedPubkey(pk):
+    _load_backend()
     if SECP256K1_MODULE == "cryptography" and not isinstance(pk, ecdsa.keys.VerifyingKey):
         order = ecdsa.SECP256k1.order
         x = pk.public_numbers().x
@@ -81,6 +102,7 @@ def compressedPubkey(pk):
 
 def recover_public_key(digest, signature, i, message=None):
     """Recover the public key from the the signature"""
+    _load_backend()
 
     # See http: //www.secg.org/download/aid-780/sec1-v2.pdf section 4.1.6 primarily
     curve = ecdsa.SECP256k1.curve
@@ -136,6 +158,7 @@ def recoverPubkeyParameter(message, digest, signature, pubkey):
     """Use to derive a number that allows to easily recover the
     public key from the signature
     """
+    _load_backend()
     if not isinstance(message, bytes_types):
         message = py23_bytes(message, "utf-8")
     for i in range(0, 4):
@@ -168,6 +191,7 @@ def sign_message(message, wif, hashfn=hashlib.sha256):
 
     :param str wif: Private key in
     """
+    _load_backend()
 
     if not isinstance(message, bytes_types):
         message = py23_bytes(message, "utf-8")
@@ -270,6 +294,7 @@ def sign_message(message, wif, hashfn=hashlib.sha256):
 
 
 def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=None):
+    _load_backend()
     if not isinstance(message, bytes_types):
         message = py23_bytes(message, "utf-8")
     if not isinstance(signature, bytes_types):
@@ -315,7 +340,10 @@ def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=
     return phex
 
 
-def tweakaddPubkey(pk, digest256, SECP256K1_MODULE=SECP256K1_MODULE):
+def tweakaddPubkey(pk, digest256, SECP256K1_MODULE=None):
+    _load_backend()
+    if SECP256K1_MODULE is None:
+        SECP256K1_MODULE = globals()["SECP256K1_MODULE"]
     if SECP256K1_MODULE == "secp256k1":
         tmp_key = secp256k1.PublicKey(pubkey=bytes(pk), raw=True)
         new_key = tmp_key.tweak_add(digest256)  # <-- add
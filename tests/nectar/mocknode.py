@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mock
+
+from nectar.blockchain import Blockchain
+
+
+class FakeNodes(object):
+    def __init__(self, urls):
+        self.urls = urls
+
+    def export_working_nodes(self):
+        return list(self.urls)
+
+
+class FakeRPC(object):
+    """Base of the rpc stubs of offline tests, ``calls`` records the calls
+
+    :param bool appbase: answer of ``get_use_appbase()``
+    """
+
+    url = "http://127.0.0.1:0"
+    num_retries = 1
+    num_retries_call = 1
+    timeout = 1
+
+    def __init__(self, appbase=True):
+        self.calls = []
+        self.appbase = appbase
+        self.nodes = FakeNodes([self.url])
+        self.rpc_queue = []
+        self.closed = False
+
+    def rpcclose(self):
+        self.closed = True
+
+    def set_next_node_on_empty_reply(self, value):
+        pass
+
+    def get_use_appbase(self):
+        return self.appbase
+
+    def batch(self, request, add_to_queue=False):
+        """Queues ``request`` as the rpc does with ``add_to_queue=True``,
+        returns the queued requests when the batch is sent, None before"""
+        self.rpc_queue.append(request)
+        if add_to_queue:
+            return None
+        queue, self.rpc_queue = self.rpc_queue, []
+        return queue
+
+
+class FakeChain(object):
+    """Blockchain instance stub for offline tests
+
+    :param rpc: rpc of the chain, e.g. a :class:`FakeRPC` (default: None)
+    :param int block_interval: block interval in seconds
+    :param dict dynamic_global_properties: answer of
+        ``get_dynamic_global_properties()``
+    :param kwargs: further attributes of the chain
+    """
+
+    def __init__(self, rpc=None, block_interval=3, dynamic_global_properties=None, **kwargs):
+        self.rpc = rpc
+        self.block_interval = block_interval
+        self.dynamic_global_properties = dynamic_global_properties or {}
+        self.config = {"use_condenser": False}
+        self.__dict__.update(kwargs)
+
+    def is_connected(self):
+        return True
+
+    def get_block_interval(self):
+        return self.block_interval
+
+    def get_dynamic_global_properties(self, use_stored_data=True):
+        return self.dynamic_global_properties
+
+
+def raw_block(block_num, transactions, timestamp="2024-01-01T00:00:00", fork=False):
+    """Returns a block as the node sends it
+
+    :param int block_num: block number
+    :param list transactions: operation list of each transaction
+    :param timestamp: block timestamp
+    :param bool fork: the block id of a block on another fork
+    """
+    return {
+        "block_id": "%08x" % block_num + ("f" if fork else "0") * 32,
+        "previous": "%08x" % (block_num - 1) + "0" * 32,
+        "timestamp": timestamp,
+        "witness": "witness%d" % (block_num % 21),
+        "transaction_ids": ["%040x" % (block_num * 1000 + i) for i in range(len(transactions))],
+        "transactions": [
+            {
+                "expiration": "2024-01-01T00:01:00",
+                "operations": operations,
+                "signatures": ["1f" + "00" * 64],
+            }
+            for operations in transactions
+        ],
+    }
+
+
+def patch_blocks(blocks):
+    """Patches :func:`nectar.blockchain.Blockchain.blocks` to yield raw blocks
+
+    :param dict blocks: raw blocks by block number, ``id`` is set on each
+        yielded block as for ``raw_blocks=True``
+
+    .. code-block:: python
+
+        with patch_blocks({1: raw_block(1, [])}):
+            ops = list(Blockchain(blockchain_instance=FakeChain()).stream(source="blocks"))
+
+    """
+
+    def fake_blocks(self, start=None, stop=None, **kwargs):
+        for block_num in sorted(blocks):
+            if (start is None or block_num >= start) and (stop is None or block_num <= stop):
+                block = blocks[block_num]
+                block["id"] = block_num
+                yield block
+
+    return mock.patch.object(Blockchain, "blocks", fake_blocks)
+
+
+class MockNode(object):
+    """Local json-rpc node for offline tests
+
+    :param int head_block: head block number
+    :param float delay: answer delay of each call in seconds
+    :param list fail_methods: methods which answer with a json-rpc error
+    :param bool hive: answer with HIVE (True) or STEEM config keys
+    :param int transactions: number of transactions (with one vote each) per block
+
+    .. code-block:: python
+
+        with MockNode(head_block=100, delay=0.1) as node:
+            print(node.url)
+
+    """
+
+    def __init__(self, head_block=1000, delay=0, fail_methods=None, hive=True, transactions=0):
+        self.head_block = head_block
+        self.transactions = transactions
+        self.delay = delay
+        self.fail_methods = fail_methods or []
+        self.hive = hive
+        self.calls = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def reply(self, request):
+        self.calls.append(request["method"])
+        reply = {"jsonrpc": "2.0", "id": request.get("id")}
+        if request["method"] in self.fail_methods:
+            reply["error"] = {"code": -32003, "message": "mock error"}
+        else:
+            reply["result"] = self.answer(request["method"], request.get("params"))
+        return reply
+
+    def answer(self, method, params):
+        prefix = "HIVE" if self.hive else "STEEM"
+        head_time = datetime.now(timezone.utc) - timedelta(seconds=1)
+        if method.endswith("get_dynamic_global_properties"):
+            return {
+                "head_block_number": self.head_block,
+                "last_irreversible_block_num": self.head_block - 20,
+                "time": head_time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        elif method.endswith("get_config"):
+            return {
+                prefix + "_CHAIN_ID": "beeab0de" + "0" * 56,
+                prefix + "_BLOCKCHAIN_VERSION": "1.27.8",
+            }
+        elif method.endswith("get_block"):
+            return {"block": self.block(params["block_num"])}
+        elif method.endswith("get_account_history"):
+            return {"history": [[0, {"block": 1, "op": ["account_create", {}]}]]}
+        return None
+
+    def block(self, block_num):
+        voters = ["voter%d" % ((block_num + i) % 1000) for i in range(self.transactions)]
+        return raw_block(
+            block_num,
+            [
+                [
+                    {
+                        "type": "vote_operation",
+                        "value": {
+                            "voter": voter,
+                            "author": "author",
+                            "permlink": "post-%d" % block_num,
+                            "weight": 10000,
+                        },
+                    }
+                ]
+                for voter in voters
+            ],
+        )
+
+    def _handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if node.delay:
+                    time.sleep(node.delay)
+                if isinstance(request, list):
+                    reply = [node.reply(r) for r in request]
+                else:
+                    reply = node.reply(request)
+                data = json.dumps(reply).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client gave up waiting
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+
+from nectar.account import Account, AccountHistoryFetcher
+
+from .mocknode import FakeChain, FakeRPC
+
+OP_TYPES = ["vote", "transfer", "comment"]
+
+
+def history_item(index):
+    op_type = OP_TYPES[index % 3]
+    return [
+        index,
+        {
+            "trx_id": "%040x" % index,
+            "block": 1000 + index,
+            "trx_in_block": 0,
+            "op_in_trx": 0,
+            "virtual_op": 0,
+            "timestamp": "2020-01-01T00:00:00",
+            "op": [op_type, {"n": index}],
+        },
+    ]
+
+
+HISTORY = [history_item(i) for i in range(2500)]
+
+
+class HistoryRPC(FakeRPC):
+    def get_account_history(self, query, api=None):
+        self.calls.append((threading.get_ident(), query["start"], query["limit"]))
+        start = min(query["start"], len(HISTORY) - 1)
+        if start < 0:
+            start = len(HISTORY) - 1
+        lowest = max(0, start - query["limit"])
+        return {"history": HISTORY[lowest : start + 1]}
+
+
+class HistoryChain(FakeChain):
+    """All instances, also those of node_instances(), record into ``calls``"""
+
+    calls = []
+
+    def __init__(self, **kwargs):
+        super(HistoryChain, self).__init__(HistoryRPC())
+        self.rpc.calls = HistoryChain.calls
+
+
+ALICE = Account({"name": "alice"}, blockchain_instance=HistoryChain())
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        HistoryChain.calls = []
+
+    def test_ranges(self):
+        fetcher = AccountHistoryFetcher(ALICE, range_size=1000, blockchain_instance=HistoryChain())
+        self.assertEqual(fetcher.ranges(0, 2499), [(0, 999), (1000, 1999), (2000, 2499)])
+        self.assertEqual(fetcher.ranges(0, 1500, order=-1), [(1000, 1500), (0, 999)])
+
+    def test_fetch_range(self):
+        fetcher = AccountHistoryFetcher(
+            ALICE, thread_num=1, batch_size=100, blockchain_instance=HistoryChain()
+        )
+        items = fetcher.fetch_range(150, 420)
+        self.assertEqual([item[0] for item in items], list(range(150, 421)))
+
+    def test_history_in_order(self):
+        for thread_num in [1, 4]:
+            fetcher = AccountHistoryFetcher(
+                ALICE,
+                thread_num=thread_num,
+                range_size=300,
+                batch_size=100,
+                blockchain_instance=HistoryChain(),
+            )
+            ops = list(fetcher.history(start=10, stop=2000))
+            self.assertEqual([op["index"] for op in ops], list(range(10, 2001)))
+            self.assertEqual(ops[0]["account"], "alice")
+            self.assertEqual(ops[0]["type"], "transfer")
+            self.assertEqual(ops[0]["n"], 10)
+
+            ops = list(fetcher.history(start=10, stop=2000, order=-1, raw_output=True))
+            self.assertEqual([op[0] for op in ops], list(range(2000, 9, -1)))
+
+    def test_only_ops(self):
+        fetcher = AccountHistoryFetcher(
+            ALICE, thread_num=2, range_size=500, blockchain_instance=HistoryChain()
+        )
+        ops = list(fetcher.history(stop=1000, only_ops=["vote"]))
+        self.assertEqual([op["index"] for op in ops], list(range(0, 1001, 3)))
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+
+from nectar.account import Account, Accounts
+from nectar.blockchainobject import BlockchainObject
+
+from .mocknode import FakeChain, FakeRPC
+
+NAMES = ["user%03d" % i for i in range(250)]
+
+
+def fake_account(name):
+    return {
+        "name": name,
+        "reputation": "1000",
+        "created": "2020-01-01T00:00:00",
+        "last_vote_time": "2024-01-01T00:00:00",
+    }
+
+
+class AccountsRPC(FakeRPC):
+    def find_accounts(self, query, api=None):
+        self.calls.append((threading.get_ident(), len(query["accounts"])))
+        return {"accounts": [fake_account(name) for name in query["accounts"] if name in NAMES]}
+
+
+class AccountsChain(FakeChain):
+    def __init__(self, **kwargs):
+        super(AccountsChain, self).__init__(AccountsRPC())
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        BlockchainObject.clear_cache()
+        self.chain = AccountsChain()
+
+    def test_accounts(self):
+        names = NAMES[:150] + ["missing"] + NAMES[150:]
+        accounts = Accounts(names, blockchain_instance=self.chain)
+        self.assertEqual([n for _, n in self.chain.rpc.calls], [100, 100, 51])
+        self.assertEqual([a["name"] for a in accounts], NAMES)
+        self.assertIsInstance(accounts[0], Account)
+        self.assertEqual(accounts[0]["reputation"], 1000)
+        self.assertEqual(accounts[0]["created"].year, 2020)
+        self.assertIsInstance(BlockchainObject._cache.get("user249", None), Account)
+
+    def test_raw_data(self):
+        accounts = Accounts(NAMES[:3], raw_data=True, blockchain_instance=self.chain)
+        self.assertEqual(accounts[0], fake_account("user000"))
+        self.assertNotIn("user000", BlockchainObject._cache)
+
+    def test_thread_num(self):
+        accounts = Accounts(NAMES, batch_limit=10, thread_num=4, blockchain_instance=self.chain)
+        self.assertEqual([a["name"] for a in accounts], NAMES)
+        self.assertGreater(len(self.chain.rpc.calls), 0)
+        self.assertTrue(all(a.blockchain is self.chain for a in accounts))
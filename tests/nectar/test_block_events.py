@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import mock
+
+from nectar.blockchain import Blockchain
+from nectar.exceptions import BlockDoesNotExistsException
+from nectar.headnotifier import HeadNotifier
+
+from .mocknode import FakeChain
+
+
+def block_id(block_num, fork=""):
+    return "%08x%s" % (block_num, fork.ljust(32, "0"))
+
+
+class ForkingChain(FakeChain):
+    """A chain whose state changes on every dynamic global properties call"""
+
+    def __init__(self, states):
+        super(ForkingChain, self).__init__()
+        self.states = states
+        self.blocks = {}
+        self.calls = 0
+
+    def get_dynamic_global_properties(self, use_stored_data=True):
+        state = self.states[min(self.calls, len(self.states) - 1)]
+        self.calls += 1
+        head, irreversible, blocks = state
+        self.blocks = blocks
+        return {"head_block_number": head, "last_irreversible_block_num": irreversible}
+
+    def get_block(self, block_num, **kwargs):
+        if block_num not in self.blocks:
+            raise BlockDoesNotExistsException(block_num)
+        return self.blocks[block_num]
+
+
+def chain_blocks(*forks):
+    """Builds linked blocks, each fork is (first block_num, last block_num, fork name)"""
+    blocks = {}
+    for first, last, fork in forks:
+        for block_num in range(first, last + 1):
+            parent = fork if block_num > first else blocks.get(block_num - 1, {}).get("fork", "")
+            blocks[block_num] = {
+                "id": block_num,
+                "fork": fork,
+                "block_id": block_id(block_num, fork),
+                "previous": block_id(block_num - 1, parent),
+            }
+    return blocks
+
+
+class Testcases(unittest.TestCase):
+    def events(self, states, start, stop):
+        chain = ForkingChain(states)
+        with mock.patch("nectar.blockchain.Block", lambda n, **kw: chain.get_block(n)):
+            with mock.patch("nectar.blockchain.time.sleep"):
+                notifier = HeadNotifier(blockchain_instance=chain, min_backoff=0.001)
+                notifier.block_interval = 0.001
+                blockchain = Blockchain(blockchain_instance=chain, head_notifier=notifier)
+                events = blockchain.block_events(start, stop)
+                return [(e["type"], e["block_num"], e["block_id"][8:9]) for e in events]
+
+    def test_no_fork(self):
+        main = chain_blocks((1, 6, ""))
+        events = self.events([(4, 2, main), (6, 6, main)], 3, 5)
+        self.assertEqual(
+            events,
+            [
+                ("block", 3, "0"),
+                ("block", 4, "0"),
+                ("irreversible", 3, "0"),
+                ("irreversible", 4, "0"),
+                ("block", 5, "0"),
+                ("irreversible", 5, "0"),
+            ],
+        )
+
+    def test_fork(self):
+        main = chain_blocks((1, 5, ""))
+        # blocks 4 and 5 are replaced by fork "a", which continues on block 6
+        fork = chain_blocks((1, 3, ""), (4, 6, "a"))
+        states = [(5, 2, main), (6, 3, fork), (6, 3, fork), (6, 6, fork)]
+        events = self.events(states, 3, 6)
+        self.assertEqual(
+            events,
+            [
+                ("block", 3, "0"),
+                ("block", 4, "0"),
+                ("block", 5, "0"),
+                # the fork is found before block 3 is released
+                ("rollback", 5, "0"),
+                ("rollback", 4, "0"),
+                ("irreversible", 3, "0"),
+                ("replace", 4, "a"),
+                ("replace", 5, "a"),
+                ("block", 6, "a"),
+                ("irreversible", 4, "a"),
+                ("irreversible", 5, "a"),
+                ("irreversible", 6, "a"),
+            ],
+        )
+
+    def test_shorter_fork(self):
+        main = chain_blocks((1, 5, ""))
+        # the node switches to a fork which has not reached block 5 yet
+        fork = chain_blocks((1, 4, ""), (5, 5, "a"), (6, 6, "a"))
+        short = dict((n, b) for n, b in fork.items() if n < 5)
+        states = [(5, 4, main), (4, 4, short), (6, 6, fork)]
+        events = self.events(states, 5, 6)
+        self.assertEqual(
+            events,
+            [
+                ("block", 5, "0"),
+                ("rollback", 5, "0"),
+                ("replace", 5, "a"),
+                ("irreversible", 5, "a"),
+                ("block", 6, "a"),
+                ("irreversible", 6, "a"),
+            ],
+        )
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import copy
+import unittest
+from datetime import datetime, timezone
+
+from nectar.block import Block
+
+from .mocknode import FakeChain, raw_block
+
+RAW_BLOCK = raw_block(
+    2,
+    [[{"type": "vote_operation", "value": {"voter": "alice"}}]],
+    timestamp="2024-01-01T00:00:03",
+)
+
+RAW_OPS = {
+    "block": 2,
+    "timestamp": "2024-01-01T00:00:03",
+    "operations": [
+        {"block": 2, "timestamp": "2024-01-01T00:00:03", "op": {"type": "producer_reward"}}
+    ],
+}
+
+
+class Testcases(unittest.TestCase):
+    def test_parsed_times(self):
+        block = Block(copy.deepcopy(RAW_BLOCK), blockchain_instance=FakeChain())
+        time = datetime(2024, 1, 1, 0, 0, 3, tzinfo=timezone.utc)
+        self.assertEqual(block["timestamp"], time)
+        self.assertEqual(block.time(), time)
+        self.assertIsInstance(block["transactions"][0]["expiration"], datetime)
+        self.assertEqual(block.json(), RAW_BLOCK)
+        # json() does not touch the block
+        self.assertIsInstance(block["transactions"][0]["expiration"], datetime)
+
+    def test_lazy_time(self):
+        block = Block(copy.deepcopy(RAW_BLOCK), lazy_time=True, blockchain_instance=FakeChain())
+        self.assertEqual(block["timestamp"], 1704067203)
+        self.assertEqual(block.time(), datetime(2024, 1, 1, 0, 0, 3, tzinfo=timezone.utc))
+        self.assertEqual(block["transactions"][0]["expiration"], "2024-01-01T00:01:00")
+        self.assertEqual(block.json(), RAW_BLOCK)
+        self.assertEqual(block["timestamp"], 1704067203)
+
+        block = Block(
+            copy.deepcopy(RAW_OPS),
+            only_virtual_ops=True,
+            lazy_time=True,
+            blockchain_instance=FakeChain(),
+        )
+        self.assertEqual(block.block_num, 2)
+        self.assertEqual(block["operations"][0]["timestamp"], 1704067203)
+        self.assertEqual(block.json(), RAW_OPS)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar.blockchain import Blockchain, virtual_op_filter
+from nectarapi.exceptions import NoApiWithName
+
+from .mocknode import FakeChain, FakeRPC, raw_block
+
+HEAD = 120
+
+
+def vop(block_num, op_type, operation_id):
+    return {
+        "trx_id": "0000000000000000000000000000000000000000",
+        "block": block_num,
+        "trx_in_block": 4294967295,
+        "op_in_trx": 1,
+        "virtual_op": True,
+        "timestamp": "2024-01-01T00:00:%02d" % (block_num % 60),
+        "op": {
+            "type": op_type + "_operation",
+            "value": {"producer": "alice", "vesting_shares": "1.000000 VESTS"},
+        },
+        "operation_id": operation_id,
+    }
+
+
+# producer_reward in every block, fill_order in every 10th block
+VOPS = []
+for block_num in range(1, HEAD + 1):
+    VOPS.append(vop(block_num, "producer_reward", block_num * 10))
+    if block_num % 10 == 0:
+        VOPS.append(vop(block_num, "fill_order", block_num * 10 + 1))
+
+
+PROPERTIES = {"head_block_number": HEAD, "last_irreversible_block_num": HEAD}
+
+
+class VopRPC(FakeRPC):
+    def __init__(self, supported=True):
+        super(VopRPC, self).__init__()
+        self.supported = supported
+
+    def enum_virtual_ops(self, query, api=None):
+        if not self.supported:
+            raise NoApiWithName("account_history_api")
+        self.calls.append(query)
+        ops = [
+            op
+            for op in VOPS
+            if query["block_range_begin"] <= op["block"] < query["block_range_end"]
+            and op["operation_id"] >= query.get("operation_begin", 0)
+            and query["filter"] & virtual_op_filter([op["op"]["type"]])
+        ]
+        ret = {"ops": ops[: query["limit"]], "ops_by_block": []}
+        if len(ops) > query["limit"]:
+            ret["next_block_range_begin"] = ops[query["limit"]]["block"]
+            ret["next_operation_begin"] = ops[query["limit"]]["operation_id"]
+        else:
+            ret["next_block_range_begin"] = query["block_range_end"]
+            ret["next_operation_begin"] = 0
+        return ret
+
+    def get_ops_in_block(self, query, api=None, add_to_queue=False):
+        ops = [op for op in VOPS if op["block"] == query["block_num"]]
+        return {"ops": ops}
+
+    def get_block(self, query, api=None, add_to_queue=False):
+        return {"block": raw_block(query["block_num"], [])}
+
+
+class FakeNotifier(object):
+    """Reports HEAD, then ends the stream on the next wait"""
+
+    def __init__(self):
+        self.waits = []
+
+    def wait_for(self, block_num, key="head_block_number", timeout=None, blockchain_instance=None):
+        self.waits.append(block_num)
+        if len(self.waits) > 1:
+            raise KeyboardInterrupt
+        return {"head_block_number": HEAD, "last_irreversible_block_num": HEAD}
+
+
+class Testcases(unittest.TestCase):
+    def test_virtual_op_filter(self):
+        self.assertEqual(virtual_op_filter(["fill_convert_request"]), 1)
+        self.assertEqual(virtual_op_filter(["fill_order", "producer_reward_operation"]), 0x4080)
+        self.assertIsNone(virtual_op_filter(["transfer"]))
+        self.assertIsNone(virtual_op_filter(["unknown"]))
+
+    def test_virtual_op_blocks(self):
+        chain = FakeChain(VopRPC(), dynamic_global_properties=PROPERTIES)
+        b = Blockchain(blockchain_instance=chain)
+        blocks = list(b.virtual_op_blocks(start=1, stop=45, opNames=["fill_order"], block_range=20))
+        self.assertEqual([block.block_num for block in blocks], [10, 20, 30, 40])
+        self.assertEqual(len(chain.rpc.calls), 3)
+        self.assertEqual(chain.rpc.calls[0]["filter"], virtual_op_filter(["fill_order"]))
+        # a block which is split over two pages is yielded once
+        blocks = list(
+            b.virtual_op_blocks(
+                start=1, stop=20, opNames=["producer_reward", "fill_order"], limit=7
+            )
+        )
+        self.assertEqual(len(blocks), 20)
+        self.assertEqual(len(blocks[9].operations), 2)
+
+    def test_head_waits(self):
+        chain = FakeChain(VopRPC(), dynamic_global_properties=PROPERTIES)
+        notifier = FakeNotifier()
+        b = Blockchain(blockchain_instance=chain, head_notifier=notifier)
+        blocks = []
+        with self.assertRaises(KeyboardInterrupt):
+            for block in b.virtual_op_blocks(start=101, opNames=["fill_order"]):
+                blocks.append(block.block_num)
+        self.assertEqual(blocks, [110, 120])
+        # the next block is awaited through the shared notifier
+        self.assertEqual(notifier.waits, [101, HEAD + 1])
+
+    def test_stream(self):
+        chain = FakeChain(VopRPC(), dynamic_global_properties=PROPERTIES)
+        b = Blockchain(blockchain_instance=chain)
+        ops = list(b.stream(opNames=["fill_order"], start=1, stop=HEAD))
+        self.assertEqual(len(ops), HEAD // 10)
+        self.assertEqual(ops[0]["type"], "fill_order")
+        self.assertEqual(ops[0]["block_num"], 10)
+        self.assertEqual(ops[0]["producer"], "alice")
+        self.assertEqual(len(chain.rpc.calls), 1)
+        ops = list(b.stream(opNames=["fill_order"], raw_ops=True, start=1, stop=20))
+        self.assertEqual([op["block_num"] for op in ops], [10, 20])
+
+    def test_stream_fallback(self):
+        chain = FakeChain(VopRPC(supported=False), dynamic_global_properties=PROPERTIES)
+        b = Blockchain(blockchain_instance=chain)
+        ops = list(b.stream(opNames=["fill_order"], start=1, stop=20, max_batch_size=5))
+        self.assertEqual([op["block_num"] for op in ops], [10, 20])
+        with self.assertRaises(NoApiWithName):
+            list(b.stream(opNames=["fill_order"], start=1, stop=20, source="virtual_ops"))
+        with self.assertRaises(ValueError):
+            list(b.stream(opNames=["fill_order"], source="index"))
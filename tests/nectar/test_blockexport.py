@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from nectar.blockexport import BlockExporter, has_pyarrow, iter_row_groups, read_column_file
+
+from .mocknode import FakeChain, patch_blocks, raw_block
+
+
+def block_ops(block_num):
+    """Returns the operation lists of the transactions of a block"""
+    transactions = [
+        [
+            {
+                "type": "vote_operation",
+                "value": {
+                    "voter": "voter%d" % block_num,
+                    "author": "alice",
+                    "permlink": "post",
+                    "weight": 10000 - block_num,
+                },
+            },
+            {
+                "type": "transfer_operation",
+                "value": {
+                    "from": "alice",
+                    "to": "bob",
+                    "amount": {"amount": str(block_num), "precision": 3, "nai": "@@000000021"},
+                    "memo": "" if block_num % 2 else "memo",
+                },
+            },
+        ],
+        [
+            {
+                "type": "custom_json_operation",
+                "value": {
+                    "required_auths": [],
+                    "required_posting_auths": ["bob"],
+                    "id": "follow",
+                    "json": "[]",
+                },
+            },
+        ],
+    ]
+    if block_num == 3:
+        # an optional field which the former rows do not have
+        transactions[0][0]["value"]["extra"] = True
+    return transactions
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.chain = FakeChain()
+        self.blocks = {
+            i: raw_block(i, block_ops(i), timestamp=1704067200 + 3 * i) for i in range(1, 11)
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self, **kwargs):
+        exporter = BlockExporter(
+            self.directory, format="ncol", blockchain_instance=self.chain, **kwargs
+        )
+        with patch_blocks(self.blocks):
+            return exporter.export(1, 10)
+
+    def test_export(self):
+        rows = self.export(row_group_size=4)
+        self.assertEqual(rows, {"vote": 10, "transfer": 10, "custom_json": 10})
+        path = os.path.join(self.directory, "vote", "0000000001-0000000010.ncol")
+        self.assertEqual(len(list(iter_row_groups(path))), 3)
+        votes = read_column_file(path)
+        self.assertEqual(votes["block_num"], list(range(1, 11)))
+        self.assertEqual(votes["trx_num"], [0] * 10)
+        self.assertEqual(votes["trx_id"][0], "%040x" % 1000)
+        self.assertEqual(votes["timestamp"][0], 1704067203)
+        self.assertEqual(votes["weight"], [10000 - i for i in range(1, 11)])
+        self.assertEqual(votes["extra"], [None, None, True] + [None] * 7)
+
+        transfers = read_column_file(
+            os.path.join(self.directory, "transfer", "0000000001-0000000010.ncol"),
+            columns=["amount", "amount_nai", "memo", "missing"],
+        )
+        self.assertEqual(sorted(transfers), ["amount", "amount_nai", "memo", "missing"])
+        self.assertEqual(transfers["amount"], list(range(1, 11)))
+        self.assertEqual(transfers["amount_nai"], ["@@000000021"] * 10)
+        self.assertEqual(transfers["memo"][:2], ["", "memo"])
+        self.assertEqual(transfers["missing"], [None] * 10)
+
+        custom_json = read_column_file(
+            os.path.join(self.directory, "custom_json", "0000000001-0000000010.ncol")
+        )
+        self.assertEqual(custom_json["required_posting_auths"], [["bob"]] * 10)
+        self.assertEqual(custom_json["trx_num"], [1] * 10)
+
+    def test_op_names(self):
+        rows = self.export(opNames=["transfer"], max_buffered_rows=3)
+        self.assertEqual(rows, {"transfer": 10})
+        self.assertEqual(os.listdir(self.directory), ["transfer"])
+
+    def test_format(self):
+        with self.assertRaises(ValueError):
+            BlockExporter(self.directory, format="csv", blockchain_instance=self.chain)
+        exporter = BlockExporter(self.directory, blockchain_instance=self.chain)
+        self.assertEqual(exporter.format, "parquet" if has_pyarrow() else "ncol")
+
+    @unittest.skipUnless(has_pyarrow(), "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        exporter = BlockExporter(
+            self.directory, format="parquet", row_group_size=4, blockchain_instance=self.chain
+        )
+        with patch_blocks(self.blocks):
+            exporter.export(1, 10)
+        path = os.path.join(self.directory, "transfer", "0000000001-0000000010.parquet")
+        self.assertEqual(pyarrow.parquet.ParquetFile(path).metadata.num_row_groups, 3)
+        table = pyarrow.parquet.read_table(path, columns=["amount", "amount_nai"]).to_pydict()
+        self.assertEqual(table["amount"], list(range(1, 11)))
+        self.assertEqual(table["amount_nai"], ["@@000000021"] * 10)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import mock
+
+from nectar.account import Account
+from nectar.blockchain import Blockchain
+from nectar.blockindex import BlockIndex
+from nectarapi.exceptions import RPCError
+
+from .mocknode import FakeChain
+
+GENESIS = datetime(2020, 1, 1, tzinfo=timezone.utc)
+HEAD = 1000000
+
+
+def block_time(block_num):
+    # every 1000th block slot was missed
+    return GENESIS + timedelta(seconds=3 * (block_num + block_num // 1000))
+
+
+class FakeHeader(object):
+    fetched = []
+
+    def __init__(self, block_num, blockchain_instance=None):
+        FakeHeader.fetched.append(block_num)
+        self.block_num = block_num
+
+    def time(self):
+        return block_time(self.block_num)
+
+
+class PrunedAccount(Account):
+    """Account with 100 ops, op i is in block 1000 + 10 * i, op 0 is pruned"""
+
+    def __init__(self, chain):
+        dict.__init__(self, name="alice")
+        self.blockchain = chain
+        self.cached = True
+        self.identifier = "alice"
+        self.history_calls = []
+
+    def virtual_op_count(self, until=None):
+        return 100
+
+    def _get_account_history(self, start=None, limit=0, **kwargs):
+        self.history_calls.append(start)
+        if start == 0:
+            raise RPCError("pruned")
+        if start == -1:
+            start = 100
+        return [[start, {"block": 1000 + 10 * start}]]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.chain = FakeChain(
+            dynamic_global_properties={
+                "head_block_number": HEAD,
+                "last_irreversible_block_num": HEAD - 20,
+                "time": block_time(HEAD).strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        )
+        self.index = BlockIndex(blockchain_instance=self.chain, data_dir=self.data_dir)
+        FakeHeader.fetched = []
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_estimate_block_num(self):
+        index = self.index
+        self.assertIsNone(index.estimate_block_num(0))
+        index.add_block(1000, 10000)
+        index.add_block(2000, 12000)
+        self.assertEqual(index.estimate_block_num(11000), 1500)
+        self.assertEqual(index.estimate_block_num(12000), 2000)
+        self.assertEqual(index.estimate_block_num(12030), 2010)
+        self.assertEqual(index.estimate_block_num(9970), 990)
+        # observed blocks are only stored with the configured resolution
+        index.add_block(1500, 11000, force=False)
+        self.assertEqual(len(index), 2)
+        index.add_block(1500, 11000)
+        self.assertEqual(index.get_timestamp(1500), 11000)
+        # checkpoints are loaded from disk
+        index2 = BlockIndex(blockchain_instance=self.chain, data_dir=self.data_dir)
+        self.assertEqual(len(index2), 3)
+        index2.wipe()
+        self.assertEqual(len(index2), 0)
+
+    def test_op_bounds(self):
+        index = self.index
+        self.assertEqual(index.op_bounds("alice", 100), (None, None))
+        index.add_op("alice", 0, 50)
+        index.add_op("alice", 10, 100)
+        index.add_op("alice", 11, 100)
+        index.add_op("alice", 20, 300)
+        self.assertEqual(index.op_bounds("alice", 100), ((0, 50), (10, 100)))
+        self.assertEqual(index.op_bounds("alice", 101), ((11, 100), (20, 300)))
+        self.assertEqual(index.op_bounds("alice", 400), ((20, 300), None))
+        self.assertEqual(index.get_op_block_num("alice", 11), 100)
+        self.assertIsNone(index.get_op_block_num("bob", 11))
+
+    def test_get_estimated_block_num(self):
+        b = Blockchain(blockchain_instance=self.chain, block_index=self.index)
+        with mock.patch("nectar.blockchain.BlockHeader", FakeHeader):
+            date = block_time(250000) + timedelta(seconds=1)
+            block_num = b.get_estimated_block_num(date)
+            self.assertTrue(abs((block_time(block_num) - date).total_seconds()) <= 3)
+            n_fetched = len(FakeHeader.fetched)
+            self.assertTrue(n_fetched <= 3)
+
+            # a close date needs at most one verification fetch
+            FakeHeader.fetched = []
+            date = block_time(250500)
+            block_num = b.get_estimated_block_num(date)
+            self.assertTrue(abs((block_time(block_num) - date).total_seconds()) <= 3)
+            self.assertTrue(len(FakeHeader.fetched) <= 1)
+
+            # a known date does not need a fetch
+            FakeHeader.fetched = []
+            self.assertEqual(b.get_estimated_block_num(date), block_num)
+            self.assertEqual(FakeHeader.fetched, [])
+
+    def test_memory(self):
+        index = BlockIndex(blockchain_instance=self.chain)
+        self.assertIsNone(index.sqlite_file)
+        index.add_block(1000, 10000)
+        index.add_op("alice", 1, 1000)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get_op_block_num("alice", 1), 1000)
+        index.wipe()
+        self.assertEqual(len(index), 0)
+
+    def test_estimate_virtual_op_num(self):
+        account = PrunedAccount(self.chain)
+        self.index.add_op("alice", 30, 1300)
+        self.index.add_op("alice", 60, 1600)
+        self.assertEqual(account.estimate_virtual_op_num(1450, block_index=self.index), 45)
+        # the first op is looked up, although checkpoints narrow the search
+        self.assertEqual(account.history_calls[:2], [0, 1])
+        self.assertEqual(self.index.get_op_block_num("alice", 1), 1010)
+        self.assertEqual(account.estimate_virtual_op_num(1005, block_index=self.index), 0)
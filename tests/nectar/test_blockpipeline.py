@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import unittest
+from datetime import datetime
+
+from nectar.blockpipeline import BlockPipeline
+
+from .mocknode import FakeChain, FakeRPC, raw_block
+
+HEAD = 500
+
+
+PROPERTIES = {"head_block_number": HEAD, "last_irreversible_block_num": HEAD}
+
+
+def make_block(block_num):
+    return raw_block(
+        block_num,
+        [
+            [
+                {
+                    "type": "custom_json_operation",
+                    "value": {"id": "test", "json": json.dumps({"n": block_num})},
+                }
+            ]
+        ],
+    )
+
+
+class BlockRangeRPC(FakeRPC):
+    def get_block_range(self, query, api=None):
+        self.calls.append((query["starting_block_num"], query["count"]))
+        first = query["starting_block_num"]
+        last = min(first + query["count"], HEAD + 1)
+        return {"blocks": [make_block(n) for n in range(first, last)]}
+
+
+def decode_block(block):
+    assert isinstance(block["timestamp"], datetime)
+    value = block["transactions"][0]["operations"][0]["value"]
+    return json.loads(value["json"])["n"], os.getpid()
+
+
+def fail_block(block):
+    if block["id"] == 30:
+        raise ValueError("block 30")
+    return block["id"]
+
+
+class Testcases(unittest.TestCase):
+    def test_pipeline(self):
+        chain = FakeChain(BlockRangeRPC(), dynamic_global_properties=PROPERTIES)
+        checkpoints = []
+        pipeline = BlockPipeline(
+            decode_block,
+            start=1,
+            stop=200,
+            workers=2,
+            chunk_size=10,
+            checkpoint=checkpoints.append,
+            checkpoint_interval=50,
+            blockchain_instance=chain,
+        )
+        results = list(pipeline)
+        self.assertEqual([block_num for block_num, _ in results], list(range(1, 201)))
+        self.assertEqual([result[0] for _, result in results], list(range(1, 201)))
+        self.assertNotIn(os.getpid(), set(result[1] for _, result in results))
+        self.assertEqual(checkpoints, [50, 100, 150, 200])
+        self.assertEqual(pipeline.block_num, 200)
+        self.assertEqual(chain.rpc.calls[0], (1, 10))
+        self.assertEqual(len(chain.rpc.calls), 20)
+
+    def test_partial_consume(self):
+        checkpoints = []
+        pipeline = BlockPipeline(
+            fail_block,
+            start=1,
+            stop=HEAD,
+            workers=2,
+            chunk_size=10,
+            checkpoint=checkpoints.append,
+            checkpoint_interval=5,
+            blockchain_instance=FakeChain(BlockRangeRPC(), dynamic_global_properties=PROPERTIES),
+        )
+        consumed = []
+        with self.assertRaises(ValueError):
+            for block_num, result in pipeline:
+                consumed.append(result)
+        self.assertEqual(consumed, list(range(1, 21)))
+        # the last checkpoint is the last completely consumed block
+        self.assertEqual(checkpoints, [10, 20])
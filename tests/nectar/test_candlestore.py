@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+import mock
+
+from nectar import Hive
+from nectar.candlestore import CandleStore
+
+
+def fill_order(timestamp, hive, hbd, taker_pays_hive=True):
+    op = {
+        "type": "fill_order",
+        "timestamp": timestamp,
+        "current_owner": "alice",
+        "current_orderid": 1,
+        "open_owner": "bob",
+        "open_orderid": 2,
+    }
+    if taker_pays_hive:
+        op["current_pays"], op["open_pays"] = hive, hbd
+    else:
+        op["current_pays"], op["open_pays"] = hbd, hive
+    return op
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bts = Hive(offline=True)
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.store = CandleStore("HIVE:HBD", blockchain_instance=self.bts, data_dir=self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_candles(self):
+        store = self.store
+        store.apply(fill_order("2024-01-01T00:00:10", "10.000 HIVE", "3.000 HBD"))
+        store.apply(fill_order("2024-01-01T00:00:50", "10.000 HIVE", "3.200 HBD", False))
+        store.apply(fill_order("2024-01-01T00:01:30", "20.000 HIVE", "5.800 HBD"))
+        store.apply(
+            {
+                "op": [
+                    "fill_order",
+                    {
+                        "current_pays": {"amount": "1000", "precision": 3, "nai": "@@000000013"},
+                        "open_pays": {"amount": "3125", "precision": 3, "nai": "@@000000021"},
+                    },
+                ],
+                "timestamp": datetime(2024, 1, 1, 1, 0, 0, tzinfo=timezone.utc),
+            }
+        )
+        self.assertEqual(len(store), 4)
+
+        candles = store.candles(interval=60)
+        self.assertEqual(len(candles), 3)
+        self.assertEqual(candles[0]["open_time"], datetime(2024, 1, 1, tzinfo=timezone.utc))
+        self.assertAlmostEqual(candles[0]["open"], 0.3)
+        self.assertAlmostEqual(candles[0]["close"], 0.32)
+        self.assertAlmostEqual(candles[0]["high"], 0.32)
+        self.assertAlmostEqual(candles[0]["low"], 0.3)
+        self.assertAlmostEqual(candles[0]["quote_volume"], 20.0)
+        self.assertAlmostEqual(candles[0]["base_volume"], 6.2)
+        self.assertAlmostEqual(candles[0]["vwap"], 0.31)
+        self.assertEqual(candles[0]["trades"], 2)
+        self.assertAlmostEqual(candles[1]["close"], 0.29)
+
+        hourly = store.candles(interval=3600)
+        self.assertEqual(len(hourly), 2)
+        self.assertAlmostEqual(hourly[0]["open"], 0.3)
+        self.assertAlmostEqual(hourly[0]["close"], 0.29)
+        self.assertAlmostEqual(hourly[0]["high"], 0.32)
+        self.assertAlmostEqual(hourly[0]["low"], 0.29)
+        self.assertEqual(hourly[0]["trades"], 3)
+        self.assertAlmostEqual(hourly[1]["vwap"], 0.32)
+
+        stop = datetime(2024, 1, 1, 0, 1, 0, tzinfo=timezone.utc)
+        self.assertAlmostEqual(store.vwap(stop=stop), 0.31)
+        self.assertEqual(store.volume(stop=stop), {"HIVE": 20.0, "HBD": 6.2})
+        self.assertIsNone(store.vwap(start=datetime(2025, 1, 1, tzinfo=timezone.utc)))
+
+    def test_sync(self):
+        store = self.store
+        pages = [
+            [
+                {
+                    "date": "2024-01-01T00:00:01",
+                    "current_pays": "1.000 HIVE",
+                    "open_pays": "0.300 HBD",
+                },
+                {
+                    "date": "2024-01-01T00:00:02",
+                    "current_pays": "1.000 HIVE",
+                    "open_pays": "0.300 HBD",
+                },
+                {
+                    "date": "2024-01-01T00:00:02",
+                    "current_pays": "2.000 HIVE",
+                    "open_pays": "0.600 HBD",
+                },
+            ],
+            [
+                {
+                    "date": "2024-01-01T00:00:02",
+                    "current_pays": "1.000 HIVE",
+                    "open_pays": "0.300 HBD",
+                },
+                {
+                    "date": "2024-01-01T00:00:02",
+                    "current_pays": "2.000 HIVE",
+                    "open_pays": "0.600 HBD",
+                },
+                {
+                    "date": "2024-01-01T00:00:03",
+                    "current_pays": "3.000 HIVE",
+                    "open_pays": "0.900 HBD",
+                },
+            ],
+            [
+                {
+                    "date": "2024-01-01T00:00:03",
+                    "current_pays": "3.000 HIVE",
+                    "open_pays": "0.900 HBD",
+                },
+            ],
+        ]
+        stop = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        with mock.patch.object(store.market, "trades", side_effect=pages) as trades:
+            self.assertEqual(
+                store.sync(start=datetime(2024, 1, 1, tzinfo=timezone.utc), stop=stop, limit=3),
+                4,
+            )
+            self.assertEqual(trades.call_count, 3)
+        self.assertEqual(len(store), 4)
+        self.assertAlmostEqual(store.volume()["HIVE"], 7.0)
+
+        # catch-up only stores new trades
+        new_page = [
+            {"date": "2024-01-01T00:00:03", "current_pays": "3.000 HIVE", "open_pays": "0.900 HBD"},
+            {"date": "2024-01-01T00:00:04", "current_pays": "4.000 HIVE", "open_pays": "1.200 HBD"},
+        ]
+        with mock.patch.object(store.market, "trades", return_value=new_page):
+            self.assertEqual(store.sync(stop=stop, limit=3), 1)
+        self.assertEqual(len(store), 5)
+
+    def test_duplicates(self):
+        store = self.store
+        rows = [(100, 1000, 300), (100, 1000, 300), (101, 2000, 600)]
+        self.assertEqual(store.add_trades(rows), 3)
+        # the same trades, e.g. from an overlapping sync, are ignored
+        self.assertEqual(store.add_trades(rows[:2]), 0)
+        self.assertEqual(store.add_trades([(100, 1000, 300)] * 3), 1)
+        self.assertEqual(len(store), 4)
+
+    def test_stream_cursor(self):
+        store = self.store
+
+        def fill(block_num, hive):
+            return {
+                "block_num": block_num,
+                "trx_num": 0,
+                "op": [
+                    "fill_order",
+                    fill_order("2024-01-01T00:00:%02d" % block_num, hive, "0.300 HBD"),
+                ],
+                "timestamp": "2024-01-01T00:00:%02d" % block_num,
+            }
+
+        ops = [fill(10, "1.000 HIVE"), fill(10, "1.000 HIVE"), fill(12, "2.000 HIVE")]
+        with mock.patch("nectar.candlestore.Blockchain.stream", return_value=iter(ops)) as stream:
+            self.assertEqual(len(list(store.stream(start=5, stop=20))), 3)
+        self.assertEqual(stream.call_args[1]["start"], 5)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.cursor, 21)
+
+        # a restarted stream continues behind the stored blocks
+        with mock.patch("nectar.candlestore.Blockchain.stream", return_value=iter([])) as stream:
+            list(store.stream(start=5, stop=30))
+        self.assertEqual(stream.call_args[1]["start"], 21)
+        self.assertEqual(store.cursor, 31)
+
+        # an interrupted block is stored, but streamed again
+        store.wipe()
+        self.assertIsNone(store.cursor)
+        ops = [fill(10, "1.000 HIVE"), fill(11, "1.000 HIVE"), fill(11, "1.000 HIVE")]
+        with mock.patch("nectar.candlestore.Blockchain.stream", return_value=iter(ops)):
+            stream = store.stream(start=10)
+            for i in range(2):
+                next(stream)
+            stream.close()
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.cursor, 11)
+        with mock.patch("nectar.candlestore.Blockchain.stream", return_value=iter(ops[1:])):
+            list(store.stream(stop=11))
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.cursor, 12)
@@ -4,6 +4,7 @@ import unittest
 
 from click.testing import CliRunner
 
+from nectar import exceptions
 from nectar.cli import cli
 from nectar.instance import shared_steem_instance
 from nectar.utils import import_pubkeys
@@ -58,6 +59,14 @@ class Testcases(unittest.TestCase):
         result = runner.invoke(cli, ["balance", "thecrazygm", "hive-nectar"])
         self.assertEqual(result.exit_code, 0)
 
+    def test_balance_missing_account(self):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["balance", "thecrazygm", "nosuchaccount-x"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIsInstance(result.exception, exceptions.AccountDoesNotExistsException)
+        result = runner.invoke(cli, ["-o", "power", "thecrazygm"])
+        self.assertIsInstance(result.exception, exceptions.OfflineHasNoRPCException)
+
     def test_interest(self):
         runner = CliRunner()
         result = runner.invoke(cli, ["-dx", "interest", "thecrazygm", "hive-nectar"])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from nectar import Hive
+from nectar.clidaemon import CliClient, CliDaemon, subcommand
+from nectar.instance import shared_blockchain_instance
+
+from .mocknode import FakeChain
+
+
+class FakeWallet(object):
+    def __init__(self):
+        self.is_locked = False
+
+    def lock(self):
+        self.is_locked = True
+
+    def unlocked(self):
+        return not self.is_locked
+
+
+class WalletChain(FakeChain):
+    def __init__(self):
+        super(WalletChain, self).__init__()
+        self.wallet = FakeWallet()
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.data_dir, "cli.sock")
+        self.daemon = CliDaemon(socket_path=self.socket_path)
+        self.thread = threading.Thread(
+            target=self.daemon.serve, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+        self.client = CliClient(self.socket_path)
+        for i in range(100):
+            if self.client.status() is not None:
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.client.stop()
+        self.thread.join(5)
+        shutil.rmtree(self.data_dir)
+
+    def test_status(self):
+        status = self.client.status()
+        self.assertEqual(status["pid"], os.getpid())
+        self.assertEqual(status["served"], 0)
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+        self.assertIsNone(CliClient(os.path.join(self.data_dir, "none.sock")).status())
+
+    def test_run(self):
+        stm = Hive(offline=True)
+        self.daemon.add_instance("hive", stm)
+        reply = self.client.run(["--hive", "-d", "config"])
+        self.assertEqual(reply["exit_code"], 0, reply["stderr"])
+        self.assertIn("default_chain", reply["stdout"])
+        # the warm instance was used for the command
+        self.assertIs(shared_blockchain_instance(), stm)
+        self.assertTrue(stm.nobroadcast)
+        reply = self.client.run(["--hive", "config"])
+        self.assertFalse(stm.nobroadcast)
+        self.assertEqual(self.client.status()["served"], 2)
+
+        # wallet and verbosity options get their own instance
+        for args in [["--hive", "--no-wallet", "config"], ["--hive", "-v", "4", "config"]]:
+            reply = self.client.run(args)
+            self.assertEqual(reply["exit_code"], 0, reply["stderr"])
+            self.assertIsNot(shared_blockchain_instance(), stm)
+        self.assertIs(self.daemon.get_instance("hive"), stm)
+
+        reply = self.client.run(["nosuchcommand"])
+        self.assertEqual(reply["exit_code"], 2)
+        self.assertIn("nosuchcommand", reply["stderr"])
+
+    def test_unlock_timeout(self):
+        stm = WalletChain()
+        self.daemon.add_instance("hive", stm)
+        self.daemon.unlock_timeout = 0.1
+        self.daemon.wallet_unlocked()
+        self.assertTrue(self.client.status()["wallet_unlocked"])
+        time.sleep(0.3)
+        self.assertTrue(stm.wallet.is_locked)
+        self.assertFalse(self.client.status()["wallet_unlocked"])
+
+    def test_stop(self):
+        self.assertTrue(self.client.stop())
+        self.thread.join(5)
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertIsNone(self.client.run(["config"]))
+
+    def test_subcommand(self):
+        self.assertEqual(subcommand(["daemon", "start"]), "daemon")
+        self.assertEqual(subcommand(["--hive", "-n", "daemon", "info", "daemon"]), "info")
+        self.assertEqual(subcommand(["--node=https://api.hive.blog", "daemon"]), "daemon")
+        self.assertEqual(subcommand(["-v", "4", "balance", "daemon"]), "balance")
+        self.assertIsNone(subcommand(["--hive"]))
+
+    def test_keep_log_handlers(self):
+        cli_log = logging.getLogger("nectar.cli")
+        handler = logging.NullHandler()
+        cli_log.addHandler(handler)
+        try:
+            self.daemon.add_instance("hive", Hive(offline=True))
+            self.client.run(["--hive", "config"])
+            self.assertEqual(cli_log.handlers, [handler])
+        finally:
+            cli_log.removeHandler(handler)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import mock
+
+from nectar.comment import Comment
+from nectar.discussions import CursorPaginator, Discussions, Query
+
+from .mocknode import FakeChain, FakeRPC
+
+POSTS = [{"author": "a%d" % i, "permlink": "p%d" % i, "body": str(i)} for i in range(25)]
+
+
+class RankedPostsRPC(FakeRPC):
+    def get_ranked_posts(self, query, api=None):
+        self.calls.append((query.get("start_author"), query.get("start_permlink")))
+        start = 0
+        if query.get("start_author"):
+            keys = [(p["author"], p["permlink"]) for p in POSTS]
+            start = keys.index((query["start_author"], query["start_permlink"]))
+        return [dict(p) for p in POSTS[start : start + query["limit"]]]
+
+
+def page_fetcher(calls, page_size=10):
+    def fetch_page(cursor):
+        calls.append(cursor)
+        start = 0
+        if cursor[0] is not None:
+            start = [p["author"] for p in POSTS].index(cursor[0])
+        return POSTS[start : start + page_size]
+
+    return fetch_page
+
+
+class Testcases(unittest.TestCase):
+    def test_pages_without_duplicates(self):
+        for prefetch in [False, True]:
+            calls = []
+            paginator = CursorPaginator(
+                page_fetcher(calls), ("author", "permlink"), prefetch=prefetch
+            )
+            posts = list(paginator)
+            self.assertEqual([p["body"] for p in posts], [str(i) for i in range(25)])
+            self.assertEqual(calls, [(None, None), ("a9", "p9"), ("a18", "p18"), ("a24", "p24")])
+
+    def test_start_and_limit(self):
+        calls = []
+        paginator = CursorPaginator(
+            page_fetcher(calls), ("author", "permlink"), start=("a3", "p3"), limit=12
+        )
+        posts = list(paginator)
+        # the start entry of the first page is kept
+        self.assertEqual([p["body"] for p in posts], [str(i) for i in range(3, 15)])
+        # the limit is reached on the second page, no further page is requested
+        self.assertEqual(calls, [("a3", "p3"), ("a12", "p12")])
+
+    def test_lazy_and_wrap(self):
+        calls = []
+        wrapped = []
+
+        def wrap(entry):
+            wrapped.append(entry["body"])
+            return entry["body"]
+
+        paginator = CursorPaginator(
+            page_fetcher(calls), ("author", "permlink"), prefetch=False, wrap=wrap
+        )
+        it = iter(paginator)
+        self.assertEqual(calls, [])
+        self.assertEqual(next(it), "0")
+        self.assertEqual(calls, [(None, None)])
+        for _ in range(10):
+            next(it)
+        # the overlapping entry "9" was dropped before it got wrapped
+        self.assertEqual(wrapped, [str(i) for i in range(11)])
+        it.close()
+
+    def test_get_discussions(self):
+        chain = FakeChain(RankedPostsRPC())
+        prefetch_chain = FakeChain(RankedPostsRPC())
+        discussions = Discussions(blockchain_instance=chain)
+        query = Query(limit=10, tag="hive")
+        with mock.patch(
+            "nectar.discussions.node_instances", return_value=[chain, prefetch_chain]
+        ) as node_instances:
+            posts = list(discussions.get_discussions("created", query, limit=15, prefetch=True))
+        self.assertEqual(len(posts), 15)
+        self.assertTrue(isinstance(posts[0], Comment))
+        self.assertEqual([p["author"] for p in posts], ["a%d" % i for i in range(15)])
+        # the prefetch thread uses its own instance
+        self.assertEqual(chain.rpc.calls, [(None, None)])
+        self.assertEqual(prefetch_chain.rpc.calls, [("a9", "p9")])
+        self.assertEqual(node_instances.call_count, 1)
+        # the prefetch instance is reused by the next call
+        with mock.patch(
+            "nectar.discussions.node_instances", return_value=[chain, FakeChain(RankedPostsRPC())]
+        ) as node_instances:
+            list(discussions.get_discussions("created", query, limit=15, prefetch=True))
+        self.assertEqual(node_instances.call_count, 0)
+        self.assertEqual(len(prefetch_chain.rpc.calls), 2)
+        discussions.close()
+        self.assertTrue(prefetch_chain.rpc.closed)
+        self.assertIsNone(discussions._prefetch_instance)
+        del chain.rpc.calls[:]
+
+        raw = list(
+            discussions.get_discussions("created", query, limit=30, raw_data=True, prefetch=False)
+        )
+        self.assertEqual([p["body"] for p in raw], [str(i) for i in range(25)])
+        self.assertTrue(isinstance(raw[0], dict))
+        self.assertEqual(len(chain.rpc.calls), 4)
+
+    def test_wrong_type(self):
+        discussions = Discussions(blockchain_instance=FakeChain(RankedPostsRPC()))
+        with self.assertRaises(ValueError):
+            discussions.get_discussions("unknown", Query(limit=10))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from nectar import Hive
+from nectar.blockchain import Blockchain
+from nectar.executor import ExecutorService, shared_executor
+
+from .mocknode import MockNode
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.executor = ExecutorService(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_ordered(self):
+        def task(i, attempt):
+            time.sleep(0.02 * (i % 3))
+            return i * i
+
+        results = list(self.executor.imap(task, range(20), window=4))
+        self.assertEqual(results, [i * i for i in range(20)])
+
+    def test_no_batch_stall(self):
+        # item 1 is slow, item 0 is yielded without waiting for it
+        def task(i, attempt):
+            if i == 1:
+                time.sleep(0.3)
+            return i
+
+        start = time.time()
+        results = self.executor.imap(task, range(4), window=4)
+        self.assertEqual(next(results), 0)
+        self.assertLess(time.time() - start, 0.2)
+        self.assertEqual(list(results), [1, 2, 3])
+
+    def test_window(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def task(i, attempt):
+            with lock:
+                running.append(i)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(i)
+            return i
+
+        self.assertEqual(list(self.executor.imap(task, range(12), window=2)), list(range(12)))
+        self.assertLessEqual(max(peak), 2)
+
+    def test_timeout_redispatch(self):
+        attempts = []
+
+        def task(i, attempt):
+            attempts.append((i, attempt))
+            if i == 2 and attempt == 0:
+                # a hanging node
+                time.sleep(1)
+                return "slow"
+            return i
+
+        start = time.time()
+        results = list(self.executor.imap(task, range(4), timeout=0.1, retries=1))
+        self.assertEqual(results, [0, 1, 2, 3])
+        self.assertLess(time.time() - start, 0.8)
+        self.assertIn((2, 1), attempts)
+
+    def test_exception(self):
+        def task(i, attempt):
+            if i == 1 and attempt < 2:
+                raise ValueError("node error")
+            return i
+
+        self.assertEqual(list(self.executor.imap(task, range(3), retries=2)), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            list(self.executor.imap(task, range(3), retries=1))
+
+    def test_close(self):
+        calls = []
+
+        def task(i, attempt):
+            calls.append(i)
+            time.sleep(0.01)
+            return i
+
+        results = self.executor.imap(task, range(1000), window=4)
+        self.assertEqual(next(results), 0)
+        results.close()
+        time.sleep(0.05)
+        self.assertLess(len(calls), 10)
+
+    def test_shared(self):
+        executor = shared_executor()
+        self.assertIs(shared_executor(), executor)
+        executor.shutdown()
+        self.assertIsNot(shared_executor(), executor)
+
+    def test_blocks_threading(self):
+        with MockNode(head_block=100, delay=0.01) as node:
+            hv = Hive(node=node.url, num_retries=1, timeout=5)
+            b = Blockchain(blockchain_instance=hv)
+            blocks = list(b.blocks(start=50, stop=70, threading=True, thread_num=4))
+        self.assertEqual([block.block_num for block in blocks], list(range(50, 71)))
+        self.assertEqual(blocks[0]["block_id"], "%08x" % 50 + "0" * 32)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from nectar.followgraph import FollowGraph
+from nectarapi.exceptions import RPCError
+
+from .mocknode import FakeChain, FakeRPC
+
+FOLLOWS = {
+    "alice": ["bob", "carol", "dave", "erin", "frank"],
+    "bob": ["alice"],
+    "carol": [],
+}
+
+
+class FollowRPC(FakeRPC):
+    def __init__(self):
+        super(FollowRPC, self).__init__()
+        # (account, start) pages which fail
+        self.fail = set()
+
+    def get_following(self, account, start, what, limit, api=None, add_to_queue=False):
+        queue = self.batch((account, start, limit), add_to_queue)
+        if queue is None:
+            return None
+        self.calls.append(queue)
+        ret = []
+        for account, start, limit in queue:
+            if (account, start) in self.fail:
+                raise RPCError("mock error")
+            following = FOLLOWS[account]
+            i = following.index(start) if start else 0
+            ret.append(
+                [
+                    {"follower": account, "following": name, "what": ["blog"]}
+                    for name in following[i : i + limit]
+                ]
+            )
+        return ret if len(queue) > 1 else ret[0]
+
+
+def follow_op(follower, following, what):
+    return {
+        "type": "custom_json",
+        "block": 10,
+        "id": "follow",
+        "required_posting_auths": [follower],
+        "json": json.dumps(
+            ["follow", {"follower": follower, "following": following, "what": what}]
+        ),
+    }
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.chain = FakeChain(FollowRPC())
+        self.graph = FollowGraph(blockchain_instance=self.chain, page_size=2)
+        self.graph.load(["alice", "bob", "carol"])
+
+    def test_load(self):
+        graph = self.graph
+        self.assertEqual(graph.following("alice"), ["bob", "carol", "dave", "erin", "frank"])
+        self.assertEqual(graph.followers("alice"), ["bob"])
+        self.assertEqual(graph.followers("carol"), ["alice"])
+        self.assertEqual(graph.following("carol"), [])
+        # all accounts are paged together
+        self.assertEqual(len(self.chain.rpc.calls[0]), 3)
+        self.assertEqual(self.chain.rpc.calls[1], [("alice", "carol", 2)])
+        names, indptr, indices = graph.to_csr()
+        self.assertEqual(len(names), 6)
+        self.assertEqual(len(indices), 6)
+        self.assertEqual(indptr[-1], 6)
+
+    def test_apply(self):
+        graph = self.graph
+        self.assertTrue(graph.apply(follow_op("carol", "bob", ["blog"])))
+        self.assertTrue(graph.apply(follow_op("alice", "dave", [])))
+        self.assertTrue(graph.apply(follow_op("bob", ["erin", "frank"], ["blog"])))
+        # follower must sign the op
+        op = follow_op("dave", "alice", ["blog"])
+        op["required_posting_auths"] = ["erin"]
+        self.assertFalse(graph.apply(op))
+        self.assertFalse(graph.apply({"id": "notify", "json": "[]"}))
+        self.assertEqual(graph.block_num, 10)
+
+        self.assertEqual(graph.following("carol"), ["bob"])
+        self.assertEqual(graph.followers("bob"), ["alice", "carol"])
+        self.assertEqual(graph.followers("dave"), [])
+        self.assertEqual(graph.followers("erin"), ["alice", "bob"])
+        graph.compact()
+        self.assertEqual(graph.followers("dave"), [])
+        self.assertEqual(graph.following("bob"), ["alice", "erin", "frank"])
+
+        # a reload replaces the stored list of the account
+        FOLLOWS["carol"] = ["dave"]
+        try:
+            graph.load(["carol"])
+        finally:
+            FOLLOWS["carol"] = []
+        self.assertEqual(graph.following("carol"), ["dave"])
+
+    def test_apply_stream_op(self):
+        # Blockchain.stream() yields block_num instead of block
+        op = follow_op("carol", "bob", ["blog"])
+        op["block_num"] = op.pop("block")
+        self.assertTrue(self.graph.apply(op))
+        self.assertEqual(self.graph.block_num, 10)
+
+    def test_partial_load(self):
+        graph = self.graph
+        FOLLOWS["alice"] = ["dave", "erin", "frank"]
+        self.chain.rpc.fail.add(("alice", "erin"))
+        try:
+            failed = graph.load(["alice", "bob"])
+        finally:
+            FOLLOWS["alice"] = ["bob", "carol", "dave", "erin", "frank"]
+        self.assertEqual(failed, ["alice"])
+        # the stored list is kept instead of being replaced by the first page
+        self.assertEqual(graph.following("alice"), ["bob", "carol", "dave", "erin", "frank"])
+        self.assertEqual(graph.following("bob"), ["alice"])
+
+    def test_export(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(data_dir, "follows.tsv")
+            self.graph.to_edgelist(path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 6)
+            self.assertIn("bob\talice", lines)
+            path = os.path.join(data_dir, "follows.graphml")
+            self.graph.to_graphml(path)
+            with open(path) as f:
+                graphml = f.read()
+            self.assertIn('<edge source="alice" target="bob"/>', graphml)
+            self.assertEqual(graphml.count("<node "), 6)
+        finally:
+            shutil.rmtree(data_dir)
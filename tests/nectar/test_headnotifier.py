@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from nectar.headnotifier import HeadNotifier
+
+from .mocknode import FakeChain
+
+
+class ProducingChain(FakeChain):
+    """Produces a block every ``interval`` seconds, which is visible ``latency`` seconds later"""
+
+    def __init__(self, interval=0.05, latency=0.01, stalled_after=None):
+        super(ProducingChain, self).__init__(block_interval=interval)
+        self.latency = latency
+        self.stalled_after = stalled_after
+        self.genesis = time.time() - 1
+        self.calls = 0
+
+    def get_dynamic_global_properties(self, use_stored_data=True):
+        self.calls += 1
+        head = int((time.time() - self.latency - self.genesis) / self.block_interval)
+        if self.stalled_after is not None:
+            head = min(head, self.stalled_after)
+        return {
+            "head_block_number": head,
+            "last_irreversible_block_num": max(head - 1, 0),
+            "time": self.genesis + head * self.block_interval,
+        }
+
+
+class Testcases(unittest.TestCase):
+    def test_aligned_polls(self):
+        chain = ProducingChain()
+        notifier = HeadNotifier(blockchain_instance=chain, margin=0.005)
+        head = notifier.wait_for(0)["head_block_number"]
+        for block_num in range(head + 1, head + 6):
+            props = notifier.wait_for(block_num)
+            self.assertGreaterEqual(props["head_block_number"], block_num)
+        # about one poll per block instead of a poll every block interval and a retry
+        self.assertLessEqual(chain.calls, 12)
+
+    def test_backoff(self):
+        chain = ProducingChain(stalled_after=0)
+        notifier = HeadNotifier(blockchain_instance=chain, min_backoff=0.005)
+        notifier.wait_for(0)
+        props = notifier.wait_for(1, timeout=0.3)
+        self.assertEqual(props["head_block_number"], 0)
+        # 1 + 5, 10, 20, 40, then every 50 ms
+        self.assertLessEqual(chain.calls, 10)
+        self.assertGreaterEqual(chain.calls, 5)
+
+    def test_fan_out(self):
+        chain = ProducingChain()
+        notifier = HeadNotifier(blockchain_instance=chain, margin=0.005)
+        head = notifier.wait_for(0)["head_block_number"]
+        results = []
+
+        def consumer():
+            for block_num in range(head + 1, head + 4):
+                results.append(notifier.wait_for(block_num)["head_block_number"] >= block_num)
+
+        threads = [threading.Thread(target=consumer) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 24)
+        # the streams share the polls
+        self.assertLessEqual(chain.calls, 10)
+
+    def test_publish(self):
+        chain = ProducingChain(stalled_after=0)
+        notifier = HeadNotifier(blockchain_instance=chain, min_backoff=1)
+        notifier.wait_for(0)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(notifier.wait_for(5)))
+        thread.start()
+        time.sleep(0.05)
+        pushed = {"head_block_number": 5, "last_irreversible_block_num": 4, "time": time.time()}
+        self.assertTrue(notifier.publish(pushed))
+        self.assertFalse(notifier.publish(pushed))
+        thread.join(1)
+        self.assertEqual(result, [pushed])
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from nectar.account import Account
+from nectar.historystore import AccountHistoryStore
+
+from .mocknode import FakeChain, FakeRPC
+
+OP_TYPES = ["vote", "transfer", "comment"]
+
+
+def history_item(index):
+    return [
+        index,
+        {
+            "trx_id": "%040x" % index,
+            "block": 1000 + 2 * index,
+            "trx_in_block": 0,
+            "op_in_trx": 0,
+            "virtual_op": 0,
+            "timestamp": "2020-01-01T00:%02d:00" % (index % 60),
+            "op": [OP_TYPES[index % 3], {"n": index}],
+        },
+    ]
+
+
+class HistoryRPC(FakeRPC):
+    def __init__(self, history):
+        super(HistoryRPC, self).__init__()
+        self.history = history
+
+    def get_account_history(self, query, api=None):
+        start = query["start"]
+        if start < 0 or start >= len(self.history):
+            start = len(self.history) - 1
+        self.calls.append(query["start"])
+        lowest = max(0, start - query["limit"])
+        return {"history": self.history[lowest : start + 1]}
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.history = [history_item(i) for i in range(60)]
+        self.chain = FakeChain(
+            HistoryRPC(self.history),
+            dynamic_global_properties={"last_irreversible_block_num": 10**9},
+        )
+        self.store = AccountHistoryStore(blockchain_instance=self.chain, data_dir=self.data_dir)
+        self.account = Account({"name": "alice"}, blockchain_instance=self.chain)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_incremental_sync(self):
+        store = self.store
+        self.chain.dynamic_global_properties["last_irreversible_block_num"] = 1000 + 2 * 39
+        self.assertEqual(self.account.sync_history(history_store=store), 40)
+        self.assertEqual(store.last_index("alice"), 39)
+
+        self.chain.dynamic_global_properties["last_irreversible_block_num"] = 10**9
+        self.chain.rpc.calls = []
+        self.assertEqual(self.account.sync_history(history_store=store), 20)
+        self.assertEqual(store.count("alice"), 60)
+        # only the new ops were requested
+        self.assertTrue(all(start >= 40 for start in self.chain.rpc.calls[1:]))
+        self.assertEqual(self.account.sync_history(history_store=store), 0)
+        self.assertEqual(store.accounts(), ["alice"])
+
+    def test_history(self):
+        store = self.store
+        store.add_items("alice", self.history)
+        ops = list(self.account.history(history_store=store))
+        self.assertEqual([op["index"] for op in ops], list(range(60)))
+        self.assertEqual(ops[1]["type"], "transfer")
+        self.assertEqual(ops[1]["account"], "alice")
+        self.assertEqual(ops[1]["n"], 1)
+
+        ops = list(
+            self.account.history(
+                start=1010, stop=1030, only_ops=["vote"], history_store=store, raw_output=True
+            )
+        )
+        self.assertEqual([op[0] for op in ops], [6, 9, 12, 15])
+
+        ops = list(
+            self.account.history_reverse(
+                start=20, stop=10, use_block_num=False, exclude_ops=["vote"], history_store=store
+            )
+        )
+        self.assertEqual([op["index"] for op in ops], [20, 19, 17, 16, 14, 13, 11, 10])
+
+        start = datetime(2020, 1, 1, 0, 55, tzinfo=timezone.utc)
+        ops = list(self.account.history(start=start, history_store=store))
+        self.assertEqual([op["index"] for op in ops], list(range(55, 60)))
+
+    def test_wipe(self):
+        store = self.store
+        store.add_items("alice", self.history[:10])
+        store.add_items("bob", self.history[:5])
+        self.assertEqual(len(store), 15)
+        store.wipe("alice")
+        self.assertEqual(store.accounts(), ["bob"])
+        store.wipe()
+        self.assertEqual(len(store), 0)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Loaded on first use only: rpc transports, yaml and the signing backends
+DEFERRED_MODULES = [
+    "requests",
+    "websocket",
+    "ruamel.yaml",
+    "diff_match_patch",
+    "cryptography",
+]
+
+
+def import_in_subprocess(statement, repeat=3):
+    """Runs an import in fresh interpreters, returns the fastest import time
+    in seconds and the loaded modules"""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "%s\n"
+        "print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))\n" % statement
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([p for p in sys.path if p])
+    results = []
+    for i in range(repeat):
+        out = subprocess.check_output([sys.executable, "-c", code], env=env)
+        results.append(json.loads(out.decode().strip().splitlines()[-1]))
+    return min(r[0] for r in results), set(results[0][1])
+
+
+class Testcases(unittest.TestCase):
+    def test_lazy_package(self):
+        import_time, modules = import_in_subprocess("import nectar")
+        self.assertNotIn("nectar.blockchaininstance", modules)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, modules)
+
+        lazy_time, modules = import_in_subprocess("from nectar.amount import Amount")
+        self.assertNotIn("nectar.hive", modules)
+        self.assertNotIn("requests", modules)
+
+        full_time, modules = import_in_subprocess("from nectar import Hive")
+        self.assertIn("nectar.blockchaininstance", modules)
+        # no connection is opened, so no transport is needed yet
+        self.assertNotIn("requests", modules)
+        self.assertNotIn("websocket", modules)
+        self.assertTrue(import_time < full_time)
+        self.assertTrue(lazy_time < full_time)
+
+    def test_lazy_attributes(self):
+        import nectar
+
+        self.assertEqual(nectar.Hive.__name__, "Hive")
+        self.assertEqual(nectar.utils.__name__, "nectar.utils")
+        self.assertIn("Steem", dir(nectar))
+        with self.assertRaises(AttributeError):
+            nectar.NoSuchThing
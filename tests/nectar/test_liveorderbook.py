@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import mock
+
+from nectar import Hive
+from nectar.market import LiveOrderBook, Market
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bts = Hive(offline=True)
+        cls.market = Market("HIVE:HBD", blockchain_instance=cls.bts)
+
+    def test_create_and_cancel(self):
+        book = LiveOrderBook(self.market, blockchain_instance=self.bts)
+        book.apply(
+            {
+                "type": "limit_order_create",
+                "owner": "alice",
+                "orderid": 1,
+                "amount_to_sell": "10.000 HIVE",
+                "min_to_receive": "3.000 HBD",
+            }
+        )
+        book.apply(
+            {
+                "type": "limit_order_create",
+                "owner": "bob",
+                "orderid": 2,
+                "amount_to_sell": {"amount": "2500", "precision": 3, "nai": "@@000000013"},
+                "min_to_receive": {"amount": "10000", "precision": 3, "nai": "@@000000021"},
+            }
+        )
+        book.apply(
+            [
+                "limit_order_create",
+                {
+                    "owner": "carol",
+                    "orderid": 3,
+                    "amount_to_sell": "5.000 HIVE",
+                    "min_to_receive": "1.500 HBD",
+                },
+            ]
+        )
+        self.assertEqual(len(book), 3)
+        self.assertAlmostEqual(book.best_ask(), 0.3)
+        self.assertAlmostEqual(book.best_bid(), 0.25)
+        self.assertAlmostEqual(book.spread(), 0.05)
+        depth = book.depth()
+        self.assertEqual(len(depth["asks"]), 1)
+        self.assertAlmostEqual(depth["asks"][0][1], 15.0)
+        self.assertAlmostEqual(depth["bids"][0][1], 10.0)
+        self.assertAlmostEqual(depth["bids"][0][2], 2.5)
+
+        book.apply({"type": "limit_order_cancel", "owner": "alice", "orderid": 1})
+        self.assertAlmostEqual(book.depth()["asks"][0][1], 5.0)
+        book.apply({"type": "limit_order_cancel", "owner": "carol", "orderid": 3})
+        self.assertIsNone(book.best_ask())
+        self.assertIsNone(book.spread())
+
+    def test_fill_order(self):
+        book = LiveOrderBook(self.market, blockchain_instance=self.bts)
+        book.apply(
+            {
+                "type": "limit_order_create",
+                "owner": "alice",
+                "orderid": 1,
+                "amount_to_sell": "10.000 HIVE",
+                "min_to_receive": "3.000 HBD",
+            }
+        )
+        book.apply(
+            {
+                "op": [
+                    "fill_order",
+                    {
+                        "current_owner": "bob",
+                        "current_orderid": 7,
+                        "current_pays": "1.200 HBD",
+                        "open_owner": "alice",
+                        "open_orderid": 1,
+                        "open_pays": "4.000 HIVE",
+                    },
+                ],
+                "block_num": 10,
+            }
+        )
+        self.assertEqual(book.block_num, 10)
+        self.assertAlmostEqual(book.latest, 0.3)
+        self.assertAlmostEqual(book.volume_at_price(0.3), 6.0)
+        book.apply(
+            {
+                "type": "fill_order",
+                "current_owner": "bob",
+                "current_orderid": 8,
+                "current_pays": "1.800 HBD",
+                "open_owner": "alice",
+                "open_orderid": 1,
+                "open_pays": "6.000 HIVE",
+            }
+        )
+        self.assertEqual(len(book), 0)
+        self.assertEqual(book.depth(), {"asks": [], "bids": []})
+
+    def test_snapshot(self):
+        book = LiveOrderBook(self.market, blockchain_instance=self.bts)
+        for orderid, price in enumerate([0.31, 0.30, 0.32]):
+            book.apply(
+                {
+                    "type": "limit_order_create2",
+                    "owner": "alice",
+                    "orderid": orderid,
+                    "amount_to_sell": "10.000 HIVE",
+                    "exchange_rate": {"base": "1.000 HIVE", "quote": "%.3f HBD" % price},
+                }
+            )
+        asks = book.snapshot(limit=2)["asks"]
+        self.assertEqual(len(asks), 2)
+        self.assertAlmostEqual(float(asks[0]), 0.30)
+        self.assertAlmostEqual(float(asks[1]), 0.31)
+        self.assertEqual(asks[0]["base"]["symbol"], "HBD")
+        self.assertEqual(asks[0]["quote"]["symbol"], "HIVE")
+
+    def test_stream(self):
+        book = LiveOrderBook(self.market, blockchain_instance=self.bts)
+        book.block_num = 9
+        block = {
+            "id": 10,
+            "timestamp": "2024-01-01T00:00:00",
+            "transactions": [
+                {
+                    "operations": [
+                        {
+                            "type": "limit_order_create_operation",
+                            "value": {
+                                "owner": "alice",
+                                "orderid": 1,
+                                "amount_to_sell": "10.000 HIVE",
+                                "min_to_receive": "3.000 HBD",
+                            },
+                        }
+                    ]
+                },
+                {
+                    "operations": [
+                        # matches alice's order on creation
+                        [
+                            "limit_order_create",
+                            {
+                                "owner": "bob",
+                                "orderid": 7,
+                                "amount_to_sell": "1.200 HBD",
+                                "min_to_receive": "4.000 HIVE",
+                            },
+                        ]
+                    ]
+                },
+                {
+                    "operations": [
+                        [
+                            "limit_order_create",
+                            {
+                                "owner": "carol",
+                                "orderid": 3,
+                                "amount_to_sell": "1.000 HBD",
+                                "min_to_receive": "5.000 HIVE",
+                            },
+                        ]
+                    ]
+                },
+            ],
+        }
+        virtual_ops = [
+            {
+                "trx_in_block": 1,
+                "op_in_trx": 0,
+                "op": {
+                    "type": "fill_order_operation",
+                    "value": {
+                        "current_owner": "bob",
+                        "current_orderid": 7,
+                        "current_pays": "1.200 HBD",
+                        "open_owner": "alice",
+                        "open_orderid": 1,
+                        "open_pays": "4.000 HIVE",
+                    },
+                },
+            },
+            {
+                "trx_in_block": 4294967295,
+                "op_in_trx": 0,
+                "op": {
+                    "type": "limit_order_cancelled_operation",
+                    "value": {"seller": "carol", "orderid": 3, "amount_back": "1.000 HBD"},
+                },
+            },
+            {
+                "trx_in_block": 4294967295,
+                "op_in_trx": 0,
+                "op": {"type": "producer_reward_operation", "value": {}},
+            },
+        ]
+        with mock.patch("nectar.market.Blockchain.blocks", return_value=iter([block])) as blocks:
+            with mock.patch(
+                "nectar.market.Block.get_raw", return_value={"operations": virtual_ops}
+            ) as get_raw:
+                ops = list(book.stream(stop=10))
+        self.assertEqual(blocks.call_args[1]["start"], 10)
+        self.assertEqual(get_raw.call_args[1]["only_virtual_ops"], True)
+        self.assertEqual(
+            [op["op"][0] for op in ops],
+            [
+                "limit_order_create",
+                "limit_order_create",
+                "fill_order",
+                "limit_order_create",
+                "limit_order_cancelled",
+            ],
+        )
+        self.assertEqual(ops[2]["block_num"], 10)
+        self.assertEqual(len(book), 1)
+        self.assertIsNone(book.best_bid())
+        self.assertAlmostEqual(book.best_ask(), 0.3)
+        self.assertAlmostEqual(book.volume_at_price(0.3), 6.0)
+        self.assertAlmostEqual(book.latest, 0.3)
+        self.assertEqual(book.block_num, 10)
+
+    def test_levels(self):
+        book = LiveOrderBook(self.market, blockchain_instance=self.bts)
+        for orderid in range(200):
+            book.apply(
+                {
+                    "type": "limit_order_create2",
+                    "owner": "alice",
+                    "orderid": orderid,
+                    "amount_to_sell": "1.000 HBD",
+                    "exchange_rate": {"base": "1.000 HBD", "quote": "%d.000 HIVE" % (orderid + 1)},
+                }
+            )
+        for orderid in range(199):
+            self.assertAlmostEqual(book.best_bid(), 1.0 / (orderid + 1))
+            book.apply({"type": "limit_order_cancel", "owner": "alice", "orderid": orderid})
+        self.assertEqual(len(book.bids), 1)
+        self.assertAlmostEqual(book.best_bid(), 1.0 / 200)
+        self.assertEqual(len(book.depth(limit=None)["bids"]), 1)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import time
+import unittest
+from timeit import default_timer as timer
+
+from nectar.nodelist import NodeBenchmarkStore, NodeList, benchmark_node
+from nectarapi.node import Nodes
+
+from .mocknode import FakeChain, FakeRPC, MockNode
+
+
+class SwitchingRPC(FakeRPC):
+    def __init__(self, urls):
+        super(SwitchingRPC, self).__init__()
+        self.nodes = Nodes(urls, -1, -1)
+        self.url = next(self.nodes)
+
+    def next(self):
+        self.calls.append("next")
+        self.url = next(self.nodes)
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fast = MockNode(head_block=1000).start()
+        cls.slow = MockNode(head_block=1000, delay=0.05).start()
+        cls.behind = MockNode(head_block=900).start()
+        cls.broken = MockNode(fail_methods=["database_api.get_dynamic_global_properties"]).start()
+        cls.hanging = MockNode(delay=3).start()
+        cls.urls = [node.url for node in [cls.slow, cls.behind, cls.fast, cls.broken]]
+
+    @classmethod
+    def tearDownClass(cls):
+        for node in [cls.fast, cls.slow, cls.behind, cls.broken, cls.hanging]:
+            node.stop()
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def get_nodelist(self, urls):
+        nl = NodeList()
+        nl.clear()
+        for url in urls:
+            nl.append(
+                {
+                    "url": url,
+                    "version": "0.0.0",
+                    "type": "appbase",
+                    "owner": "test",
+                    "hive": True,
+                    "score": 10,
+                }
+            )
+        return nl
+
+    def test_benchmark_node(self):
+        result = benchmark_node(self.fast.url, timeout=2)
+        self.assertEqual(result["head_block"], 1000)
+        self.assertTrue(result["hive"])
+        self.assertEqual(result["version"], "1.27.8")
+        self.assertTrue(result["head_delay"] >= 0)
+        for benchmark in ["apicall", "config", "block", "history"]:
+            self.assertTrue(result[benchmark]["ok"])
+
+        result = benchmark_node(self.broken.url, timeout=2)
+        self.assertFalse(result["apicall"]["ok"])
+        self.assertIn("mock error", result["apicall"]["error"])
+        self.assertFalse(result["block"]["ok"])
+
+    def test_benchmark_nodes(self):
+        nl = self.get_nodelist(self.urls + [self.hanging.url])
+        start = timer()
+        metadata = nl.benchmark_nodes(timeout=5, budget=1)
+        # nodes are benchmarked in parallel inside the budget
+        self.assertTrue(timer() - start < 2)
+        failing = metadata["failing_nodes"]
+        self.assertEqual(
+            sorted(failing), sorted([self.behind.url, self.broken.url, self.hanging.url])
+        )
+        self.assertEqual(failing[self.behind.url], "100 blocks behind")
+        self.assertEqual(nl.get_hive_nodes(), [self.fast.url, self.slow.url])
+
+        chain = FakeChain(SwitchingRPC(self.urls))
+        nl.sort_rpc_nodes(blockchain_instance=chain)
+        self.assertEqual(
+            [chain.rpc.nodes[i].url for i in range(len(chain.rpc.nodes))],
+            [self.fast.url, self.slow.url, self.behind.url, self.broken.url],
+        )
+        self.assertEqual(chain.rpc.url, self.fast.url)
+        self.assertEqual(chain.rpc.calls, ["next"])
+
+    def test_store(self):
+        store = NodeBenchmarkStore(data_dir=self.data_dir)
+        nl = self.get_nodelist(self.urls)
+        nl.benchmark_nodes(timeout=2, budget=2, store=store)
+        self.assertEqual(len(store), 4)
+        timestamp, result = store.get_results(self.fast.url)[0]
+        self.assertTrue(timestamp <= time.time())
+        self.assertEqual(result["head_block"], 1000)
+
+        # fresh stored results are used without any request
+        calls = len(self.fast.calls)
+        nl = self.get_nodelist(self.urls)
+        metadata = nl.benchmark_nodes(store=store, max_age=3600)
+        self.assertEqual(len(self.fast.calls), calls)
+        self.assertEqual(len(metadata["report"]), 4)
+        self.assertEqual(nl.get_hive_nodes(), [self.fast.url, self.slow.url])
+
+        self.assertEqual(store.get_metadata(max_age=-1)["report"], [])
+        store.wipe()
+        self.assertEqual(len(store), 0)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar.blockchain import Blockchain, OpView
+
+from .mocknode import FakeChain, patch_blocks, raw_block
+
+BLOCK_OPS = [
+    [
+        {
+            "type": "transfer_operation",
+            "value": {"from": "alice", "to": "bob", "amount": "1.000 HIVE"},
+        },
+        {"type": "vote_operation", "value": {"voter": "bob", "weight": 100}},
+    ],
+    [["vote", {"voter": "carol", "weight": -100}]],
+]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.b = Blockchain(blockchain_instance=FakeChain())
+        self.fake_blocks = [raw_block(1, BLOCK_OPS), raw_block(2, BLOCK_OPS)]
+        patcher = patch_blocks(dict(enumerate(self.fake_blocks, 1)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_op_view(self):
+        ops = list(self.b.stream(source="blocks"))
+        views = list(self.b.stream(source="blocks", op_view=True))
+        self.assertEqual(len(views), 6)
+        # _id is hashed on first access
+        self.assertIsNone(views[0]._hash)
+        self.assertEqual(views[0]["_id"], ops[0]["_id"])
+        self.assertIsNotNone(views[0]._hash)
+        for op, view in zip(ops, views):
+            self.assertIsInstance(view, OpView)
+            self.assertEqual(list(view), list(op))
+            self.assertEqual(view.to_dict(), op)
+            self.assertEqual(view, op)
+        view = views[0]
+        self.assertEqual(view.type, "transfer")
+        self.assertEqual(view["from"], "alice")
+        self.assertEqual(view.get("memo"), None)
+        self.assertIn("amount", view)
+        self.assertEqual(view.block_num, 1)
+        self.assertEqual(views[2]["trx_num"], 1)
+        self.assertEqual(views[2]["trx_id"], "%040x" % 1001)
+        # no copy of the block operation
+        self.assertIs(view.op, self.fake_blocks[0]["transactions"][0]["operations"][0]["value"])
+        with self.assertRaises(AttributeError):
+            view.extra = 1
+
+    def test_op_names(self):
+        views = list(self.b.stream(opNames=["vote"], source="blocks", op_view=True))
+        self.assertEqual([view["voter"] for view in views], ["bob", "carol", "bob", "carol"])
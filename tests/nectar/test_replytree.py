@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar import Hive
+from nectar.comment import ReplyTree
+
+from .mocknode import FakeChain, FakeRPC
+
+
+def post(key, replies, depth):
+    author, permlink = key.split("/")
+    return {
+        "author": author,
+        "permlink": permlink,
+        "depth": depth,
+        "children": len(replies),
+        "replies": replies,
+        "body": key,
+    }
+
+
+DISCUSSION = {
+    "alice/root": post("alice/root", ["bob/re1", "carol/re2"], 0),
+    "bob/re1": post("bob/re1", ["dave/re3"], 1),
+    "carol/re2": post("carol/re2", [], 1),
+    "dave/re3": post("dave/re3", ["erin/re4"], 2),
+    "erin/re4": post("erin/re4", [], 3),
+}
+
+
+class DiscussionRPC(FakeRPC):
+    def __init__(self, truncate=False):
+        super(DiscussionRPC, self).__init__()
+        self.truncate = truncate
+
+    def get_discussion(self, query, api=None, add_to_queue=False):
+        queue = self.batch(query, add_to_queue)
+        if queue is None:
+            return None
+        self.calls.append([q["author"] for q in queue])
+        ret = []
+        for q in queue:
+            key = "%s/%s" % (q["author"], q["permlink"])
+            if self.truncate:
+                # only the post and its direct replies are returned
+                answer = {key: DISCUSSION[key]}
+                for child in DISCUSSION[key]["replies"]:
+                    answer[child] = DISCUSSION[child]
+            else:
+                answer = dict(DISCUSSION)
+            ret.append(answer)
+        return ret if len(queue) > 1 else ret[0]
+
+
+class Testcases(unittest.TestCase):
+    def test_tree(self):
+        rpc = DiscussionRPC()
+        tree = ReplyTree("@alice/root", blockchain_instance=FakeChain(rpc))
+        self.assertEqual(rpc.calls, [["alice"]])
+        self.assertEqual(tree.keys, ["alice/root", "bob/re1", "carol/re2", "dave/re3", "erin/re4"])
+        self.assertEqual(list(tree.parent), [-1, 0, 0, 1, 3])
+        self.assertEqual(tree.children[0], [1, 2])
+        self.assertEqual(tree.get_children("@bob/re1"), ["dave/re3"])
+        self.assertEqual(tree.get_parent("dave/re3"), "bob/re1")
+        self.assertIsNone(tree.get_parent("alice/root"))
+        self.assertEqual(tree.get_depth("erin/re4"), 3)
+        self.assertIn("@erin/re4", tree)
+        self.assertFalse(tree.truncated)
+
+        tree.blockchain = Hive(offline=True)
+        comments = tree.get_comments()
+        self.assertEqual(len(comments), 4)
+        self.assertEqual(comments[0].authorperm, "@bob/re1")
+        self.assertEqual(tree.get_comment("carol/re2")["body"], "carol/re2")
+
+    def test_truncated_answers(self):
+        rpc = DiscussionRPC(truncate=True)
+        tree = ReplyTree("@alice/root", blockchain_instance=FakeChain(rpc))
+        self.assertEqual(rpc.calls, [["alice"], ["dave"]])
+        self.assertEqual(len(tree), 5)
+
+    def test_budget(self):
+        rpc = DiscussionRPC()
+        tree = ReplyTree("@alice/root", max_depth=1, blockchain_instance=FakeChain(rpc))
+        self.assertEqual(tree.keys, ["alice/root", "bob/re1", "carol/re2"])
+        self.assertTrue(tree.truncated)
+
+        tree = ReplyTree("@alice/root", max_size=3, blockchain_instance=FakeChain(rpc))
+        self.assertEqual(len(tree), 4)
+        self.assertTrue(tree.truncated)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import gc
+import sys
+import unittest
+
+from nectar import Hive
+from nectar.blockchain import Blockchain, BlockRecord
+from nectar.blockchainobject import BlockchainObject
+
+from .mocknode import MockNode
+
+
+def rss():
+    """Current resident set size in bytes"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.node = MockNode(head_block=200000, transactions=2).start()
+        cls.hv = Hive(node=cls.node.url, num_retries=1, timeout=30)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+
+    def replay(self, stop, **kwargs):
+        """Streams blocks 1 to stop and returns the RSS after every 10000 blocks"""
+        b = Blockchain(blockchain_instance=self.hv)
+        samples = []
+        cached = len(BlockchainObject._cache)
+        for block in b.blocks(start=1, stop=stop, max_batch_size=1000, **kwargs):
+            if block["id"] % 10000 == 0:
+                # the mock node records every call
+                del self.node.calls[:]
+                gc.collect()
+                samples.append(rss())
+        self.assertEqual(block["id"], stop)
+        self.assertEqual(len(BlockchainObject._cache), cached)
+        return samples
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "reads /proc/self/statm")
+    def test_flat_rss(self):
+        samples = self.replay(100000, raw_blocks=True)
+        # after the first 10000 blocks, the memory does not grow with the replay
+        self.assertLess(max(samples) - samples[0], 4 * 1024 * 1024)
+
+    def test_block_records(self):
+        b = Blockchain(blockchain_instance=self.hv)
+        blocks = list(b.blocks(start=10, stop=12, block_records=True))
+        self.assertEqual([block.block_num for block in blocks], [10, 11, 12])
+        block = blocks[0]
+        self.assertIsInstance(block, BlockRecord)
+        self.assertEqual(block["previous"], "%08x" % 9 + "0" * 32)
+        self.assertEqual(block.timestamp, "2024-01-01T00:00:00")
+        self.assertNotIn("signing_key", block)
+        self.assertNotIn("operations", block)
+        self.assertEqual(len(block.transactions), 2)
+        self.assertEqual(
+            sorted(block.to_dict()),
+            [
+                "block_id",
+                "id",
+                "previous",
+                "timestamp",
+                "transaction_ids",
+                "transactions",
+                "witness",
+            ],
+        )
+        with self.assertRaises(AttributeError):
+            block.extra = 1
+
+    def test_stream_raw_blocks(self):
+        b = Blockchain(blockchain_instance=self.hv)
+        ops = list(b.stream(opNames=["vote"], start=10, stop=11, raw_blocks=True))
+        self.assertEqual([op["block_num"] for op in ops], [10, 10, 11, 11])
+        self.assertEqual(ops[0]["voter"], "voter10")
+        self.assertEqual(ops[0]["timestamp"], "2024-01-01T00:00:00")
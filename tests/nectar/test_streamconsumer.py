@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from nectar.streamconsumer import StreamConsumer
+
+from .mocknode import FakeChain, patch_blocks, raw_block
+
+
+def vote_block(block_num, fork=False):
+    """Returns a block with 2 transactions of 3 votes, every 3rd block is empty"""
+    transactions = []
+    if block_num % 3:
+        transactions = [
+            [
+                {"type": "vote_operation", "value": {"voter": "v%d" % i, "weight": 1}}
+                for i in range(3)
+            ]
+            for trx_num in range(2)
+        ]
+    return raw_block(block_num, transactions, fork=fork)
+
+
+BLOCKS = {i: vote_block(i) for i in range(1, 11)}
+
+
+def position(op):
+    return (op["block_num"], op["trx_num"], op["voter"])
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.chain = FakeChain()
+        patcher = patch_blocks(BLOCKS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.all_ops = [position(op) for op in self.consumer("all")]
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def consumer(self, name, **kwargs):
+        return StreamConsumer(
+            name,
+            opNames=["vote"],
+            start=1,
+            stop=10,
+            data_dir=self.data_dir,
+            blockchain_instance=self.chain,
+            **kwargs,
+        )
+
+    def test_resume(self):
+        self.assertEqual(len(self.all_ops), 7 * 6)
+        self.assertEqual(self.consumer("all").cursor, (10, None, None))
+        # a consumer which stops after 10 ops, at (block 2, trx 1, op 0)
+        consumer = self.consumer("crash", commit_ops=1000)
+        processed = []
+        for op in consumer:
+            processed.append(position(op))
+            if len(processed) == 10:
+                break
+        # the 10th op was not acknowledged
+        self.assertEqual(consumer.cursor, (2, 0, 2))
+        consumer = self.consumer("crash")
+        self.assertEqual(consumer.cursor, (2, 0, 2))
+        resumed = [position(op) for op in consumer]
+        self.assertEqual(processed[:9] + resumed, self.all_ops)
+
+    def test_commit_in_loop(self):
+        consumer = self.consumer("explicit")
+        for i, op in enumerate(consumer):
+            if i == 9:
+                consumer.commit()
+                break
+        self.assertEqual(self.consumer("explicit").cursor, (2, 1, 0))
+        resumed = [position(op) for op in self.consumer("explicit")]
+        self.assertEqual(resumed, self.all_ops[10:])
+
+    def test_on_commit(self):
+        commits = []
+
+        def on_commit(cursor, connection):
+            connection.execute("CREATE TABLE IF NOT EXISTS seen (cursor TEXT)")
+            connection.execute("INSERT INTO seen VALUES (?)", (str(cursor),))
+            commits.append(cursor)
+
+        ops = list(self.consumer("batch", commit_ops=10, on_commit=on_commit))
+        self.assertEqual(len(ops), 42)
+        # 4 batches of 10 ops and the end of the stream
+        self.assertEqual(len(commits), 5)
+        self.assertEqual(commits[-1], (10, None, None))
+        consumer = self.consumer("batch")
+        rows = consumer.sql_fetchall(("SELECT cursor FROM seen",))
+        self.assertEqual(len(rows), 5)
+
+    def test_reorg(self):
+        consumer = self.consumer("head", mode="head")
+        for i, op in enumerate(consumer):
+            if i == 3:
+                break
+        self.assertEqual(consumer.cursor, (1, 0, 2))
+        reorgs = []
+        consumer = self.consumer("head", mode="head", on_reorg=lambda *args: reorgs.append(args))
+        with mock.patch("nectar.streamconsumer.Block", lambda n, **kw: vote_block(n, fork=True)):
+            resumed = [position(op) for op in consumer]
+        self.assertEqual(reorgs, [(1, BLOCKS[1]["block_id"], vote_block(1, fork=True)["block_id"])])
+        # block 1 is streamed again
+        self.assertEqual(resumed, self.all_ops)
+        consumer.reset()
+        self.assertIsNone(self.consumer("head").cursor)
@@ -6,6 +6,7 @@ from datetime import datetime
 from ruamel.yaml import YAML
 
 from nectar.utils import (
+    _batched_call,
     addTzInfo,
     assets_from_string,
     construct_authorperm,
@@ -22,13 +23,16 @@ from nectar.utils import (
     import_coldcard_wif,
     import_pubkeys,
     make_patch,
+    parse_time,
     remove_from_dict,
     resolve_authorperm,
     resolve_authorpermvoter,
     resolve_root_identifier,
     sanitize_permlink,
     seperate_yaml_dict_from_body,
+    timestampToDatetime,
 )
+from nectarapi.exceptions import RPCError
 
 
 class Testcases(unittest.TestCase):
@@ -165,6 +169,21 @@ class Testcases(unittest.TestCase):
         t2 = addTzInfo(datetime(2018, 7, 10, 10, 8, 39))
         self.assertEqual(t, t2)
 
+    def test_parse_time(self):
+        t = parse_time("2018-07-10T10:08:39")
+        self.assertEqual(t, addTzInfo(datetime(2018, 7, 10, 10, 8, 39)))
+        self.assertIsNotNone(t.tzinfo)
+        self.assertEqual(timestampToDatetime(formatToTimeStamp("2018-07-10T10:08:39")), t)
+        # only the chain format is accepted
+        for value in [
+            "2018-07-10",
+            "2018-07-10T10+01:00",
+            "2018-07-10 10:08:39",
+            "2018-13-10T10:08:39",
+        ]:
+            with self.assertRaises(ValueError):
+                parse_time(value)
+
     def test_derive_beneficiaries(self):
         t = "thecrazygm:10"
         b = derive_beneficiaries(t)
@@ -261,3 +280,28 @@ class Testcases(unittest.TestCase):
         self.assertEqual(active, "STM6oVMzJJJgSu3hV1DZBcLdMUJYj3Cs6kGXf6WVLP3HhgLgNkA5J")
         self.assertEqual(posting, "STM8XJdv7T36XhKRmPaodt8tqoeMbNgLrsiyweNESvnKqZWQQekCQ")
         self.assertEqual(memo, "STM87KR1HKDoLiC3dv3goE99KDqEocBi3br8vcop6DgrCTwJcWexH")
+
+    def test_batched_call(self):
+        queue = []
+        requests = []
+
+        def method(name, add_to_queue=False, api=None):
+            queue.append(name)
+            if add_to_queue:
+                return None
+            names = queue[:]
+            del queue[:]
+            requests.append(names)
+            if "missing" in names:
+                raise RPCError("missing")
+            if len(names) == 1:
+                return name.upper()
+            return [n.upper() for n in names]
+
+        self.assertEqual(_batched_call(method, [("a",), ("b",)], api="condenser"), ["A", "B"])
+        self.assertEqual(requests, [["a", "b"]])
+        del requests[:]
+        self.assertEqual(_batched_call(method, [("a",), ("missing",)]), ["A", None])
+        self.assertEqual(requests, [["a", "missing"], ["a"], ["missing"]])
+        with self.assertRaises(RPCError):
+            _batched_call(method, [("missing",)], expected_errors=(ValueError,))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar import Hive
+from nectar.vote import VoteTable
+from nectarapi.exceptions import UnknownKey
+
+from .mocknode import FakeChain, FakeRPC
+
+VOTES = {
+    ("alice", "post"): [
+        {
+            "voter": "bob",
+            "rshares": "1000",
+            "weight": 10,
+            "percent": 10000,
+            "time": "2024-01-01T00:00:00",
+        },
+        {
+            "voter": "carol",
+            "rshares": -500,
+            "weight": 0,
+            "percent": -5000,
+            "time": "2024-01-01T00:01:00",
+        },
+    ],
+    ("dave", "post"): [],
+}
+
+
+class VoteRPC(FakeRPC):
+    def __init__(self, support_batch=True):
+        super(VoteRPC, self).__init__()
+        self.support_batch = support_batch
+
+    def get_active_votes(self, author, permlink, api=None, add_to_queue=False):
+        queue = self.batch((author, permlink), add_to_queue)
+        if queue is None:
+            return None
+        self.calls.append(queue)
+        if len(queue) > 1 and not self.support_batch:
+            return None
+        ret = []
+        for key in queue:
+            if key not in VOTES:
+                raise UnknownKey(key)
+            ret.append(VOTES[key])
+        return ret if len(queue) > 1 else ret[0]
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bts = Hive(offline=True)
+
+    def _load(self, rpc, authorperms):
+        table = VoteTable([], blockchain_instance=self.bts)
+        table.blockchain = FakeChain(rpc)
+        table.load(authorperms)
+        table.blockchain = self.bts
+        return table
+
+    def test_batched_load(self):
+        rpc = VoteRPC()
+        table = self._load(rpc, ["@alice/post", "@dave/post"])
+        self.assertEqual(len(rpc.calls), 1)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.authorperms, ["@alice/post", "@dave/post"])
+        self.assertEqual(table.total_rshares(), 500)
+        self.assertEqual(table.total_rshares("@dave/post"), 0)
+        rows = list(table)
+        self.assertEqual(rows[0], ("@alice/post", "bob", 1000, 10, 10000, 1704067200))
+        self.assertEqual(rows[1][1], "carol")
+        self.assertEqual(rows[1][4], -5000)
+
+    def test_fallback(self):
+        rpc = VoteRPC(support_batch=False)
+        table = self._load(rpc, ["@alice/post", "@missing/post", "@dave/post"])
+        self.assertEqual(len(rpc.calls), 4)
+        self.assertEqual(table.missing, ["@missing/post"])
+        self.assertIn("@alice/post", table)
+        self.assertNotIn("@missing/post", table)
+
+        rpc = VoteRPC()
+        table = self._load(rpc, ["@alice/post", "@missing/post"])
+        self.assertEqual(table.missing, ["@missing/post"])
+        self.assertEqual(len(table), 2)
+
+    def test_get_votes(self):
+        table = VoteTable([], blockchain_instance=self.bts)
+        table.add_votes("@alice/post", VOTES[("alice", "post")])
+        votes = table.get_votes("@alice/post")
+        self.assertEqual(len(votes), 2)
+        self.assertEqual(votes[0].voter, "bob")
+        self.assertEqual(votes[0].rshares, 1000)
+        self.assertEqual(votes[1].authorperm, "@alice/post")
+        self.assertEqual(votes[1].time.minute, 1)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar.blockchainobject import BlockchainObject
+from nectar.exceptions import WitnessDoesNotExistsException
+from nectar.witness import Witness, Witnesses, WitnessesRankedByVote
+
+from .mocknode import FakeChain, FakeRPC
+
+# 2500 witnesses, ranked by (votes desc, owner asc), pairs with equal votes
+WITNESSES = [
+    {"owner": "witness%04d" % i, "votes": str(10**9 - i // 2), "created": "2020-01-01T00:00:00"}
+    for i in range(2500)
+]
+
+
+class WitnessRPC(FakeRPC):
+    def find_witnesses(self, query, api=None):
+        self.calls.append("find_witnesses")
+        assert len(query["owners"]) <= 1000
+        by_owner = {w["owner"]: w for w in WITNESSES}
+        return {"witnesses": [dict(by_owner[o]) for o in query["owners"] if o in by_owner]}
+
+    def list_witnesses(self, query, api=None):
+        self.calls.append("list_witnesses")
+        assert query["limit"] <= 1000
+        votes, owner = query["start"]
+        index = 0
+        if owner is not None:
+            while index < len(WITNESSES) and (
+                int(WITNESSES[index]["votes"]) > int(votes)
+                or (
+                    int(WITNESSES[index]["votes"]) == int(votes)
+                    and WITNESSES[index]["owner"] < owner
+                )
+            ):
+                index += 1
+        return {"witnesses": [dict(w) for w in WITNESSES[index : index + query["limit"]]]}
+
+    def get_active_witnesses(self, api=None):
+        self.calls.append("get_active_witnesses")
+        return {"witnesses": ["witness%04d" % i for i in range(21)] + [""]}
+
+    def get_witness_schedule(self, api=None):
+        self.calls.append("get_witness_schedule")
+        return {}
+
+    def get_witness_count(self, api=None):
+        self.calls.append("get_witness_count")
+        return len(WITNESSES)
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        BlockchainObject.clear_cache()
+        self.chain = FakeChain(
+            WitnessRPC(), dynamic_global_properties={"current_witness": "witness0000"}
+        )
+
+    def test_witnesses(self):
+        w = Witnesses(blockchain_instance=self.chain)
+        self.assertEqual(self.chain.rpc.calls.count("find_witnesses"), 1)
+        self.assertEqual(len(w), 22)
+        self.assertEqual(w[5]["owner"], "witness0005")
+        self.assertEqual(w[5]["votes"], 10**9 - 2)
+        self.assertTrue(w[5].cached)
+        self.assertEqual(w[21]["owner"], "")
+        self.assertIsInstance(BlockchainObject._cache.get("witness0020", None), Witness)
+
+    def test_ranked_by_vote(self):
+        w = WitnessesRankedByVote(limit=100, blockchain_instance=self.chain)
+        self.assertEqual(self.chain.rpc.calls, ["list_witnesses"])
+        self.assertEqual([x["owner"] for x in w], [x["owner"] for x in WITNESSES[:100]])
+
+    def test_ranked_by_vote_pages(self):
+        w = WitnessesRankedByVote(limit=2200, blockchain_instance=self.chain)
+        self.assertEqual(self.chain.rpc.calls, ["list_witnesses"] * 3)
+        self.assertEqual([x["owner"] for x in w], [x["owner"] for x in WITNESSES[:2200]])
+        w = WitnessesRankedByVote(limit=5000, blockchain_instance=self.chain)
+        self.assertEqual([x["owner"] for x in w], [x["owner"] for x in WITNESSES])
+
+    def test_ranked_by_vote_from_account(self):
+        w = WitnessesRankedByVote("witness0011", limit=10, blockchain_instance=self.chain)
+        self.assertEqual(self.chain.rpc.calls, ["find_witnesses", "list_witnesses"])
+        self.assertEqual([x["owner"] for x in w], [x["owner"] for x in WITNESSES[11:21]])
+        # the cursor always uses the current votes, not a cached witness
+        self.chain.rpc.calls = []
+        BlockchainObject._cache["witness0011"]["votes"] = 1
+        w = WitnessesRankedByVote("witness0011", limit=10, blockchain_instance=self.chain)
+        self.assertEqual(self.chain.rpc.calls, ["find_witnesses", "list_witnesses"])
+        self.assertEqual(w[0]["owner"], "witness0011")
+        with self.assertRaises(WitnessDoesNotExistsException):
+            WitnessesRankedByVote("unknown", blockchain_instance=self.chain)
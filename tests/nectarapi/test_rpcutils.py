@@ -1,11 +1,16 @@
 # This Python file uses the following encoding: utf-8
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
+import threading
 import unittest
 
+from nectarapi.graphenerpc import GrapheneRPC
 from nectarapi.rpcutils import (
+    encode_query,
     get_api_name,
     get_query,
+    get_query_template,
     is_network_appbase_ready,
 )
 
@@ -81,3 +86,38 @@ class Testcases(unittest.TestCase):
         self.assertEqual(query["id"], 1)
         self.assertTrue(isinstance(query["params"], list))
         self.assertEqual(query["params"], ["test_api", "test", ["b"]])
+
+    def test_query_template(self):
+        template = get_query_template(True, "block_api", "get_block")
+        self.assertIs(template, get_query_template(True, "block_api", "get_block"))
+        params = {"block_num": 1}
+        query = template.query(5, (params,))
+        self.assertEqual(
+            query, {"method": "block_api.get_block", "params": params, "jsonrpc": "2.0", "id": 5}
+        )
+        # the arguments are not copied
+        self.assertIs(query["params"], params)
+        query = get_query_template(True, "condenser_api", "get_block").query(6, (1,))
+        self.assertEqual(query["params"], ["condenser_api", "get_block", [1]])
+
+    def test_encode_query(self):
+        query = get_query(True, 1, "test_api", "test", args=({"memo": "\u00e4"},))
+        data = encode_query(query)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(json.loads(data.decode("utf8")), query)
+        self.assertIn("\u00e4".encode("utf8"), data)
+        self.assertNotIn(b", ", data)
+
+    def test_request_id(self):
+        rpc = GrapheneRPC("http://localhost:0", autoconnect=False)
+        ids = []
+
+        def get_ids():
+            ids.extend(rpc.get_request_id() for i in range(1000))
+
+        threads = [threading.Thread(target=get_ids) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(ids), list(range(1, 4001)))